@@ -0,0 +1,109 @@
+"""
+Detect+parse cost of autodetect_parser compared with parsing the file
+directly with the right parser (one decode).
+
+    python -m benchmarks.bench_autodetect --entries 200000
+
+The "trial parse" row emulates the previous strategy (every parser calls
+parse() and decodes the file itself) to show what probing saves.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from deeptrace.core.parsers.har_generic import HarParser
+from deeptrace.core.parsers.parser_manager import autodetect_parser
+from deeptrace.core.registry import get_all, preload_all_parsers
+
+
+def make_har(path: Path, entries: int) -> None:
+    data = {
+        "log": {
+            "version": "1.2",
+            "entries": [
+                {
+                    "startedDateTime": "2024-05-15T13:00:00.000Z",
+                    "time": i % 1500,
+                    "request": {"url": f"https://example.com/api/{i % 500}"},
+                }
+                for i in range(entries)
+            ],
+        }
+    }
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def trial_parse(path: Path) -> None:
+    preload_all_parsers()
+    # module order, as the CLI registers them
+    for _, factory in sorted(get_all().items()):
+        try:
+            if factory().parse(str(path)):
+                return
+        except ValueError:
+            continue
+
+
+def count_decodes(fn: Callable[[], object]) -> int:
+    calls = 0
+    real_loads = json.loads
+
+    def counting_loads(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return real_loads(*args, **kwargs)
+
+    json.loads = counting_loads  # type: ignore[assignment]
+    try:
+        fn()
+    finally:
+        json.loads = real_loads  # type: ignore[assignment]
+    return calls
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entries", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "big.har"
+        make_har(path, args.entries)
+        size_mb = path.stat().st_size / 2**20
+
+        runs = {
+            "HarParser.parse": lambda: HarParser().parse(str(path)),
+            "autodetect_parser": lambda: autodetect_parser(path),
+            "trial parse (old)": lambda: trial_parse(path),
+        }
+        decode = best_of(lambda: json.loads(path.read_bytes()), args.repeat)
+        timings = {k: best_of(fn, args.repeat) for k, fn in runs.items()}
+        decodes = {k: count_decodes(fn) for k, fn in runs.items()}
+
+    print(f"HAR: {args.entries} entries, {size_mb:.1f} MB")
+    print(f"{'json.loads only':<24}{decode * 1000:>10.1f} ms")
+    direct = timings["HarParser.parse"]
+    for label, t in timings.items():
+        print(
+            f"{label:<24}{t * 1000:>10.1f} ms {t / direct:>6.2f}x"
+            f"  decodes={decodes[label]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
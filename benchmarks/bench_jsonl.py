@@ -0,0 +1,77 @@
+"""
+JSON Lines parse throughput against the number of worker processes.
+
+    python -m benchmarks.bench_jsonl --mb 512 --chunk-mb 8
+
+Generates a log of roughly --mb megabytes and parses it with 1, 2, 4, ...
+workers up to os.cpu_count().
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from deeptrace.core.parsers.jsonl import JSONLParser
+
+
+def make_jsonl(path: Path, megabytes: int) -> int:
+    target = megabytes << 20
+    lines = 0
+    with path.open("w", encoding="utf-8") as fh:
+        while fh.tell() < target:
+            block = "".join(
+                json.dumps(
+                    {
+                        "name": f"step-{i % 997}",
+                        "startTime": i * 3,
+                        "duration": i % 1500,
+                        "meta": {"worker": i % 8, "tag": "soak"},
+                    }
+                )
+                + "\n"
+                for i in range(lines, lines + 10_000)
+            )
+            fh.write(block)
+            lines += 10_000
+    return lines
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=int, default=256)
+    ap.add_argument("--chunk-mb", type=int, default=8)
+    args = ap.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 <= cpus:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != cpus:
+        workers.append(cpus)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "soak.jsonl"
+        lines = make_jsonl(path, args.mb)
+        size_mb = path.stat().st_size / 2**20
+        print(f"{lines} lines, {size_mb:.0f} MB, chunks of {args.chunk_mb} MB")
+
+        base = None
+        for n in workers:
+            parser = JSONLParser(workers=n, chunk_bytes=args.chunk_mb << 20)
+            t0 = time.perf_counter()
+            table = parser.parse_table(str(path))
+            took = time.perf_counter() - t0
+            assert len(table) == lines
+            base = base or took
+            print(
+                f"workers={n:<3}{took:>8.2f} s {size_mb / took:>8.1f} MB/s"
+                f" {base / took:>6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Per-stage timings and peak memory of the analyze pipeline on synthetic logs.
+
+    python -m benchmarks.bench_pipeline --sizes 1000 100000 --output run.json
+    python -m benchmarks.bench_pipeline --baseline run.json --max-regression 0.2
+
+Logs come from benchmarks.generate (deterministic, --seed) and are kept in
+--data-dir between runs. Every stage of `deeptrace analyze` is timed on its
+own (best of --repeat): detect, parse, dedupe, filter, top-N, stats,
+markdown and rich rendering; a separate pass under tracemalloc records the
+peak memory each stage allocates on top of what is already live.
+
+Results are written as JSON. With --baseline, stages that became slower
+(or allocate more) than the baseline by more than --max-regression are
+listed and the exit status is 1; differences under --min-delta-ms /
+--min-delta-kb are treated as noise.
+"""
+
+from __future__ import annotations
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.generate import FORMATS, generate
+
+STAGES = (
+    "detect",
+    "parse",
+    "dedupe",
+    "filter",
+    "top-N",
+    "stats",
+    "markdown",
+    "rich",
+)
+
+Stage = Tuple[str, Callable[[Any], Any]]
+Results = Dict[str, Dict[str, Dict[str, float]]]
+
+
+def pipeline(path: Path, top: int, threshold: int) -> List[Stage]:
+    """(stage, fn(previous result)) in the order `analyze` runs them."""
+    from rich.columns import Columns
+    from rich.console import Console
+
+    from deeptrace import utils
+    from deeptrace.core.analyzer import deduplicate_avg
+    from deeptrace.core.parsers.parser_manager import parse_as, rank_parsers
+
+    state: Dict[str, Any] = {}
+
+    def detect(_: Any) -> str:
+        return rank_parsers(path)[0][1]
+
+    def parse(fmt: str) -> Any:
+        return parse_as(path, fmt)
+
+    def top_n(table: Any) -> Any:
+        state["table"] = table
+        return table.nlargest(top)
+
+    def stats(slowest: Any) -> Any:
+        state["slowest"] = slowest
+        state["stats_all"] = utils.get_stats(state["table"])
+        state["stats"] = utils.get_stats(slowest)
+        return slowest
+
+    def markdown(slowest: Any) -> str:
+        return utils.generate_markdown_report(slowest, state["stats"])
+
+    def rich(_: Any) -> str:
+        console = Console(file=io.StringIO(), width=120)
+        utils._console = console
+        try:
+            utils.print_rich_steps_table(state["slowest"])
+            console.print(
+                Columns(
+                    [
+                        utils.make_rich_stats_table(state["stats"], "Stats (filtered)"),
+                        utils.make_rich_stats_table(state["stats_all"], "Stats (all)"),
+                    ]
+                )
+            )
+        finally:
+            utils._console = None
+        return console.file.getvalue()  # type: ignore[attr-defined]
+
+    return [
+        ("detect", detect),
+        ("parse", parse),
+        ("dedupe", deduplicate_avg),
+        ("filter", lambda table: table.filter_min_duration(threshold)),
+        ("top-N", top_n),
+        ("stats", stats),
+        ("markdown", markdown),
+        ("rich", rich),
+    ]
+
+
+def time_stages(stages: List[Stage], repeat: int) -> Dict[str, float]:
+    best = {name: float("inf") for name, _ in stages}
+    for _ in range(repeat):
+        value: Any = None
+        for name, fn in stages:
+            t0 = time.perf_counter()
+            value = fn(value)
+            best[name] = min(best[name], time.perf_counter() - t0)
+    return best
+
+
+def trace_stages(stages: List[Stage]) -> Dict[str, float]:
+    """Peak KiB allocated by each stage above the memory live before it."""
+    peaks: Dict[str, float] = {}
+    tracemalloc.start()
+    try:
+        value: Any = None
+        for name, fn in stages:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            value = fn(value)
+            peaks[name] = (tracemalloc.get_traced_memory()[1] - before) / 1024
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def log_path(
+    data_dir: Path, fmt: str, steps: int, names: int, depth: int, seed: int
+) -> Path:
+    """Generate the log unless an identical one is already in data_dir."""
+    suffix = {"har": ".har", "allure": ""}.get(fmt, ".json")
+    path = data_dir / f"{fmt}-{steps}-n{names}-d{depth}-s{seed}{suffix}"
+    if not path.exists():
+        generate(fmt, path, steps, names, depth, seed)
+    return path
+
+
+def compare(
+    current: Results,
+    baseline: Results,
+    max_regression: float,
+    min_delta_ms: float,
+    min_delta_kb: float,
+) -> List[str]:
+    """Human-readable regressions of `current` against `baseline`."""
+    floors = {"ms": min_delta_ms, "peak_kb": min_delta_kb}
+    found = []
+    for case, stages in current.items():
+        for stage, metrics in stages.items():
+            old = baseline.get(case, {}).get(stage)
+            if old is None:
+                continue
+            for metric, floor in floors.items():
+                new_v, old_v = metrics.get(metric), old.get(metric)
+                if new_v is None or old_v is None or new_v - old_v <= floor:
+                    continue
+                if new_v > old_v * (1 + max_regression):
+                    found.append(
+                        f"{case} {stage}: {metric} {old_v:.1f} -> {new_v:.1f}"
+                        f" (+{(new_v / max(old_v, 1e-9) - 1) * 100:.0f}%)"
+                    )
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    ap.add_argument("--sizes", nargs="+", type=int, default=[1_000, 10_000, 100_000])
+    ap.add_argument("--names", type=int, default=500, help="distinct step names")
+    ap.add_argument("--depth", type=int, default=3, help="allure tree depth")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--top", type=int, default=5)
+    ap.add_argument("--threshold", type=int, default=50)
+    ap.add_argument("--no-memory", action="store_true", help="skip tracemalloc pass")
+    ap.add_argument("--data-dir", type=Path, help="keep generated logs here")
+    ap.add_argument("--output", type=Path, help="write results JSON here")
+    ap.add_argument("--baseline", type=Path, help="results JSON to compare with")
+    ap.add_argument("--max-regression", type=float, default=0.25)
+    ap.add_argument("--min-delta-ms", type=float, default=5.0)
+    ap.add_argument("--min-delta-kb", type=float, default=256.0)
+    args = ap.parse_args(argv)
+
+    results: Results = {}
+    print(f"{'ms':<20}" + "".join(f"{n:>10}" for n in STAGES))
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or Path(tmp)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for fmt in args.formats:
+            for steps in args.sizes:
+                case = f"{fmt}/{steps}"
+                path = log_path(data_dir, fmt, steps, args.names, args.depth, args.seed)
+                stages = pipeline(path, args.top, args.threshold)
+                timings = time_stages(stages, args.repeat)
+                peaks = {} if args.no_memory else trace_stages(stages)
+                results[case] = {
+                    name: {"ms": round(timings[name] * 1000, 3)} for name in STAGES
+                }
+                for name, kb in peaks.items():
+                    results[case][name]["peak_kb"] = round(kb, 1)
+                row = "".join(f"{timings[n] * 1000:>10.1f}" for n in STAGES)
+                print(f"{case:<20}{row}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "names": args.names,
+            "depth": args.depth,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"results -> {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(
+            results,
+            baseline,
+            args.max_regression,
+            args.min_delta_ms,
+            args.min_delta_kb,
+        )
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"no regressions over {args.max_regression:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
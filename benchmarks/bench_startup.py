@@ -0,0 +1,113 @@
+"""
+CLI start-up budget, measured with `python -X importtime`.
+
+    python -m benchmarks.bench_startup --budget-ms 15
+
+Typer (and the rich it pulls in) is a fixed cost we do not control, so the
+budget applies to what deeptrace itself adds on top of it: typer is
+imported first and the cumulative import time of deeptrace.cli is what
+remains. The script also fails if
+a module that should stay lazy (NumPy, sqlite3, parsers, renderers) is
+imported just to build the CLI. Exit status 1 means the budget is blown.
+"""
+
+from __future__ import annotations
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+LAZY_MODULES = (
+    "numpy",
+    "sqlite3",
+    "concurrent.futures.process",
+    "deeptrace.core.models",
+    "deeptrace.core.parsers",
+    "deeptrace.utils",
+)
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_times(code: str) -> Dict[str, Tuple[int, int]]:
+    """module -> (self µs, cumulative µs) of a fresh interpreter running `code`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            times[m.group(4)] = (int(m.group(1)), int(m.group(2)))
+    return times
+
+
+def wall_time(args: List[str]) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], capture_output=True, check=True)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--budget-ms", type=float, default=15.0)
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    own: List[float] = []
+    samples: List[Dict[str, Tuple[int, int]]] = []
+    for _ in range(args.repeat):
+        times = import_times("import typer; import deeptrace.cli")
+        samples.append(times)
+        own.append(times["deeptrace.cli"][1] / 1000)
+
+    median_run = samples[own.index(sorted(own)[len(own) // 2])]
+    help_wall = statistics.median(
+        wall_time(["-m", "deeptrace.cli", "--help"]) for _ in range(args.repeat)
+    )
+    bare_wall = statistics.median(wall_time(["-c", "pass"]) for _ in range(args.repeat))
+
+    typer_ms = median_run["typer"][1] / 1000
+    print(f"{'import typer (+ rich)':<32}{typer_ms:>9.1f} ms")
+    print(f"{'import deeptrace.cli on top':<32}{statistics.median(own):>9.1f} ms")
+    print(f"{'deeptrace --help (wall)':<32}{help_wall * 1000:>9.1f} ms")
+    print(f"{'python -c pass (wall)':<32}{bare_wall * 1000:>9.1f} ms")
+
+    print(f"\nslowest deeptrace modules (self time, top {args.top}):")
+    ours = sorted(
+        (
+            (s, name)
+            for name, (s, _) in median_run.items()
+            if name.startswith("deeptrace")
+        ),
+        reverse=True,
+    )
+    for self_us, name in ours[: args.top]:
+        print(f"  {name:<40}{self_us / 1000:>7.2f} ms")
+
+    eager = [
+        name
+        for name in median_run
+        if any(name == m or name.startswith(m + ".") for m in LAZY_MODULES)
+    ]
+    failed = False
+    if eager:
+        print(f"\nFAIL: imported at start-up: {', '.join(sorted(eager))}")
+        failed = True
+    if statistics.median(own) > args.budget_ms:
+        print(f"\nFAIL: deeptrace start-up exceeds {args.budget_ms:.0f} ms budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"\nOK: within {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Deterministic synthetic logs for the benchmarks.
+
+    python -m benchmarks.generate allure out/allure-results --steps 1000000 \
+        --names 500 --depth 4
+
+The same (format, steps, names, depth, seed) always produces byte-identical
+output. Step names are drawn from `names` distinct values and each name has
+its own typical duration, so deduplication and percentiles see realistic
+distributions. Files are written incrementally: 10^7 steps never sit in
+memory at once.
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+FORMATS = ("playwright", "selenium", "har", "allure")
+
+# result files an allure tree is split into: steps per file
+ALLURE_STEPS_PER_FILE = 100
+
+_BLOCK = 10_000
+_EPOCH = datetime(2024, 5, 15, 13, 0, tzinfo=timezone.utc)
+
+
+class _Durations:
+    """Step name -> duration draws; every name has its own log-normal scale."""
+
+    def __init__(self, rng: random.Random, names: int) -> None:
+        self.rng = rng
+        self.names = [f"step-{i:05d}" for i in range(names)]
+        self.scale = [rng.lognormvariate(4.0, 1.0) for _ in range(names)]
+
+    def draw(self) -> Tuple[str, int]:
+        i = self.rng.randrange(len(self.names))
+        return self.names[i], max(
+            int(self.scale[i] * self.rng.lognormvariate(0, 0.3)), 1
+        )
+
+
+def _flat_events(steps: int, names: int, seed: int) -> Iterator[Tuple[str, int, int]]:
+    """(name, start ms, duration ms) of sequential steps."""
+    durations = _Durations(random.Random(seed), names)
+    t = 0
+    for _ in range(steps):
+        name, took = durations.draw()
+        yield name, t, took
+        t += took + durations.rng.randrange(5)
+
+
+def _write_array(
+    path: Path, prefix: str, items: Iterator[Dict[str, Any]], suffix: str
+) -> None:
+    """Stream prefix + comma-separated JSON items + suffix to disk."""
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write(prefix)
+        sep = ""
+        while True:
+            block = [json.dumps(item) for _, item in zip(range(_BLOCK), items)]
+            if not block:
+                break
+            fh.write(sep + ",\n".join(block))
+            sep = ",\n"
+        fh.write(suffix)
+
+
+def write_playwright(path: Path, steps: int, names: int = 100, seed: int = 0) -> Path:
+    """{"actions": [{name, startTime, endTime}, ...]}"""
+    items = (
+        {"name": name, "selector": f"#el-{t % 97}", "startTime": t, "endTime": t + d}
+        for name, t, d in _flat_events(steps, names, seed)
+    )
+    _write_array(path, '{"actions": [', items, "]}\n")
+    return path
+
+
+def write_selenium(path: Path, steps: int, names: int = 100, seed: int = 0) -> Path:
+    """{"seleniumEvents": [{eventName, timestamp, duration}, ...]}"""
+    items = (
+        {"eventName": name, "timestamp": t, "duration": d}
+        for name, t, d in _flat_events(steps, names, seed)
+    )
+    _write_array(path, '{"seleniumEvents": [', items, "]}\n")
+    return path
+
+
+def write_har(path: Path, steps: int, names: int = 100, seed: int = 0) -> Path:
+    """HAR 1.2 with one entry per step; the URL path carries the name."""
+
+    def entries() -> Iterator[Dict[str, Any]]:
+        for name, t, d in _flat_events(steps, names, seed):
+            started = _EPOCH + timedelta(milliseconds=t)
+            yield {
+                "startedDateTime": started.isoformat(timespec="milliseconds"),
+                "time": d,
+                "request": {"method": "GET", "url": f"https://app.test/api/{name}"},
+                "response": {"status": 200},
+            }
+
+    prefix = '{"log": {"version": "1.2", "creator": {"name": "bench"}, "entries": ['
+    _write_array(path, prefix, entries(), "]}}\n")
+    return path
+
+
+def _allure_steps(
+    durations: _Durations,
+    budget: int,
+    levels: int,
+    fanout: int,
+    start: int,
+    top: bool = False,
+) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Up to `budget` sequential steps, at most `fanout` of them unless `top`,
+    each with children nested `levels` deeper. Returns (steps, number of
+    steps including children, end time).
+    """
+    out: List[Dict[str, Any]] = []
+    used, t = 0, start
+    while used < budget and (top or len(out) < fanout):
+        name, took = durations.draw()
+        node: Dict[str, Any] = {"name": name, "status": "passed", "start": t}
+        used += 1
+        end = t + took
+        if levels and used < budget:
+            kids, n, kids_end = _allure_steps(
+                durations, budget - used, levels - 1, fanout, t
+            )
+            node["steps"] = kids
+            used += n
+            end = max(end, kids_end)
+        node["stop"] = end
+        out.append(node)
+        t = end + durations.rng.randrange(5)
+    return out, used, t
+
+
+def write_allure(
+    path: Path,
+    steps: int,
+    names: int = 100,
+    seed: int = 0,
+    depth: int = 3,
+    per_file: int = ALLURE_STEPS_PER_FILE,
+) -> Path:
+    """
+    allure-results directory of *-result.json files, `per_file` steps each,
+    nested `depth` levels deep (1 = flat).
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    durations = _Durations(random.Random(seed), names)
+    fanout = max(round(per_file ** (1 / max(depth, 1))), 2)
+    t, written, index = 0, 0, 0
+    while written < steps:
+        budget = min(per_file, steps - written)
+        tree, used, end = _allure_steps(
+            durations, budget, depth - 1, fanout, t, top=True
+        )
+        result = {
+            "uuid": f"{seed:04x}-{index:012x}",
+            "name": f"test_{index}",
+            "status": "passed",
+            "start": t,
+            "stop": end,
+            "steps": tree,
+        }
+        (path / f"{seed:04x}-{index:012x}-result.json").write_text(
+            json.dumps(result), encoding="utf-8"
+        )
+        t, written, index = end, written + used, index + 1
+    return path
+
+
+WRITERS: Dict[str, Callable[..., Path]] = {
+    "playwright": write_playwright,
+    "selenium": write_selenium,
+    "har": write_har,
+    "allure": write_allure,
+}
+
+
+def generate(
+    fmt: str, path: Path, steps: int, names: int = 100, depth: int = 3, seed: int = 0
+) -> Path:
+    """Write a log of `fmt` (see FORMATS) with exactly `steps` steps."""
+    if fmt == "allure":
+        return write_allure(path, steps, names, seed, depth)
+    return WRITERS[fmt](path, steps, names, seed)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("format", choices=FORMATS)
+    ap.add_argument("path", type=Path)
+    ap.add_argument("--steps", type=int, default=100_000)
+    ap.add_argument("--names", type=int, default=100)
+    ap.add_argument("--depth", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    generate(args.format, args.path, args.steps, args.names, args.depth, args.seed)
+    print(f"{args.format}: {args.steps} steps -> {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import logging
+
+# library code logs, the application decides where it goes (the CLI prints
+# warnings, see deeptrace.cli); without this Python's last-resort handler
+# would write them to stderr
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -0,0 +1,610 @@
+"""
+Library entry points: what `deeptrace analyze`, `compare`, `merge` and
+`variance` do, returning result objects instead of printing.
+analyze_batch() aggregates whole trees of logs in mixed formats.
+
+Nothing here prints or imports rich. Parser errors and skipped inputs go to
+the "deeptrace" logger, which is silent until the application configures
+logging. Rendering is up to the caller; the CLI passes the results to the
+renderers in deeptrace.utils.
+
+    results = deeptrace.api.analyze(["run1.json", "run2.har"], top=10)
+    results = await deeptrace.api.analyze_async(uploads, concurrency=4)
+
+The async variants run the parsing in an executor (the loop's default
+thread pool unless one is given; a ProcessPoolExecutor sidesteps the GIL
+for large logs), so many uploads can be processed concurrently.
+"""
+
+from __future__ import annotations
+import asyncio
+import os
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from deeptrace.core.canonical import Canonicalizer
+from deeptrace.core.defaults import (
+    DEFAULT_ACCURACY,
+    DEFAULT_ALPHA,
+    DEFAULT_CV_LIMIT,
+    DEFAULT_MIN_EFFECT,
+)
+from deeptrace.core.groupby import RANK_KEYS, GroupBy
+from deeptrace.core.models import Step, StepTable
+from deeptrace.core.pushdown import StepFilter
+from deeptrace.utils import Summary, summarize
+
+if TYPE_CHECKING:
+    from deeptrace.core.batch import FileResult
+    from deeptrace.core.cache import StepCache
+    from deeptrace.core.comparison import StepDiff
+    from deeptrace.core.variance import RunResult, RunVariance, VarianceStats
+
+__all__ = [
+    "AnalysisError",
+    "AnalysisResult",
+    "BatchResult",
+    "ComparisonResult",
+    "VarianceResult",
+    "analyze",
+    "analyze_async",
+    "analyze_batch",
+    "compare",
+    "compare_async",
+    "merge",
+    "variance",
+]
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# shared by calls that do not pass their own: the memo carries over
+_DEFAULT_CANON = Canonicalizer()
+
+
+class AnalysisError(ValueError):
+    """The inputs cannot be analysed (unknown or undetectable format)."""
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """
+    One analysed log. `averages` holds one row per step name with the
+    `rank_by` metric as its duration (start_ms = 0; the average unless
+    asked otherwise) that passed `threshold`, `slowest` the `top` of them.
+    `groups` keeps the full per-name statistics when ranking by anything
+    but the average or when asked to (keep_groups). On failure `format` is
+    None and `error` says why.
+    """
+
+    path: Path
+    format: Optional[str]
+    averages: StepTable = field(default_factory=StepTable)
+    slowest: List[Step] = field(default_factory=list)
+    summary: Summary = field(default_factory=Summary)
+    slowest_summary: Summary = field(default_factory=Summary)
+    groups: Optional[GroupBy] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(slots=True)
+class ComparisonResult:
+    """A/B comparison: one StepDiff per step name, largest |effect| first."""
+
+    format: str
+    diffs: List[StepDiff]
+    summary_a: Summary
+    summary_b: Summary
+
+
+@dataclass(slots=True)
+class FormatSummary:
+    """Files of one format in a batch: how many, their steps, parse time."""
+
+    format: str
+    files: int = 0
+    steps: int = 0
+    seconds: float = 0.0
+    errors: int = 0
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """
+    analyze_batch(): `result` aggregates every recognised file (its
+    `groups` are the merged per-name statistics), `files` has one
+    core.batch.FileResult per file in completion order, `missing` the
+    arguments that matched nothing.
+    """
+
+    result: AnalysisResult
+    files: List[FileResult]
+    missing: List[str] = field(default_factory=list)
+
+    def by_format(self) -> Dict[str, FormatSummary]:
+        """Per-format totals, largest step count first; "?" = unrecognised."""
+        out: Dict[str, FormatSummary] = {}
+        for f in self.files:
+            fmt = f.format or "?"
+            row = out.get(fmt)
+            if row is None:
+                row = out[fmt] = FormatSummary(fmt)
+            row.files += 1
+            row.steps += f.steps
+            row.seconds += f.seconds
+            row.errors += f.error is not None
+        return dict(sorted(out.items(), key=lambda item: -item[1].steps))
+
+
+@dataclass(slots=True)
+class VarianceResult:
+    """
+    variance(): `steps` has the (name, VarianceStats) that qualify, least
+    stable by `rank_by` first, `unstable` the names among them over the
+    CV limit or bimodal. `stats` aggregates every step of every run,
+    `runs` has one core.variance.RunResult per run in completion order,
+    `missing` the arguments that matched nothing.
+    """
+
+    formats: List[str]
+    steps: List[Tuple[str, VarianceStats]]
+    unstable: List[str]
+    stats: RunVariance
+    runs: List[RunResult]
+    missing: List[str] = field(default_factory=list)
+
+
+def _check_format(fmt: Optional[str]) -> None:
+    from deeptrace.core.registry import available_parsers
+
+    if fmt is not None and fmt not in available_parsers():
+        raise AnalysisError(
+            f"Unknown format {fmt!r}, available: {', '.join(available_parsers())}"
+        )
+
+
+def _paths(paths: Union[PathLike, Iterable[PathLike]]) -> List[Path]:
+    if isinstance(paths, (str, os.PathLike)):
+        return [Path(paths)]
+    return [Path(p) for p in paths]
+
+
+def _analyze_path(
+    path: Path,
+    top: int,
+    threshold: Optional[int],
+    percentiles: Sequence[int],
+    exact: Optional[bool],
+    relative_accuracy: float,
+    self_time: bool,
+    rank_by: str,
+    keep_groups: bool,
+    fmt: Optional[str],
+    where: Optional[StepFilter],
+    canon: Optional[Canonicalizer],
+    cache: Optional[StepCache],
+) -> AnalysisResult:
+    from deeptrace.core.analyzer import StreamingAverages, deduplicate_avg, self_times
+    from deeptrace.core.parsers.parser_manager import (
+        detect_and_parse,
+        load_steps,
+        stream_steps,
+    )
+    from deeptrace.core.profiling import phase
+    from deeptrace.core.pushdown import feed
+
+    steps: StepTable = StepTable()
+    # per-name state built while parsing: memory follows the number of
+    # names, not of steps (the full table is only kept to fill the cache);
+    # plain averages are cheaper than the full GroupBy statistics
+    groups = (
+        GroupBy(rank_by, relative_accuracy) if keep_groups or rank_by != "avg" else None
+    )
+    averages: Optional[Union[StreamingAverages, GroupBy]] = None
+    with phase("load"):
+        if self_time:
+            # self-time needs the step hierarchy, which the cache does not keep
+            found, raw = detect_and_parse(path, fmt, canon)
+            averages = groups or StreamingAverages()
+            feed(
+                (
+                    Step(s.name, s.start_ms, s.start_ms + t)
+                    for s, t in zip(raw, self_times(raw))
+                ),
+                averages,
+                where,
+            )
+        elif where or cache is None:
+            averages = groups or StreamingAverages()
+            found = stream_steps(path, averages, fmt, where, cache, canon)
+        else:
+            found, steps = load_steps(path, cache, fmt, canon)
+    if not found:
+        return AnalysisResult(path, None, error="Failed to detect format")
+
+    with phase("dedupe"):
+        if averages is not None:
+            table = averages.table()
+        elif groups is not None:
+            table = groups.update(steps).table()
+        else:
+            table = deduplicate_avg(steps)
+    return _ranked(
+        path,
+        found,
+        table,
+        groups,
+        top,
+        threshold,
+        percentiles,
+        exact,
+        relative_accuracy,
+    )
+
+
+def _ranked(
+    path: Path,
+    found: str,
+    table: StepTable,
+    groups: Optional[GroupBy],
+    top: int,
+    threshold: Optional[int],
+    percentiles: Sequence[int],
+    exact: Optional[bool],
+    relative_accuracy: float,
+) -> AnalysisResult:
+    from deeptrace.core.profiling import phase
+
+    if threshold is not None:
+        with phase("filter"):
+            table = table.filter_min_duration(threshold)
+    with phase("top-N"):
+        slowest = table.nlargest(top)
+    with phase("stats"):
+        summary = summarize(
+            table, percentiles, exact=exact, relative_accuracy=relative_accuracy
+        )
+        slowest_summary = summarize(slowest, percentiles)
+    return AnalysisResult(
+        path, found, table, list(slowest), summary, slowest_summary, groups
+    )
+
+
+def _check_rank_key(rank_by: str) -> None:
+    if rank_by not in RANK_KEYS:
+        raise AnalysisError(
+            f"Unknown rank key {rank_by!r}, available: {', '.join(RANK_KEYS)}"
+        )
+
+
+def analyze(
+    paths: Union[PathLike, Iterable[PathLike]],
+    *,
+    top: int = 5,
+    threshold: Optional[int] = None,
+    percentiles: Sequence[int] = (95, 99),
+    exact: Optional[bool] = None,
+    relative_accuracy: float = DEFAULT_ACCURACY,
+    self_time: bool = False,
+    rank_by: str = "avg",
+    keep_groups: bool = False,
+    fmt: Optional[str] = None,
+    where: Optional[StepFilter] = None,
+    canon: Optional[Canonicalizer] = _DEFAULT_CANON,
+    cache: Optional[StepCache] = None,
+) -> List[AnalysisResult]:
+    """
+    One AnalysisResult per path, in order; a path whose format cannot be
+    detected gets a failed result instead of an exception. `rank_by` is a
+    core.groupby.RANK_KEYS metric, `keep_groups` keeps the GroupBy even
+    for avg (e.g. to save it with core.partial), `fmt` skips
+    autodetection, `where` filters steps while parsing, `canon=None` keeps
+    raw step names and `cache` is an optional core.cache.StepCache.
+    """
+    _check_format(fmt)
+    _check_rank_key(rank_by)
+    return [
+        _analyze_path(
+            path,
+            top,
+            threshold,
+            percentiles,
+            exact,
+            relative_accuracy,
+            self_time,
+            rank_by,
+            keep_groups,
+            fmt,
+            where,
+            canon,
+            cache,
+        )
+        for path in _paths(paths)
+    ]
+
+
+def compare(
+    runs_a: Union[PathLike, Iterable[PathLike]],
+    runs_b: Union[PathLike, Iterable[PathLike]],
+    *,
+    alpha: float = DEFAULT_ALPHA,
+    min_effect: float = DEFAULT_MIN_EFFECT,
+    exact: Optional[bool] = None,
+    jobs: Optional[int] = None,
+    fmt: Optional[str] = None,
+    canon: Optional[Canonicalizer] = _DEFAULT_CANON,
+    cache: Optional[StepCache] = None,
+) -> ComparisonResult:
+    """
+    Compare the runs of set A with those of set B (Mann-Whitney U with
+    Cliff's delta per step name, see core.comparison). Raises
+    AnalysisError when a run cannot be parsed or the formats differ.
+    """
+    from deeptrace.core.analyzer import deduplicate_avg
+    from deeptrace.core.comparison import compare_runs
+    from deeptrace.core.parsers.parser_manager import load_many
+    from deeptrace.core.profiling import phase
+
+    _check_format(fmt)
+    paths_a, paths_b = _paths(runs_a), _paths(runs_b)
+    for label, runs in (("A", paths_a), ("B", paths_b)):
+        if not runs:
+            raise AnalysisError(f"No runs given for {label}")
+
+    with phase("load"):
+        loaded = load_many(paths_a + paths_b, cache, jobs, fmt, canon)
+    formats = {found for found, _ in loaded}
+    if None in formats:
+        bad = [str(p) for p, (found, _) in zip(paths_a + paths_b, loaded) if not found]
+        raise AnalysisError(f"Could not detect format: {', '.join(bad)}")
+    if len(formats) > 1:
+        raise AnalysisError(f"Format mismatch: {', '.join(sorted(map(str, formats)))}")
+
+    tables_a = [t for _, t in loaded[: len(paths_a)]]
+    tables_b = [t for _, t in loaded[len(paths_a) :]]
+    with phase("compare"):
+        diffs = compare_runs(tables_a, tables_b, alpha=alpha, min_effect=min_effect)
+    with phase("stats"):
+        summary_a = summarize(deduplicate_avg(StepTable.concat(tables_a)), exact=exact)
+        summary_b = summarize(deduplicate_avg(StepTable.concat(tables_b)), exact=exact)
+    return ComparisonResult(str(formats.pop()), diffs, summary_a, summary_b)
+
+
+def merge(
+    partials: Union[PathLike, Iterable[PathLike]],
+    *,
+    top: int = 5,
+    threshold: Optional[int] = None,
+    percentiles: Sequence[int] = (95, 99),
+    exact: Optional[bool] = None,
+    rank_by: str = "avg",
+) -> AnalysisResult:
+    """
+    analyze() over the shards whose partial aggregates (core.partial,
+    `analyze --emit-partial`) are given, without their logs. `path` of the
+    result is the first partial, `format` the formats of all of them.
+    Raises AnalysisError for unreadable or incompatible partials.
+    """
+    from deeptrace.core.partial import merge_partials
+    from deeptrace.core.profiling import phase
+
+    _check_rank_key(rank_by)
+    paths = _paths(partials)
+    if not paths:
+        raise AnalysisError("No partials given")
+    with phase("merge"):
+        try:
+            formats, groups = merge_partials(paths, rank_by)
+        except ValueError as exc:
+            raise AnalysisError(str(exc)) from None
+    return _ranked(
+        paths[0],
+        ", ".join(formats),
+        groups.table(),
+        groups,
+        top,
+        threshold,
+        percentiles,
+        exact,
+        groups.relative_accuracy,
+    )
+
+
+def analyze_batch(
+    paths: Union[PathLike, Iterable[PathLike]],
+    *,
+    top: int = 5,
+    threshold: Optional[int] = None,
+    percentiles: Sequence[int] = (95, 99),
+    exact: Optional[bool] = None,
+    relative_accuracy: float = DEFAULT_ACCURACY,
+    rank_by: str = "avg",
+    fmt: Optional[str] = None,
+    where: Optional[StepFilter] = None,
+    canon: Optional[Canonicalizer] = _DEFAULT_CANON,
+    jobs: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    progress: Optional[Callable[[FileResult], None]] = None,
+) -> BatchResult:
+    """
+    One aggregate over every file under `paths` (files, directories walked
+    recursively, glob patterns), each file classified on its own, see
+    core.batch. Files are parsed in a pool of `jobs` processes (or
+    `executor`) and merged as they complete; `progress` is called with
+    every FileResult. Raises AnalysisError when no file is recognised.
+    """
+    from deeptrace.core.batch import discover, parse_files
+    from deeptrace.core.profiling import phase
+
+    _check_format(fmt)
+    _check_rank_key(rank_by)
+    args = [str(p) for p in _paths(paths)]
+    missing: List[str] = []
+    groups = GroupBy(rank_by, relative_accuracy)
+    files: List[FileResult] = []
+    formats: List[str] = []
+    with phase("load"):
+        for f in parse_files(
+            discover(args, missing),
+            groups,
+            fmt=fmt,
+            where=where,
+            canon=canon,
+            jobs=jobs,
+            executor=executor,
+        ):
+            if progress is not None:
+                progress(f)
+            if f.format and not f.error and f.format not in formats:
+                formats.append(f.format)
+            files.append(f)
+    if not files and missing:
+        raise AnalysisError(f"No such file or no match: {', '.join(missing)}")
+    if not formats:
+        raise AnalysisError(
+            f"No recognised logs in {', '.join(args)} ({len(files)} file(s))"
+        )
+    result = _ranked(
+        Path(args[0]),
+        ", ".join(sorted(formats)),
+        groups.table(),
+        groups,
+        top,
+        threshold,
+        percentiles,
+        exact,
+        relative_accuracy,
+    )
+    return BatchResult(result, files, missing)
+
+
+def variance(
+    paths: Union[PathLike, Iterable[PathLike]],
+    *,
+    min_runs: int = 3,
+    threshold: Optional[float] = None,
+    rank_by: str = "cv",
+    cv_limit: float = DEFAULT_CV_LIMIT,
+    fmt: Optional[str] = None,
+    where: Optional[StepFilter] = None,
+    canon: Optional[Canonicalizer] = _DEFAULT_CANON,
+    jobs: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    progress: Optional[Callable[[RunResult], None]] = None,
+) -> VarianceResult:
+    """
+    Run-to-run instability of every step over the runs under `paths` (log
+    files, Allure directories, directories of runs, glob patterns), see
+    core.variance. Each run is parsed in a pool of `jobs` processes (or
+    `executor`) and folded in as it completes, so memory does not grow
+    with the number of runs. Steps seen in fewer than `min_runs` runs or
+    with a mean under `threshold` ms are left out; `progress` is called
+    with every RunResult.
+    """
+    from deeptrace.core.batch import bounded_map
+    from deeptrace.core.profiling import phase
+    from deeptrace.core.variance import (
+        BIMODAL_SCORE,
+        VARIANCE_KEYS,
+        RunVariance,
+        discover_runs,
+        parse_run,
+    )
+
+    _check_format(fmt)
+    if rank_by not in VARIANCE_KEYS:
+        raise AnalysisError(
+            f"Unknown rank key {rank_by!r}, available: {', '.join(VARIANCE_KEYS)}"
+        )
+    args = [str(p) for p in _paths(paths)]
+    missing: List[str] = []
+    stats = RunVariance()
+    runs: List[RunResult] = []
+    formats: List[str] = []
+    with phase("load"):
+        for run in bounded_map(
+            partial(parse_run, fmt=fmt, where=where, canon=canon),
+            discover_runs(args, missing),
+            jobs=jobs,
+            executor=executor,
+        ):
+            if run.format and run.means is not None:
+                stats.add_run(run.means)
+                run.means = None
+                if run.format not in formats:
+                    formats.append(run.format)
+            if progress is not None:
+                progress(run)
+            runs.append(run)
+    if not runs and missing:
+        raise AnalysisError(f"No such file or no match: {', '.join(missing)}")
+    if stats.runs < max(min_runs, 2):
+        raise AnalysisError(
+            f"Variance needs at least {max(min_runs, 2)} runs, "
+            f"{stats.runs} recognised in {', '.join(args)}"
+        )
+    with phase("rank"):
+        steps = stats.ranked(rank_by, min_runs, threshold)
+        unstable = [
+            name
+            for name, st in steps
+            if st.cv >= cv_limit or st.bimodality >= BIMODAL_SCORE
+        ]
+    return VarianceResult(sorted(formats), steps, unstable, stats, runs, missing)
+
+
+async def analyze_async(
+    paths: Union[PathLike, Iterable[PathLike]],
+    *,
+    executor: Optional[Executor] = None,
+    concurrency: Optional[int] = None,
+    **options: Any,
+) -> List[AnalysisResult]:
+    """
+    analyze() with every path parsed in `executor`, at most `concurrency`
+    at a time (unbounded by default). Takes the same keyword options.
+    """
+    _check_format(options.get("fmt"))
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(concurrency) if concurrency else None
+
+    async def one(path: Path) -> AnalysisResult:
+        call = partial(analyze, path, **options)
+        if limit is None:
+            results = await loop.run_in_executor(executor, call)
+        else:
+            async with limit:
+                results = await loop.run_in_executor(executor, call)
+        return results[0]
+
+    return list(await asyncio.gather(*(one(p) for p in _paths(paths))))
+
+
+async def compare_async(
+    runs_a: Union[PathLike, Iterable[PathLike]],
+    runs_b: Union[PathLike, Iterable[PathLike]],
+    *,
+    executor: Optional[Executor] = None,
+    **options: Any,
+) -> ComparisonResult:
+    """compare() run in `executor`. Takes the same keyword options."""
+    loop = asyncio.get_running_loop()
+    call = partial(compare, _paths(runs_a), _paths(runs_b), **options)
+    return await loop.run_in_executor(executor, call)
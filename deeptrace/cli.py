@@ -1,10 +1,49 @@
-from deeptrace.commands import analyze, compare
+# Command modules import their heavy dependencies (rich renderers, parsers,
+# NumPy, sqlite) inside the command body, so building the CLI stays cheap.
+import logging
+import sys
+
+from deeptrace.commands import (
+    analyze,
+    compare,
+    har,
+    ingest,
+    merge,
+    serve,
+    trend,
+    variance,
+    watch,
+)
 import typer
 
 app = typer.Typer()
 
+# the library logs parser errors and skipped inputs; the CLI shows them
+_log_handler = logging.StreamHandler(sys.stderr)
+_log_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+
+
+@app.callback()
+def _setup() -> None:
+    logger = logging.getLogger("deeptrace")
+    if _log_handler not in logger.handlers:
+        logger.addHandler(_log_handler)
+
+
 app.command(name="analyze")(analyze.analyze)
 app.command(name="compare")(compare.compare)
+app.command(name="har")(har.har)
+app.command(name="ingest")(ingest.ingest)
+app.command(name="merge")(merge.merge)
+app.command(name="serve")(serve.serve)
+app.command(name="trend")(trend.trend)
+app.command(name="variance")(variance.variance)
+app.command(name="watch")(watch.watch)
 
-if __name__ == "__main__":
+
+def main() -> None:
     app()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,472 @@
 from __future__ import annotations
-import heapq
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import typer
-from rich.columns import Columns
-from rich.console import Console
 
-from deeptrace.core.analyzer import deduplicate_avg
-from deeptrace.core.parsers.parser_manager import autodetect_parser
-from deeptrace.utils import (
-    generate_markdown_report,
-    get_report_path,
-    get_stats,
-    make_rich_stats_table,
-    print_rich_steps_table,
-)
+from deeptrace.core.defaults import DEFAULT_ACCURACY
 
-console = Console()
+if TYPE_CHECKING:
+    from deeptrace.core.canonical import Canonicalizer
+    from deeptrace.core.pushdown import StepFilter
 
 
 def analyze(
-    log: Path = typer.Argument(
-        ..., dir_okay=True, exists=True, help="Файл лога или директория allure-results"
+    logs: List[Path] = typer.Argument(
+        ...,
+        help="Файлы логов, директории (обходятся рекурсивно) или glob-шаблоны",
     ),
     top: int = typer.Option(5, "--top", "-n", help="Показать N самых долгих шагов"),
     threshold: Optional[int] = typer.Option(
         None, "--threshold", "-t", help="Фильтр по минимальной длительности, ms"
     ),
     report: Optional[Path] = typer.Option(
-        None, "--report", "-r", help="Директория для сохранения отчёта .md"
+        None, "--report", "-r", help="Директория для сохранения отчёта"
+    ),
+    report_format: str = typer.Option(
+        "md", "--report-format", help="Формат отчёта: md, json или csv"
+    ),
+    report_name: Optional[str] = typer.Option(
+        None,
+        "--report-name",
+        help="Имя файла отчёта (по умолчанию report-<дата-время>.<формат>)",
+    ),
+    emit_partial: Optional[Path] = typer.Option(
+        None,
+        "--emit-partial",
+        help="Сохранить частичный агрегат для deeptrace merge (без сырых шагов)",
     ),
     percentiles: List[int] = typer.Option(
         (95, 99), "--percentiles", "-p", help="Доп. перцентили, напр. -p 90 -p 99"
     ),
+    self_time: bool = typer.Option(
+        False, "--self-time", help="Учитывать собственное время шага (без дочерних)"
+    ),
+    rank_by: str = typer.Option(
+        "avg",
+        "--rank-by",
+        help="Ранжировать шаги по avg, p50, p90, p95, p99, max или total",
+    ),
+    critical_path: bool = typer.Option(
+        False,
+        "--critical-path",
+        help="Ранжировать шаги по вкладу в общее время прогона с учётом параллельности",
+    ),
+    exact: bool = typer.Option(
+        False, "--exact", help="Точные перцентили (сортировка всех значений)"
+    ),
+    accuracy: float = typer.Option(
+        DEFAULT_ACCURACY,
+        "--sketch-accuracy",
+        help="Относительная погрешность приближённых перцентилей",
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Не использовать кэш разобранных логов"
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None, "--cache-dir", help="Каталог кэша (по умолчанию ~/.cache/deeptrace)"
+    ),
+    log_format: Optional[str] = typer.Option(
+        None, "--format", "-f", help="Формат лога без автоопределения, напр. allure"
+    ),
+    raw_names: bool = typer.Option(
+        False,
+        "--raw-names",
+        help="Не приводить имена шагов к шаблонам (id, uuid, query)",
+    ),
+    name_rules: List[str] = typer.Option(
+        [],
+        "--name-rule",
+        help="Правило переименования шагов REGEX=ЗАМЕНА (повторяемая)",
+    ),
+    min_step: Optional[int] = typer.Option(
+        None,
+        "--min-step-ms",
+        help="Отбрасывать при разборе отдельные шаги короче N ms",
+    ),
+    include: List[str] = typer.Option(
+        [], "--include", "-i", help="Только шаги с именем по glob-шаблону (повторяемая)"
+    ),
+    exclude: List[str] = typer.Option(
+        [], "--exclude", "-x", help="Исключить шаги по glob-шаблону (повторяемая)"
+    ),
+    since: Optional[int] = typer.Option(
+        None, "--since", help="Только шаги, начавшиеся не раньше, ms (часы лога)"
+    ),
+    until: Optional[int] = typer.Option(
+        None, "--until", help="Только шаги, начавшиеся не позже, ms (часы лога)"
+    ),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", help="Число процессов для разбора многих файлов"
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Показать время фаз, попытки парсеров и память"
+    ),
+    profile_json: Optional[Path] = typer.Option(
+        None, "--profile-json", help="Сохранить профиль в JSON (включает --profile)"
+    ),
+    pstats: Optional[Path] = typer.Option(
+        None, "--pstats", help="Дамп cProfile для pstats/snakeviz (включает --profile)"
+    ),
 ):
-    console.print("[yellow]Detecting log format...[/]")
-    fmt, steps = autodetect_parser(log)
+    from deeptrace.core import profiling
+    from deeptrace.core.canonical import from_options
+    from deeptrace.core.pushdown import StepFilter
+
+    where = StepFilter(min_step, tuple(include), tuple(exclude), since, until)
+    try:
+        canon = from_options(raw_names, name_rules)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--name-rule")
+    from deeptrace.core.batch import is_allure_dir
+
+    log = logs[0]
+    if len(logs) > 1 or not (log.is_file() or is_allure_dir(log)):
+        with profiling.session("analyze", profile, profile_json, pstats):
+            _analyze_batch(
+                logs,
+                top,
+                threshold,
+                report,
+                report_format,
+                report_name,
+                emit_partial,
+                percentiles,
+                self_time or critical_path,
+                rank_by,
+                exact,
+                accuracy,
+                jobs,
+                log_format,
+                where,
+                canon,
+            )
+        return
+    with profiling.session("analyze", profile, profile_json, pstats):
+        _analyze(
+            log,
+            top,
+            threshold,
+            report,
+            report_format,
+            report_name,
+            emit_partial,
+            percentiles,
+            self_time,
+            rank_by,
+            critical_path,
+            exact,
+            accuracy,
+            no_cache,
+            cache_dir,
+            log_format,
+            where,
+            canon,
+        )
+
+
+def _analyze(
+    log: Path,
+    top: int,
+    threshold: Optional[int],
+    report: Optional[Path],
+    report_format: str,
+    report_name: Optional[str],
+    emit_partial: Optional[Path],
+    percentiles: List[int],
+    self_time: bool,
+    rank_by: str,
+    critical_path: bool,
+    exact: bool,
+    accuracy: float,
+    no_cache: bool,
+    cache_dir: Optional[Path],
+    log_format: Optional[str],
+    where: StepFilter,
+    canon: Optional[Canonicalizer],
+) -> None:
+    # heavy modules are imported here, not at CLI start-up
+    from deeptrace.api import AnalysisError, analyze as analyze_logs
+    from deeptrace.core import profiling
+    from deeptrace.core.cache import StepCache
+    from deeptrace.core.profiling import phase
+    from deeptrace.daemon import DaemonError, connect
+    from deeptrace.core.registry import available_parsers
+    from deeptrace.reports import REPORT_FORMATS, open_report, write_analyze_report
+    from deeptrace.utils import get_console, get_report_path, print_rich_analysis
+
+    console = get_console()
+    if log_format is not None and log_format not in available_parsers():
+        console.print(
+            f"[red]Unknown format {log_format!r}, "
+            f"available: {', '.join(available_parsers())}[/]"
+        )
+        raise typer.Exit(1)
+
+    if report_format not in REPORT_FORMATS:
+        console.print(
+            f"[red]Unknown report format {report_format!r}, "
+            f"available: {', '.join(REPORT_FORMATS)}[/]"
+        )
+        raise typer.Exit(1)
+
+    if self_time and critical_path:
+        console.print("[red]--self-time and --critical-path cannot be combined[/]")
+        raise typer.Exit(1)
+
+    if emit_partial and critical_path:
+        console.print("[red]--emit-partial and --critical-path cannot be combined[/]")
+        raise typer.Exit(1)
+
+    if log_format is None:
+        console.print("[yellow]Detecting log format...[/]")
+    if critical_path:
+        _critical_path(
+            log,
+            log_format,
+            top,
+            threshold,
+            report,
+            report_format,
+            report_name,
+            where,
+            canon,
+        )
+        return
+    # a running `deeptrace serve` answers from memory; profiles, partials and
+    # explicit cache options need the work done here
+    local = emit_partial or profiling.active() or no_cache or cache_dir
+    client = None if local else connect()
+    run = analyze_logs if client is None else client.analyze
+    try:
+        (result,) = run(
+            log,
+            top=top,
+            threshold=threshold,
+            percentiles=percentiles,
+            exact=exact or None,
+            relative_accuracy=accuracy,
+            self_time=self_time,
+            rank_by=rank_by,
+            keep_groups=emit_partial is not None,
+            fmt=log_format,
+            where=where,
+            canon=canon,
+            cache=None if no_cache else StepCache(cache_dir),
+        )
+    except (AnalysisError, DaemonError) as exc:
+        console.print(f"[red]{exc}[/]")
+        raise typer.Exit(1)
+    finally:
+        if client is not None:
+            client.close()
+    if not result.ok:
+        console.print(f"[red]{result.error}[/]")
+        raise typer.Exit(1)
+
+    console.print(f"[green]Detected format: {result.format}[/]")
+    if emit_partial and result.groups is not None and result.format:
+        from deeptrace.core.partial import save_partial
+
+        # before the threshold: the partial aggregates every step name
+        with phase("partial"):
+            save_partial(emit_partial, result.format, result.groups)
+        console.print(f"Partial saved → {emit_partial}")
+    if not result.averages:
+        console.print("No steps match given threshold")
+        raise typer.Exit()
+
+    with phase("render"):
+        print_rich_analysis(result)
+
+    if report:
+        path = get_report_path(report, report_format, report_name)
+        with phase("report"), open_report(path) as fh:
+            write_analyze_report(
+                fh,
+                report_format,
+                result.slowest,
+                result.slowest_summary,
+                source=str(log),
+                log_format=result.format,
+            )
+        console.print(f"Report saved → {path}")
+
+
+def _critical_path(
+    log: Path,
+    log_format: Optional[str],
+    top: int,
+    threshold: Optional[int],
+    report: Optional[Path],
+    report_format: str,
+    report_name: Optional[str],
+    where: StepFilter,
+    canon: Optional[Canonicalizer],
+) -> None:
+    """Rank step names by their share of the run's wall-clock time."""
+    from deeptrace.core.intervals import contributions, leaf_steps
+    from deeptrace.core.models import StepTable
+    from deeptrace.core.parsers.parser_manager import detect_and_parse
+    from deeptrace.core.profiling import phase
+    from deeptrace.core.pushdown import feed
+    from deeptrace.reports import open_report, write_critical_path_report
+    from deeptrace.utils import (
+        get_console,
+        get_report_path,
+        print_rich_critical_path,
+    )
+
+    console = get_console()
+    # the step hierarchy is needed to drop parents, so the cache is not used
+    with phase("load"):
+        fmt, raw = detect_and_parse(log, log_format, canon)
     if not fmt:
         console.print("[red]Failed to detect format[/]")
         raise typer.Exit(1)
-
     console.print(f"[green]Detected format: {fmt}[/]")
 
-    steps = deduplicate_avg(steps)
+    with phase("intervals"):
+        table = StepTable()
+        feed(leaf_steps(raw), table, where)
+        rows, timeline = contributions(table)
     if threshold is not None:
-        steps = [s for s in steps if s.duration >= threshold]
-    if not steps:
+        rows = [r for r in rows if r.attributed_ms >= threshold]
+    if not rows:
         console.print("No steps match given threshold")
         raise typer.Exit()
 
-    slowest = heapq.nlargest(top, steps, key=lambda s: s.duration)
+    with phase("render"):
+        print_rich_critical_path(rows[:top], timeline)
 
-    print_rich_steps_table(slowest)
-    stats_all = get_stats(steps, percentiles)
-    stats_slow = get_stats(slowest, percentiles)
+    if report:
+        path = get_report_path(report, report_format, report_name)
+        with phase("report"), open_report(path) as fh:
+            write_critical_path_report(
+                fh,
+                report_format,
+                rows[:top],
+                timeline,
+                source=str(log),
+                log_format=fmt,
+            )
+        console.print(f"Report saved → {path}")
 
-    console.print(
-        Columns(
-            [
-                make_rich_stats_table(stats_slow, "Stats (filtered)"),
-                make_rich_stats_table(stats_all, "Stats (all)"),
-            ]
+
+def _analyze_batch(
+    logs: List[Path],
+    top: int,
+    threshold: Optional[int],
+    report: Optional[Path],
+    report_format: str,
+    report_name: Optional[str],
+    emit_partial: Optional[Path],
+    percentiles: List[int],
+    hierarchy: bool,
+    rank_by: str,
+    exact: bool,
+    accuracy: float,
+    jobs: Optional[int],
+    log_format: Optional[str],
+    where: StepFilter,
+    canon: Optional[Canonicalizer],
+) -> None:
+    """Aggregate every log under `logs`: globs, directory trees, mixed formats."""
+    from contextlib import nullcontext
+
+    from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+
+    from deeptrace.api import AnalysisError, analyze_batch
+    from deeptrace.core.batch import FileResult
+    from deeptrace.core.profiling import phase
+    from deeptrace.reports import REPORT_FORMATS, open_report, write_analyze_report
+    from deeptrace.utils import (
+        get_console,
+        get_report_path,
+        print_rich_analysis,
+        print_rich_batch_breakdown,
+    )
+
+    console = get_console()
+    if hierarchy:
+        console.print(
+            "[red]--self-time and --critical-path need a single log or "
+            "allure-results directory[/]"
         )
+        raise typer.Exit(1)
+    if report_format not in REPORT_FORMATS:
+        console.print(
+            f"[red]Unknown report format {report_format!r}, "
+            f"available: {', '.join(REPORT_FORMATS)}[/]"
+        )
+        raise typer.Exit(1)
+
+    # the tree is walked lazily, so the total is unknown: count up instead
+    bar = Progress(
+        SpinnerColumn(),
+        TextColumn("{task.description}"),
+        TimeElapsedColumn(),
+        console=console,
+        transient=True,
     )
+    task = bar.add_task("Parsing logs...", total=None)
+    files = steps = 0
+
+    def progress(f: FileResult) -> None:
+        nonlocal files, steps
+        files += 1
+        steps += f.steps
+        bar.update(task, description=f"Parsed {files} file(s), {steps} steps")
+
+    try:
+        with bar if console.is_terminal else nullcontext():
+            batch = analyze_batch(
+                [str(p) for p in logs],
+                top=top,
+                threshold=threshold,
+                percentiles=percentiles,
+                exact=exact or None,
+                relative_accuracy=accuracy,
+                rank_by=rank_by,
+                fmt=log_format,
+                where=where,
+                canon=canon,
+                jobs=jobs,
+                progress=progress,
+            )
+    except AnalysisError as exc:
+        console.print(f"[red]{exc}[/]")
+        raise typer.Exit(1)
+    for arg in batch.missing:
+        console.print(f"[yellow]No such file or pattern matches nothing: {arg}[/]")
+
+    result = batch.result
+    console.print(
+        f"[green]Analysed {len(batch.files)} file(s), formats: {result.format}[/]"
+    )
+    if emit_partial and result.groups is not None and result.format:
+        from deeptrace.core.partial import save_partial
+
+        with phase("partial"):
+            save_partial(emit_partial, result.format, result.groups)
+        console.print(f"Partial saved → {emit_partial}")
+    if not result.averages:
+        console.print("No steps match given threshold")
+        raise typer.Exit()
+
+    with phase("render"):
+        print_rich_analysis(result)
+        print_rich_batch_breakdown(batch, limit=top)
 
     if report:
-        path = get_report_path(report)
-        path.write_text(generate_markdown_report(slowest, stats_slow), encoding="utf-8")
+        path = get_report_path(report, report_format, report_name)
+        with phase("report"), open_report(path) as fh:
+            write_analyze_report(
+                fh,
+                report_format,
+                result.slowest,
+                result.slowest_summary,
+                source=", ".join(str(p) for p in logs),
+                log_format=result.format,
+            )
         console.print(f"Report saved → {path}")
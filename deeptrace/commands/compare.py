@@ -1,56 +1,197 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import typer
-from rich.console import Console
 
-from deeptrace.core.analyzer import deduplicate_avg
-from deeptrace.core.parsers.parser_manager import autodetect_parser
-from deeptrace.utils import (
-    generate_ab_markdown_report,
-    get_report_path,
-    get_stats,
-    print_rich_ab_comparison,
-)
+from deeptrace.core.defaults import DEFAULT_ALPHA, DEFAULT_MIN_EFFECT
 
-console = Console()
+if TYPE_CHECKING:
+    from deeptrace.core.canonical import Canonicalizer
 
 
 def compare(
-    run_a: Path = typer.Argument(..., exists=True, help="Лог/директория A"),
-    run_b: Path = typer.Argument(..., exists=True, help="Лог/директория B"),
+    run_a: Optional[Path] = typer.Argument(None, exists=True, help="Лог/директория A"),
+    run_b: Optional[Path] = typer.Argument(None, exists=True, help="Лог/директория B"),
+    baseline: List[Path] = typer.Option(
+        [], "--baseline", "-a", exists=True, help="Ещё прогоны набора A (повторяемая)"
+    ),
+    candidate: List[Path] = typer.Option(
+        [], "--candidate", "-b", exists=True, help="Ещё прогоны набора B (повторяемая)"
+    ),
     report: Optional[Path] = typer.Option(
-        None, "--report", "-r", help="Директория для сохранения отчёта .md"
+        None, "--report", "-r", help="Директория для сохранения отчёта"
+    ),
+    report_format: str = typer.Option(
+        "md", "--report-format", help="Формат отчёта: md, json или csv"
+    ),
+    report_name: Optional[str] = typer.Option(
+        None,
+        "--report-name",
+        help="Имя файла отчёта (по умолчанию report-<дата-время>.<формат>)",
+    ),
+    top: Optional[int] = typer.Option(
+        None, "--top", "-n", help="Показать только N шагов с наибольшим эффектом"
+    ),
+    alpha: float = typer.Option(
+        DEFAULT_ALPHA, "--alpha", help="Уровень значимости теста Манна-Уитни"
+    ),
+    min_effect: float = typer.Option(
+        DEFAULT_MIN_EFFECT, "--min-effect", help="Минимальный |Cliff's delta|"
+    ),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", help="Число процессов для разбора логов"
+    ),
+    exact: bool = typer.Option(
+        False, "--exact", help="Точные перцентили (сортировка всех значений)"
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Не использовать кэш разобранных логов"
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None, "--cache-dir", help="Каталог кэша (по умолчанию ~/.cache/deeptrace)"
+    ),
+    log_format: Optional[str] = typer.Option(
+        None, "--format", "-f", help="Формат логов без автоопределения, напр. allure"
+    ),
+    raw_names: bool = typer.Option(
+        False,
+        "--raw-names",
+        help="Не приводить имена шагов к шаблонам (id, uuid, query)",
+    ),
+    name_rules: List[str] = typer.Option(
+        [],
+        "--name-rule",
+        help="Правило переименования шагов REGEX=ЗАМЕНА (повторяемая)",
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Показать время фаз, попытки парсеров и память"
+    ),
+    profile_json: Optional[Path] = typer.Option(
+        None, "--profile-json", help="Сохранить профиль в JSON (включает --profile)"
+    ),
+    pstats: Optional[Path] = typer.Option(
+        None, "--pstats", help="Дамп cProfile для pstats/snakeviz (включает --profile)"
     ),
 ):
-    for label, p in (("A", run_a), ("B", run_b)):
-        if not p.exists():
-            console.print(f"[red]{label} path does not exist[/]")
-            raise typer.Exit(1)
-
-    console.print("[yellow]Detecting format for A...[/]")
-    fmt_a, steps_a = autodetect_parser(run_a)
-    console.print("[yellow]Detecting format for B...[/]")
-    fmt_b, steps_b = autodetect_parser(run_b)
-
-    if not fmt_a or not fmt_b:
-        console.print("[red]Could not detect format[/]")
-        raise typer.Exit(1)
-    if fmt_a != fmt_b:
-        console.print(f"[red]Format mismatch: A={fmt_a}, B={fmt_b}[/]")
+    from deeptrace.core import profiling
+    from deeptrace.core.canonical import from_options
+
+    try:
+        canon = from_options(raw_names, name_rules)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--name-rule")
+    runs_a = ([run_a] if run_a else []) + list(baseline)
+    runs_b = ([run_b] if run_b else []) + list(candidate)
+    with profiling.session("compare", profile, profile_json, pstats):
+        _compare(
+            runs_a,
+            runs_b,
+            report,
+            report_format,
+            report_name,
+            top,
+            alpha,
+            min_effect,
+            jobs,
+            exact,
+            no_cache,
+            cache_dir,
+            log_format,
+            canon,
+        )
+
+
+def _compare(
+    runs_a: List[Path],
+    runs_b: List[Path],
+    report: Optional[Path],
+    report_format: str,
+    report_name: Optional[str],
+    top: Optional[int],
+    alpha: float,
+    min_effect: float,
+    jobs: Optional[int],
+    exact: bool,
+    no_cache: bool,
+    cache_dir: Optional[Path],
+    log_format: Optional[str],
+    canon: Optional[Canonicalizer],
+) -> None:
+    from deeptrace.api import AnalysisError, compare as compare_logs
+    from deeptrace.core import profiling
+    from deeptrace.core.cache import StepCache
+    from deeptrace.core.profiling import phase
+    from deeptrace.daemon import DaemonError, connect
+    from deeptrace.reports import REPORT_FORMATS, open_report, write_compare_report
+    from deeptrace.utils import (
+        get_console,
+        get_report_path,
+        get_stats,
+        print_rich_ab_comparison,
+    )
+
+    console = get_console()
+    if report_format not in REPORT_FORMATS:
+        console.print(
+            f"[red]Unknown report format {report_format!r}, "
+            f"available: {', '.join(REPORT_FORMATS)}[/]"
+        )
         raise typer.Exit(1)
 
-    console.print(f"[green]Detected format: {fmt_a}[/]")
+    console.print(
+        f"[yellow]Detecting formats for {len(runs_a)} + {len(runs_b)} run(s)...[/]"
+    )
+    # a running `deeptrace serve` answers from memory and its own cache
+    local = profiling.active() or no_cache or cache_dir
+    client = None if local else connect()
+    run = compare_logs if client is None else client.compare
+    try:
+        result = run(
+            runs_a,
+            runs_b,
+            alpha=alpha,
+            min_effect=min_effect,
+            exact=exact or None,
+            jobs=jobs,
+            fmt=log_format,
+            canon=canon,
+            cache=None if no_cache else StepCache(cache_dir),
+        )
+    except (AnalysisError, DaemonError) as exc:
+        console.print(f"[red]{exc}[/]")
+        raise typer.Exit(1)
+    finally:
+        if client is not None:
+            client.close()
 
-    steps_a = deduplicate_avg(steps_a)
-    steps_b = deduplicate_avg(steps_b)
-    stats_a, stats_b = get_stats(steps_a), get_stats(steps_b)
+    console.print(f"[green]Detected format: {result.format}[/]")
+    diffs = result.diffs
+    label_a = f"A ({len(runs_a)} runs)" if len(runs_a) > 1 else "A"
+    label_b = f"B ({len(runs_b)} runs)" if len(runs_b) > 1 else "B"
 
     if report:
-        path = get_report_path(report)
-        md = generate_ab_markdown_report(steps_a, steps_b, stats_a, stats_b)
-        path.write_text(md, encoding="utf-8")
+        path = get_report_path(report, report_format, report_name)
+        with phase("report"), open_report(path) as fh:
+            write_compare_report(
+                fh,
+                report_format,
+                diffs,
+                result.summary_a,
+                result.summary_b,
+                label_a=label_a,
+                label_b=label_b,
+                limit=top,
+                log_format=result.format,
+            )
         console.print(f"Report saved → {path}")
     else:
-        print_rich_ab_comparison(steps_a, steps_b, stats_a, stats_b)
+        with phase("render"):
+            print_rich_ab_comparison(
+                diffs,
+                get_stats(result.summary_a),
+                get_stats(result.summary_b),
+                label_a=label_a,
+                label_b=label_b,
+                limit=top,
+            )
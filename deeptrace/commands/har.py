@@ -0,0 +1,40 @@
+from __future__ import annotations
+from pathlib import Path
+
+import typer
+
+
+def har(
+    log: Path = typer.Argument(..., exists=True, dir_okay=False, help="Файл .har"),
+    by: str = typer.Option(
+        "host", "--by", "-b", help="Группировка: host или type (тип ресурса)"
+    ),
+    top: int = typer.Option(
+        20, "--top", "-n", help="Показать N групп с наибольшим временем"
+    ),
+):
+    import json
+
+    from deeptrace.core.har import GROUP_KEYS, phase_breakdown
+    from deeptrace.core.inputs import read_input
+    from deeptrace.utils import get_console, print_rich_har_breakdown
+
+    console = get_console()
+    if by not in GROUP_KEYS:
+        console.print(
+            f"[red]Unknown grouping {by!r}, available: {', '.join(GROUP_KEYS)}[/]"
+        )
+        raise typer.Exit(1)
+
+    try:
+        data = json.loads(read_input(log))
+        entries = data["log"]["entries"]
+    except (ValueError, TypeError, KeyError) as exc:
+        console.print(f"[red]Not a HAR file: {exc}[/]")
+        raise typer.Exit(1)
+    if not entries:
+        console.print("No requests in the HAR file")
+        raise typer.Exit()
+
+    rows = phase_breakdown(entries, by)
+    print_rich_har_breakdown(rows[:top], title=f"HAR timings by {by}")
@@ -0,0 +1,86 @@
+from __future__ import annotations
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+
+def ingest(
+    logs: List[Path] = typer.Argument(
+        ..., exists=True, help="Логи или директории allure-results (по прогону)"
+    ),
+    db: Optional[Path] = typer.Option(
+        None, "--db", help="База истории (по умолчанию ~/.local/share/deeptrace)"
+    ),
+    run_time: Optional[datetime] = typer.Option(
+        None, "--run-time", help="Время прогона (по умолчанию mtime лога)"
+    ),
+    label: Optional[str] = typer.Option(
+        None, "--label", "-l", help="Метка прогона, напр. номер сборки"
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Не использовать кэш разобранных логов"
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None, "--cache-dir", help="Каталог кэша (по умолчанию ~/.cache/deeptrace)"
+    ),
+    log_format: Optional[str] = typer.Option(
+        None, "--format", "-f", help="Формат логов без автоопределения, напр. allure"
+    ),
+    raw_names: bool = typer.Option(
+        False,
+        "--raw-names",
+        help="Не приводить имена шагов к шаблонам (id, uuid, query)",
+    ),
+    name_rules: List[str] = typer.Option(
+        [],
+        "--name-rule",
+        help="Правило переименования шагов REGEX=ЗАМЕНА (повторяемая)",
+    ),
+):
+    from deeptrace.core.analyzer import group_sketches
+    from deeptrace.core.cache import StepCache
+    from deeptrace.core.canonical import from_options
+    from deeptrace.core.parsers.parser_manager import load_steps
+    from deeptrace.core.registry import available_parsers
+    from deeptrace.core.store import RunStore
+    from deeptrace.utils import get_console
+
+    console = get_console()
+    if log_format is not None and log_format not in available_parsers():
+        console.print(
+            f"[red]Unknown format {log_format!r}, "
+            f"available: {', '.join(available_parsers())}[/]"
+        )
+        raise typer.Exit(1)
+
+    try:
+        canon = from_options(raw_names, name_rules)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--name-rule")
+    cache = None if no_cache else StepCache(cache_dir)
+    failed = False
+
+    with RunStore(db) as store:
+        for log in logs:
+            ts = run_time.timestamp() if run_time else log.stat().st_mtime
+            key = str(log.resolve())
+            if store.has_run(key, ts):
+                console.print(f"[dim]{log}: already ingested[/]")
+                continue
+
+            fmt, table = load_steps(log, cache, log_format, canon)
+            if not fmt:
+                console.print(f"[red]{log}: failed to detect format[/]")
+                failed = True
+                continue
+
+            sketches = group_sketches(table)
+            run_id = store.ingest(key, fmt, sketches, run_time=ts, label=label)
+            console.print(
+                f"[green]{log}[/]: run #{run_id}, {len(sketches)} step names ({fmt})"
+            )
+
+    if failed:
+        raise typer.Exit(1)
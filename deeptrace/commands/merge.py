@@ -0,0 +1,131 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+
+def merge(
+    partials: List[Path] = typer.Argument(
+        ...,
+        exists=True,
+        dir_okay=False,
+        help="Частичные агрегаты (analyze --emit-partial)",
+    ),
+    top: int = typer.Option(5, "--top", "-n", help="Показать N самых долгих шагов"),
+    threshold: Optional[int] = typer.Option(
+        None, "--threshold", "-t", help="Фильтр по минимальной длительности, ms"
+    ),
+    rank_by: str = typer.Option(
+        "avg",
+        "--rank-by",
+        help="Ранжировать шаги по avg, p50, p90, p95, p99, max или total",
+    ),
+    percentiles: List[int] = typer.Option(
+        (95, 99), "--percentiles", "-p", help="Доп. перцентили, напр. -p 90 -p 99"
+    ),
+    report: Optional[Path] = typer.Option(
+        None, "--report", "-r", help="Директория для сохранения отчёта"
+    ),
+    report_format: str = typer.Option(
+        "md", "--report-format", help="Формат отчёта: md, json или csv"
+    ),
+    report_name: Optional[str] = typer.Option(
+        None,
+        "--report-name",
+        help="Имя файла отчёта (по умолчанию report-<дата-время>.<формат>)",
+    ),
+    emit_partial: Optional[Path] = typer.Option(
+        None,
+        "--emit-partial",
+        help="Сохранить объединённый агрегат (для слияния по уровням)",
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Показать время фаз, попытки парсеров и память"
+    ),
+    profile_json: Optional[Path] = typer.Option(
+        None, "--profile-json", help="Сохранить профиль в JSON (включает --profile)"
+    ),
+):
+    from deeptrace.core import profiling
+
+    with profiling.session("merge", profile, profile_json):
+        _merge(
+            partials,
+            top,
+            threshold,
+            rank_by,
+            percentiles,
+            report,
+            report_format,
+            report_name,
+            emit_partial,
+        )
+
+
+def _merge(
+    partials: List[Path],
+    top: int,
+    threshold: Optional[int],
+    rank_by: str,
+    percentiles: List[int],
+    report: Optional[Path],
+    report_format: str,
+    report_name: Optional[str],
+    emit_partial: Optional[Path],
+) -> None:
+    from deeptrace.api import AnalysisError, merge as merge_partials
+    from deeptrace.core.profiling import phase
+    from deeptrace.reports import REPORT_FORMATS, open_report, write_analyze_report
+    from deeptrace.utils import get_console, get_report_path, print_rich_analysis
+
+    console = get_console()
+    if report_format not in REPORT_FORMATS:
+        console.print(
+            f"[red]Unknown report format {report_format!r}, "
+            f"available: {', '.join(REPORT_FORMATS)}[/]"
+        )
+        raise typer.Exit(1)
+
+    try:
+        result = merge_partials(
+            partials,
+            top=top,
+            threshold=threshold,
+            percentiles=percentiles,
+            rank_by=rank_by,
+        )
+    except AnalysisError as exc:
+        console.print(f"[red]{exc}[/]")
+        raise typer.Exit(1)
+    groups = result.groups
+    assert groups is not None
+    console.print(
+        f"[green]Merged {len(partials)} partial(s): {groups.count} steps, "
+        f"{len(groups.groups)} names ({result.format})[/]"
+    )
+    if emit_partial:
+        from deeptrace.core.partial import save_partial
+
+        with phase("partial"):
+            save_partial(emit_partial, result.format or "", groups)
+        console.print(f"Partial saved → {emit_partial}")
+    if not result.averages:
+        console.print("No steps match given threshold")
+        raise typer.Exit()
+
+    with phase("render"):
+        print_rich_analysis(result)
+
+    if report:
+        path = get_report_path(report, report_format, report_name)
+        with phase("report"), open_report(path) as fh:
+            write_analyze_report(
+                fh,
+                report_format,
+                result.slowest,
+                result.slowest_summary,
+                source=", ".join(str(p) for p in partials),
+                log_format=result.format,
+            )
+        console.print(f"Report saved → {path}")
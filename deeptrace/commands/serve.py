@@ -0,0 +1,60 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+
+def serve(
+    socket_path: Optional[Path] = typer.Option(
+        None,
+        "--socket",
+        help="Unix-сокет (по умолчанию $XDG_RUNTIME_DIR/deeptrace-<uid>.sock)",
+    ),
+    port: Optional[int] = typer.Option(
+        None, "--port", help="Слушать TCP-порт на localhost вместо Unix-сокета"
+    ),
+    memory_mb: int = typer.Option(
+        512, "--memory-mb", help="Лимит памяти под разобранные прогоны, MB"
+    ),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-j", help="Число потоков для разбора логов"
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Не использовать дисковый кэш разобранных логов"
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None, "--cache-dir", help="Каталог кэша (по умолчанию ~/.cache/deeptrace)"
+    ),
+):
+    import asyncio
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+
+    from deeptrace.core.cache import MemoryCache, StepCache
+    from deeptrace.daemon import ADDRESS_ENV, default_address, serve as run_daemon
+    from deeptrace.utils import get_console
+
+    console = get_console()
+    if socket_path is not None and port is not None:
+        console.print("[red]--socket and --port cannot be combined[/]")
+        raise typer.Exit(1)
+    if port is not None:
+        address = f"127.0.0.1:{port}"
+    else:
+        address = str(socket_path or default_address())
+
+    # one line per query on stderr
+    logging.getLogger("deeptrace.daemon").setLevel(logging.INFO)
+    cache = MemoryCache(memory_mb << 20, None if no_cache else StepCache(cache_dir))
+    console.print(f"[green]Serving on {address}[/] (Ctrl+C to stop)")
+    if address != default_address():
+        console.print(f"[dim]Point the CLI at it with {ADDRESS_ENV}={address}[/]")
+    try:
+        with ThreadPoolExecutor(workers) as pool:
+            asyncio.run(run_daemon(address, cache, pool))
+    except KeyboardInterrupt:
+        pass
+    except OSError as exc:
+        console.print(f"[red]{exc}[/]")
+        raise typer.Exit(1)
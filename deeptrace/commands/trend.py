@@ -0,0 +1,48 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+
+def trend(
+    step: str = typer.Argument(..., help="Имя шага"),
+    last: int = typer.Option(
+        500, "--last", "-n", help="Сколько последних прогонов учитывать"
+    ),
+    db: Optional[Path] = typer.Option(
+        None, "--db", help="База истории (по умолчанию ~/.local/share/deeptrace)"
+    ),
+    percentiles: List[int] = typer.Option(
+        (95, 99), "--percentiles", "-p", help="Доп. перцентили, напр. -p 90 -p 99"
+    ),
+):
+    from deeptrace.core.sketch import QuantileSketch
+    from deeptrace.core.store import RunStore
+    from deeptrace.utils import (
+        get_console,
+        get_stats,
+        make_rich_stats_table,
+        print_rich_trend_table,
+    )
+
+    console = get_console()
+    with RunStore(db) as store:
+        points = store.trend(step, last)
+        if not points:
+            console.print(f"[red]No history for step {step!r}[/]")
+            similar = store.step_names(f"%{step}%")[:10]
+            if similar:
+                console.print("Similar steps: " + ", ".join(similar))
+            raise typer.Exit(1)
+
+    print_rich_trend_table(points, percentiles, title=f"Trend: {step}")
+
+    merged = QuantileSketch(points[0].sketch.relative_accuracy)
+    for point in points:
+        merged.merge(point.sketch)
+    console.print(
+        make_rich_stats_table(
+            get_stats(merged, percentiles), f"{step}: last {len(points)} runs"
+        )
+    )
@@ -0,0 +1,165 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+import typer
+
+from deeptrace.core.defaults import DEFAULT_CV_LIMIT
+
+if TYPE_CHECKING:
+    from deeptrace.core.canonical import Canonicalizer
+    from deeptrace.core.pushdown import StepFilter
+
+
+def variance(
+    runs: List[Path] = typer.Argument(
+        ...,
+        help="Прогоны: файлы логов, allure-директории, директории прогонов или glob",
+    ),
+    top: int = typer.Option(
+        10, "--top", "-n", help="Показать N самых нестабильных шагов"
+    ),
+    threshold: Optional[int] = typer.Option(
+        None, "--threshold", "-t", help="Фильтр по минимальной средней длительности, ms"
+    ),
+    min_runs: int = typer.Option(
+        3, "--min-runs", help="Учитывать шаги, встретившиеся хотя бы в N прогонах"
+    ),
+    rank_by: str = typer.Option(
+        "cv", "--rank-by", help="Ранжировать шаги по cv, stddev или bimodality"
+    ),
+    cv_limit: float = typer.Option(
+        DEFAULT_CV_LIMIT,
+        "--cv",
+        help="Порог коэффициента вариации (stddev / mean) для нестабильного шага",
+    ),
+    log_format: Optional[str] = typer.Option(
+        None, "--format", "-f", help="Формат лога без автоопределения, напр. allure"
+    ),
+    raw_names: bool = typer.Option(
+        False,
+        "--raw-names",
+        help="Не приводить имена шагов к шаблонам (id, uuid, query)",
+    ),
+    name_rules: List[str] = typer.Option(
+        [],
+        "--name-rule",
+        help="Правило переименования шагов REGEX=ЗАМЕНА (повторяемая)",
+    ),
+    include: List[str] = typer.Option(
+        [], "--include", "-i", help="Только шаги с именем по glob-шаблону (повторяемая)"
+    ),
+    exclude: List[str] = typer.Option(
+        [], "--exclude", "-x", help="Исключить шаги по glob-шаблону (повторяемая)"
+    ),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", help="Число процессов для разбора прогонов"
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Показать время фаз, попытки парсеров и память"
+    ),
+    profile_json: Optional[Path] = typer.Option(
+        None, "--profile-json", help="Сохранить профиль в JSON (включает --profile)"
+    ),
+):
+    from deeptrace.core import profiling
+    from deeptrace.core.canonical import from_options
+    from deeptrace.core.pushdown import StepFilter
+
+    where = StepFilter(None, tuple(include), tuple(exclude), None, None)
+    try:
+        canon = from_options(raw_names, name_rules)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--name-rule")
+    with profiling.session("variance", profile, profile_json):
+        _variance(
+            runs,
+            top,
+            threshold,
+            min_runs,
+            rank_by,
+            cv_limit,
+            log_format,
+            where,
+            canon,
+            jobs,
+        )
+
+
+def _variance(
+    runs: List[Path],
+    top: int,
+    threshold: Optional[int],
+    min_runs: int,
+    rank_by: str,
+    cv_limit: float,
+    log_format: Optional[str],
+    where: StepFilter,
+    canon: Optional[Canonicalizer],
+    jobs: Optional[int],
+) -> None:
+    from contextlib import nullcontext
+
+    from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+
+    from deeptrace.api import AnalysisError, variance as run_variance
+    from deeptrace.core.profiling import phase
+    from deeptrace.core.variance import RunResult
+    from deeptrace.utils import get_console, print_rich_variance
+
+    console = get_console()
+    bar = Progress(
+        SpinnerColumn(),
+        TextColumn("{task.description}"),
+        TimeElapsedColumn(),
+        console=console,
+        transient=True,
+    )
+    task = bar.add_task("Parsing runs...", total=None)
+    folded = 0
+
+    def progress(run: RunResult) -> None:
+        nonlocal folded
+        folded += 1
+        bar.update(task, description=f"Folded {folded} run(s)")
+
+    try:
+        with bar if console.is_terminal else nullcontext():
+            result = run_variance(
+                [str(p) for p in runs],
+                min_runs=min_runs,
+                threshold=threshold,
+                rank_by=rank_by,
+                cv_limit=cv_limit,
+                fmt=log_format,
+                where=where,
+                canon=canon,
+                jobs=jobs,
+                progress=progress,
+            )
+    except AnalysisError as exc:
+        console.print(f"[red]{exc}[/]")
+        raise typer.Exit(1)
+    for arg in result.missing:
+        console.print(f"[yellow]No such file or pattern matches nothing: {arg}[/]")
+    for run in result.runs:
+        if run.error:
+            console.print(f"[yellow]Skipped {run.path}: {run.error}[/]")
+
+    console.print(
+        f"[green]Folded {result.stats.runs} of {len(result.runs)} run(s), "
+        f"formats: {', '.join(result.formats)}[/]"
+    )
+    if not result.steps:
+        console.print(f"No step seen in at least {min_runs} runs")
+        raise typer.Exit()
+
+    with phase("render"):
+        print_rich_variance(result, limit=top)
+    if result.unstable:
+        console.print(
+            f"[red]{len(result.unstable)} unstable step(s)[/]: "
+            f"cv ≥ {cv_limit:g} or bimodal run times"
+        )
+    else:
+        console.print(f"[green]No unstable steps[/] (cv < {cv_limit:g}, unimodal)")
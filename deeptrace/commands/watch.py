@@ -0,0 +1,98 @@
+from __future__ import annotations
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+from deeptrace.core.defaults import DEFAULT_ACCURACY
+
+
+def watch(
+    log: Path = typer.Argument(
+        ..., help="Растущий лог JSON Lines (по событию в строке)"
+    ),
+    top: int = typer.Option(10, "--top", "-n", help="Показать N самых долгих шагов"),
+    threshold: Optional[int] = typer.Option(
+        None, "--threshold", "-t", help="Фильтр по минимальной длительности, ms"
+    ),
+    percentiles: List[int] = typer.Option(
+        (95, 99), "--percentiles", "-p", help="Доп. перцентили, напр. -p 90 -p 99"
+    ),
+    refresh: float = typer.Option(
+        2.0, "--refresh", help="Частота обновления экрана, раз в секунду"
+    ),
+    from_end: bool = typer.Option(
+        False, "--from-end", help="Пропустить уже записанную часть лога"
+    ),
+    timeout: Optional[float] = typer.Option(
+        None, "--timeout", help="Остановиться через N секунд (по умолчанию Ctrl+C)"
+    ),
+    accuracy: float = typer.Option(
+        DEFAULT_ACCURACY,
+        "--sketch-accuracy",
+        help="Относительная погрешность приближённых перцентилей",
+    ),
+    raw_names: bool = typer.Option(
+        False,
+        "--raw-names",
+        help="Не приводить имена шагов к шаблонам (id, uuid, query)",
+    ),
+    name_rules: List[str] = typer.Option(
+        [],
+        "--name-rule",
+        help="Правило переименования шагов REGEX=ЗАМЕНА (повторяемая)",
+    ),
+):
+    from rich.live import Live
+
+    from deeptrace.core.analyzer import LiveAnalysis
+    from deeptrace.core.canonical import from_options
+    from deeptrace.core.models import Step
+    from deeptrace.core.parsers.jsonl import line_to_step
+    from deeptrace.core.tail import LogTailer
+    from deeptrace.utils import get_console, make_rich_live_view
+
+    try:
+        canon = from_options(raw_names, name_rules)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--name-rule")
+    console = get_console()
+    live = LiveAnalysis(top, threshold, accuracy)
+    bad_lines = 0
+    interval = 1 / max(refresh, 0.1)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    def view():
+        status = f"[dim]{log}: {live.seen} events, offset {tailer.offset}"
+        if bad_lines:
+            status += f", {bad_lines} bad lines"
+        if tailer.rotations or tailer.truncations:
+            status += (
+                f", {tailer.rotations} rotations, {tailer.truncations} truncations"
+            )
+        return make_rich_live_view(live, percentiles, status=status + "[/]")
+
+    with LogTailer(log, from_end=from_end) as tailer:
+        with Live(view(), console=console, auto_refresh=False) as screen:
+            try:
+                while deadline is None or time.monotonic() < deadline:
+                    tick = time.monotonic()
+                    lines = tailer.poll()
+                    for line in lines:
+                        try:
+                            step = line_to_step(line)
+                            if step is not None:
+                                if canon:
+                                    step = Step(
+                                        canon(step.name), step.start_ms, step.end_ms
+                                    )
+                                live.add(step)
+                        except (ValueError, TypeError):
+                            bad_lines += 1
+                    if lines:
+                        screen.update(view(), refresh=True)
+                    time.sleep(max(0.0, interval - (time.monotonic() - tick)))
+            except KeyboardInterrupt:
+                pass
+            screen.update(view(), refresh=True)
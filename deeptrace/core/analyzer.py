@@ -1,18 +1,170 @@
 from __future__ import annotations
-from typing import List
+import heapq
+import itertools
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
-from deeptrace.core.models import Step
+from deeptrace.core.models import NUMPY_MIN_ROWS, Step, StepTable, np
+from deeptrace.core.sketch import DEFAULT_ACCURACY, QuantileSketch
 
-__all__ = ["deduplicate_avg"]
+__all__ = [
+    "LiveAnalysis",
+    "StreamingAverages",
+    "deduplicate_avg",
+    "group_sketches",
+    "self_times",
+]
 
 
-def deduplicate_avg(steps: List[Step]) -> List[Step]:
+def deduplicate_avg(steps: Union[Iterable[Step], StepTable]) -> StepTable:
     """
     Combine steps having the same name: keep the average duration.
     start_ms is set to 0 because it is not used further.
     """
-    bucket: dict[str, list[int]] = {}
+    table = steps if isinstance(steps, StepTable) else StepTable.from_steps(steps)
+    n_names = len(table.names)
+    durations = table.durations()
+
+    if np is not None and len(table) >= NUMPY_MIN_ROWS:
+        ids = np.frombuffer(table.name_ids, dtype=np.int32)
+        counts = np.bincount(ids, minlength=n_names).tolist()
+        sums = np.bincount(
+            ids, weights=np.frombuffer(durations, dtype=np.int64), minlength=n_names
+        ).tolist()
+    else:
+        counts = [0] * n_names
+        sums = [0] * n_names
+        for idx, d in zip(table.name_ids, durations):
+            counts[idx] += 1
+            sums[idx] += d
+
+    out = StepTable()
+    for name, total, count in zip(table.names, sums, counts):
+        if count:
+            out.append(name, 0, int(total / count))
+    return out
+
+
+class StreamingAverages:
+    """
+    deduplicate_avg() as a step sink (see core.pushdown): only per-name
+    count and total are kept, so memory follows the number of distinct
+    names instead of the number of steps. table() gives the same result as
+    deduplicate_avg() over the steps appended.
+    """
+
+    __slots__ = ("totals", "count")
+
+    def __init__(self) -> None:
+        self.totals: Dict[str, List[int]] = {}
+        self.count = 0
+
+    def append(self, name: str, start_ms: int, end_ms: int) -> None:
+        self.count += 1
+        d = end_ms - start_ms if end_ms > start_ms else 0
+        acc = self.totals.get(name)
+        if acc is None:
+            self.totals[name] = [1, d]
+        else:
+            acc[0] += 1
+            acc[1] += d
+
+    def table(self) -> StepTable:
+        out = StepTable()
+        for name, (count, total) in self.totals.items():
+            out.append(name, 0, int(total / count))
+        return out
+
+
+def group_sketches(
+    steps: Union[Iterable[Step], StepTable],
+    relative_accuracy: float = DEFAULT_ACCURACY,
+) -> Dict[str, QuantileSketch]:
+    """Per-name duration sketches (count/sum/min/max exact, quantiles approx)."""
+    table = steps if isinstance(steps, StepTable) else StepTable.from_steps(steps)
+    sketches = [QuantileSketch(relative_accuracy) for _ in table.names]
+    durations = table.durations()
+
+    if np is not None and table and len(table) >= NUMPY_MIN_ROWS:
+        ids = np.frombuffer(table.name_ids, dtype=np.int32)
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+        cuts = np.flatnonzero(np.diff(sorted_ids)) + 1
+        firsts = sorted_ids[np.concatenate(([0], cuts))].tolist()
+        groups = np.split(np.frombuffer(durations, dtype=np.int64)[order], cuts)
+        for idx, chunk in zip(firsts, groups):
+            sketches[idx].update(chunk)
+    else:
+        for idx, d in zip(table.name_ids, durations):
+            sketches[idx].add(d)
+
+    return {name: sk for name, sk in zip(table.names, sketches) if sk.count}
+
+
+def self_times(steps: Sequence[Step]) -> List[int]:
+    """
+    Self-time of every step: its duration minus the durations of its direct
+    children (see Step.parent). Clamped at 0 for parallel children.
+    """
+    out = [s.duration for s in steps]
     for s in steps:
-        bucket.setdefault(s.name, []).append(s.duration)
+        if s.parent >= 0:
+            out[s.parent] -= s.duration
+    return [max(t, 0) for t in out]
+
+
+class LiveAnalysis:
+    """
+    Incremental state of `deeptrace watch`: every step is folded in once, in
+    O(log top) time, so the cost follows the append rate, not the log size.
+
+    Keeps the `top` slowest step occurrences in a bounded min-heap, a
+    QuantileSketch of all durations and per-name count / sum for averages.
+    Steps shorter than `threshold` are counted in `seen` only.
+    """
+
+    def __init__(
+        self,
+        top: int = 5,
+        threshold: Optional[int] = None,
+        relative_accuracy: float = DEFAULT_ACCURACY,
+    ) -> None:
+        self.top = top
+        self.threshold = threshold
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.totals: Dict[str, List[int]] = {}
+        self.seen = 0
+        self._heap: List[Tuple[int, int, str]] = []
+        self._seq = itertools.count()
+
+    def add(self, step: Step) -> None:
+        self.seen += 1
+        d = step.duration
+        if self.threshold is not None and d < self.threshold:
+            return
+        self.sketch.add(max(d, 0))
+        acc = self.totals.get(step.name)
+        if acc is None:
+            self.totals[step.name] = [1, d]
+        else:
+            acc[0] += 1
+            acc[1] += d
+        if self.top <= 0:
+            return
+        # ties: the earlier occurrence wins, like nlargest()
+        item = (d, -next(self._seq), step.name)
+        if len(self._heap) < self.top:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def update(self, steps: Iterable[Step]) -> None:
+        for step in steps:
+            self.add(step)
+
+    def slowest(self) -> List[Step]:
+        """The `top` slowest occurrences so far, slowest first."""
+        return [Step(name, 0, d) for d, _, name in sorted(self._heap, reverse=True)]
 
-    return [Step(name, 0, int(sum(d) / len(d))) for name, d in bucket.items()]
+    def average(self, name: str) -> int:
+        n, total = self.totals[name]
+        return int(total / n)
@@ -0,0 +1,308 @@
+"""
+Batch analysis of many log files of mixed formats.
+
+discover() expands paths and globs and walks directories recursively. An
+allure-results directory (one holding *-result.json files) contributes
+its result files only, skipping containers and attachments. Hidden files
+and directories are skipped.
+
+classify() picks a parser per file from the head alone, memoized by file
+suffix and head signature (JSON shape and keys), so a tree of 100k files
+in a handful of formats probes each format once. A wrong guess is not
+fatal: parse_file() falls back to full autodetection when the guessed
+parser rejects the file.
+
+parse_files() parses in a bounded pool, CHUNK_FILES files per task, and
+merges every file into the caller's GroupBy as its chunk completes.
+"""
+
+from __future__ import annotations
+import glob
+import os
+import re
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from deeptrace.core.groupby import GroupBy
+from deeptrace.core.inputs import logical_suffix
+from deeptrace.core.sniff import head_keys, head_kind, read_head
+
+if TYPE_CHECKING:
+    from deeptrace.core.canonical import Canonicalizer
+    from deeptrace.core.pushdown import StepFilter
+
+__all__ = [
+    "FileResult",
+    "bounded_map",
+    "classify",
+    "discover",
+    "is_allure_dir",
+    "parse_file",
+    "parse_files",
+]
+
+# distinct signatures remembered per process
+MEMO_SIZE = 4096
+# files per pool task: small logs cost more to ship than to parse
+CHUNK_FILES = 32
+# pool tasks kept in flight per worker
+_WINDOW = 4
+
+_ALLURE_RESULT = re.compile(r"-result\.json(?:\.(?i:gz|bz2|xz))?$")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+Signature = Tuple[str, bool, Optional[str], FrozenSet[str]]
+_memo: Dict[Signature, Optional[str]] = {}
+
+
+@dataclass(slots=True)
+class FileResult:
+    """
+    One parsed file. `format` is None for files no parser recognises
+    (skipped, not an error); `error` is set when parsing failed. `groups`
+    holds the file's steps until they are merged.
+    """
+
+    path: Path
+    format: Optional[str]
+    steps: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    groups: Optional[GroupBy] = None
+
+
+def _is_allure_result(name: str) -> bool:
+    return _ALLURE_RESULT.search(name) is not None
+
+
+def is_allure_dir(path: Path) -> bool:
+    """True for a directory holding Allure *-result.json files directly."""
+    try:
+        with os.scandir(path) as it:
+            return any(e.is_file() and _is_allure_result(e.name) for e in it)
+    except OSError:
+        return False
+
+
+def _walk(root: Path) -> Iterator[Path]:
+    try:
+        with os.scandir(root) as it:
+            entries = sorted(
+                (e for e in it if not e.name.startswith(".")), key=lambda e: e.name
+            )
+    except OSError:
+        return
+    files = [e for e in entries if e.is_file()]
+    if any(_is_allure_result(e.name) for e in files):
+        files = [e for e in files if _is_allure_result(e.name)]
+    for e in files:
+        yield Path(e.path)
+    for e in entries:
+        if e.is_dir(follow_symlinks=False):
+            yield from _walk(Path(e.path))
+
+
+def discover(
+    paths: Iterable[Union[str, Path]], missing: Optional[List[str]] = None
+) -> Iterator[Path]:
+    """
+    Every file under `paths` (files, directories, glob patterns with `**`),
+    each once, in a stable order. Arguments matching nothing are appended
+    to `missing` when given.
+    """
+    seen: Set[Path] = set()
+    for arg in paths:
+        arg = str(arg)
+        if os.path.exists(arg) or not glob.has_magic(arg):
+            matches = [arg] if os.path.exists(arg) else []
+        else:
+            matches = sorted(glob.glob(arg, recursive=True))
+        if not matches and missing is not None:
+            missing.append(arg)
+        for match in matches:
+            path = Path(match)
+            for file in _walk(path) if path.is_dir() else (path,):
+                if file not in seen:
+                    seen.add(file)
+                    yield file
+
+
+def _signature(path: Path, head: bytes) -> Signature:
+    return (
+        logical_suffix(path),
+        _is_allure_result(path.name),
+        head_kind(head),
+        frozenset(head_keys(head)),
+    )
+
+
+def classify(path: Path) -> Optional[str]:
+    """Best-scored parser for `path` (None: nothing recognises it)."""
+    from deeptrace.core.parsers.parser_manager import rank_parsers
+
+    head = read_head(path)
+    sig = _signature(path, head)
+    try:
+        return _memo[sig]
+    except KeyError:
+        pass
+    ranked = rank_parsers(path, None, head)
+    fmt = ranked[0][1] if ranked else None
+    if len(_memo) >= MEMO_SIZE:
+        _memo.clear()
+    _memo[sig] = fmt
+    return fmt
+
+
+def parse_file(
+    path: Path,
+    fmt: Optional[str] = None,
+    rank_by: str = "avg",
+    relative_accuracy: Optional[float] = None,
+    where: Optional[StepFilter] = None,
+    canon: Optional[Canonicalizer] = None,
+) -> FileResult:
+    """
+    Parse one file into a fresh GroupBy; `fmt` skips classification. Runs
+    in pool workers, so failures are reported, not raised.
+    """
+    from deeptrace.core.parsers.parser_manager import stream_steps
+    from deeptrace.core.sketch import DEFAULT_ACCURACY
+
+    accuracy = relative_accuracy or DEFAULT_ACCURACY
+    t0 = time.perf_counter()
+    groups = GroupBy(rank_by, accuracy)
+    guess = fmt
+    try:
+        guess = guess or classify(path)
+        if guess is None:
+            return FileResult(path, None, seconds=time.perf_counter() - t0)
+        try:
+            found = stream_steps(path, groups, guess, where, None, canon)
+        except ValueError:
+            if fmt is not None:
+                raise
+            # the memoized guess does not fit this file: detect it properly
+            groups = GroupBy(rank_by, accuracy)
+            found = stream_steps(path, groups, None, where, None, canon)
+    except Exception as exc:
+        return FileResult(path, guess, seconds=time.perf_counter() - t0, error=str(exc))
+    if found is None:
+        # rejected, possibly half-way: what reached the sink is discarded
+        return FileResult(path, None, seconds=time.perf_counter() - t0)
+    return FileResult(
+        path, found, groups.count, time.perf_counter() - t0, groups=groups
+    )
+
+
+def bounded_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    jobs: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[R]:
+    """
+    fn(item) for every item, in completion order: in `executor`, else in
+    a process pool of `jobs` workers (cpu_count by default; 1 runs in this
+    process). At most a few calls per worker are in flight, so `items` may
+    be a lazy iterator over a huge tree. `fn` must pickle for a pool.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if executor is None and jobs <= 1:
+        yield from map(fn, items)
+        return
+
+    pool = executor or ProcessPoolExecutor(max_workers=jobs)
+    window = _WINDOW * jobs
+    pending: Set[Future[R]] = set()
+    try:
+        for item in items:
+            pending.add(pool.submit(fn, item))
+            while len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from (future.result() for future in done)
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is None:
+            pool.shutdown()
+
+
+def _parse_chunk(
+    paths: List[Path], args: Tuple[Any, ...]
+) -> Tuple[List[FileResult], Optional[GroupBy]]:
+    results = [parse_file(path, *args) for path in paths]
+    into = None
+    for result in results:
+        if result.groups is not None:
+            into = result.groups if into is None else into.merge(result.groups)
+            result.groups = None
+    return results, into
+
+
+def _chunks(paths: Iterable[Path], size: int) -> Iterator[List[Path]]:
+    chunk: List[Path] = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_files(
+    paths: Iterable[Path],
+    into: GroupBy,
+    *,
+    fmt: Optional[str] = None,
+    where: Optional[StepFilter] = None,
+    canon: Optional[Canonicalizer] = None,
+    jobs: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[FileResult]:
+    """
+    parse_file() for every path, merged into `into` (its key and accuracy
+    apply); yields the FileResults in completion order. `jobs` and
+    `executor` are as for bounded_map().
+    """
+    args = (fmt, into.key, into.relative_accuracy, where, canon)
+    inline = executor is None and (jobs or os.cpu_count() or 1) <= 1
+    chunks = _chunks(paths, 1 if inline else CHUNK_FILES)
+    for results, groups in bounded_map(
+        partial(_parse_chunk, args=args), chunks, jobs=jobs, executor=executor
+    ):
+        if groups is not None:
+            into.merge(groups)
+        yield from results
@@ -0,0 +1,271 @@
+"""
+Persistent cache of parsed logs.
+
+Entries are keyed by the absolute path, size and mtime of the input (every
+*.json entry for directories) plus PARSERS_VERSION, and store the detected
+format with the step columns in a flat binary layout. Loading memory-maps
+the file and exposes the columns as zero-copy memoryviews. The cache
+directory is bounded by size; the least recently used entries are evicted.
+
+MemoryCache keeps the tables in process memory instead (long-running
+processes such as `deeptrace serve`), optionally in front of a StepCache.
+"""
+
+from __future__ import annotations
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple, Union
+
+from deeptrace.core.models import StepTable
+from deeptrace.core.registry import PARSERS_VERSION
+
+if TYPE_CHECKING:
+    from deeptrace.core.canonical import Canonicalizer
+
+__all__ = [
+    "DEFAULT_MAX_BYTES",
+    "DEFAULT_MEMORY_BYTES",
+    "MemoryCache",
+    "StepCache",
+    "default_cache_dir",
+]
+
+DEFAULT_MAX_BYTES = 1 << 30
+DEFAULT_MEMORY_BYTES = 512 << 20
+
+_MAGIC = b"DTSC"
+_FORMAT = 1
+# magic, format, rows, names, fmt length, names blob length
+_HEADER = struct.Struct("<4sHQIHQ")
+_SUFFIX = ".dtc"
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "deeptrace"
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class StepCache:
+    """On-disk LRU cache: path → (format, StepTable)."""
+
+    def __init__(
+        self, root: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.root = Path(root) if root is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+
+    # ------------------------------------------------------------------ #
+    def key(self, path: Path) -> str:
+        path = Path(path).resolve()
+        h = hashlib.sha1(f"{PARSERS_VERSION}\0{path}".encode())
+        if path.is_dir():
+            for entry in sorted(path.glob("*.json*")):
+                st = entry.stat()
+                h.update(f"\0{entry.name}:{st.st_size}:{st.st_mtime_ns}".encode())
+        else:
+            st = path.stat()
+            h.update(f"\0{st.st_size}:{st.st_mtime_ns}".encode())
+        return h.hexdigest()
+
+    def _file(self, path: Path) -> Path:
+        return self.root / f"{self.key(path)}{_SUFFIX}"
+
+    def get(self, path: Path) -> Optional[Tuple[str, StepTable]]:
+        try:
+            file = self._file(path)
+            if not file.exists():
+                return None
+            result = self._load(file)
+            os.utime(file)  # LRU: mtime is the last access time
+            return result
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def put(self, path: Path, fmt: str, table: StepTable) -> None:
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            file = self._file(path)
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                self._dump(fh, fmt, table)
+            os.replace(tmp, file)
+            self.evict()
+        except OSError:
+            # caching is best effort
+            return
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits max_bytes."""
+        entries: List[Tuple[float, int, Path]] = []
+        for f in self.root.glob(f"*{_SUFFIX}"):
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        total = sum(size for _, size, _ in entries)
+        for _, size, f in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                f.unlink()
+                total -= size
+            except OSError:
+                continue
+
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _dump(fh, fmt: str, table: StepTable) -> None:
+        fmt_b = fmt.encode()
+        encoded = [n.encode("utf-8", "surrogatepass") for n in table.names]
+        names_b = array("I", map(len, encoded)).tobytes() + b"".join(encoded)
+        header = _HEADER.pack(
+            _MAGIC, _FORMAT, len(table), len(table.names), len(fmt_b), len(names_b)
+        )
+        head = header + fmt_b + names_b
+        fh.write(head + b"\0" * (_align(len(head)) - len(head)))
+        fh.write(table.start.tobytes())
+        fh.write(table.end.tobytes())
+        fh.write(table.name_ids.tobytes())
+
+    @staticmethod
+    def _load(file: Path) -> Tuple[str, StepTable]:
+        with file.open("rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        magic, version, rows, n_names, fmt_len, names_len = _HEADER.unpack_from(view)
+        if magic != _MAGIC or version != _FORMAT:
+            raise ValueError(f"{file}: not a deeptrace cache entry")
+        off = _HEADER.size
+        fmt = bytes(view[off : off + fmt_len]).decode()
+        off += fmt_len
+        lengths = view[off : off + n_names * 4].cast("I")
+        names: List[str] = []
+        pos = off + n_names * 4
+        for n in lengths:
+            names.append(bytes(view[pos : pos + n]).decode("utf-8", "surrogatepass"))
+            pos += n
+        lengths.release()
+        off = _align(off + names_len)
+        if len(view) < off + rows * 20:
+            raise ValueError(f"{file}: truncated cache entry")
+        start = view[off : off + rows * 8].cast("q")
+        end = view[off + rows * 8 : off + rows * 16].cast("q")
+        name_ids = view[off + rows * 16 : off + rows * 20].cast("i")
+        return fmt, StepTable.from_buffers(names, name_ids, start, end)
+
+
+def _table_bytes(table: StepTable) -> int:
+    # 8 + 8 + 4 bytes of columns per row, names with their str overhead
+    return len(table) * 20 + sum(49 + len(n) for n in table.names)
+
+
+class MemoryCache(StepCache):
+    """
+    In-memory LRU: path → (format, StepTable), bounded by the estimated
+    size of the tables, keyed like StepCache (path, size, mtime). Misses
+    fall through to `disk` when given, and new entries are written there
+    too. Tables renamed by a Canonicalizer are kept as entries of their
+    own (get_renamed), so reusing the same Canonicalizer object skips the
+    renaming as well. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MEMORY_BYTES,
+        disk: Optional[StepCache] = None,
+    ) -> None:
+        super().__init__(disk.root if disk is not None else None, max_bytes)
+        self.disk = disk
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        # path key, or (path key, Canonicalizer) for renamed tables
+        self._entries: OrderedDict[
+            Union[str, Tuple[str, Any]], Tuple[str, StepTable, int]
+        ]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(
+        self, key: Union[str, Tuple[str, Any]]
+    ) -> Optional[Tuple[str, StepTable]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def get(self, path: Path) -> Optional[Tuple[str, StepTable]]:
+        try:
+            key = self.key(path)
+        except OSError:
+            return None
+        hit = self._lookup(key)
+        if hit is not None:
+            return hit
+        self.misses += 1
+        hit = self.disk.get(path) if self.disk is not None else None
+        if hit is not None:
+            self._store(key, *hit)
+        return hit
+
+    def get_renamed(
+        self, path: Path, canon: Canonicalizer
+    ) -> Optional[Tuple[str, StepTable]]:
+        """get() with the table renamed by `canon`, see StepTable.rename()."""
+        try:
+            key = self.key(path)
+        except OSError:
+            return None
+        hit = self._lookup((key, canon))
+        if hit is not None:
+            return hit
+        hit = self.get(path)
+        if hit is None:
+            return None
+        fmt, table = hit[0], hit[1].rename(canon)
+        self._store((key, canon), fmt, table)
+        return fmt, table
+
+    def put(self, path: Path, fmt: str, table: StepTable) -> None:
+        try:
+            self._store(self.key(path), fmt, table)
+        except OSError:
+            return
+        if self.disk is not None:
+            self.disk.put(path, fmt, table)
+
+    def _store(
+        self, key: Union[str, Tuple[str, Any]], fmt: str, table: StepTable
+    ) -> None:
+        size = _table_bytes(table)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._entries[key] = (fmt, table, size)
+            self.nbytes += size
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used tables; the newest one always stays."""
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
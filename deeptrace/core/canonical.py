@@ -0,0 +1,170 @@
+"""
+Step-name canonicalization: collapse high-cardinality names before grouping.
+
+URL-like names repeat with ids in them (`/users/8123/orders/991`), so every
+request becomes a group of its own. A Canonicalizer maps such names to one
+template (`/users/{id}/orders/{id}`):
+
+* user rules (`PATTERN=REPLACEMENT`, re.sub syntax) are applied first, in
+  the order given;
+* in URL-like words of a name (with a scheme, starting with "/" or
+  following an HTTP method) the query string and fragment are dropped and
+  path segments made of digits, UUIDs or hex hashes become {id}, {uuid}
+  and {hash}. Other words are kept, so "Step 1/3" or "Run A/B test?"
+  stay as they are.
+
+Everything is compiled once; results are memoised in a bounded LRU and
+interned, so repeated names cost one dict lookup and share one string.
+Tables are renamed through their name dictionary (StepTable.rename), i.e.
+in O(distinct names), not O(steps).
+"""
+
+from __future__ import annotations
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+from deeptrace.core.models import Step
+from deeptrace.core.pushdown import StepSink
+
+__all__ = [
+    "Canonicalizer",
+    "CanonicalSink",
+    "canonicalize",
+    "from_options",
+    "parse_rule",
+]
+
+DEFAULT_MEMO_SIZE = 65_536
+
+# a whole path segment: between "/" and the next "/", "?", "#" or the end
+_SEGMENT = r"(?<=/)(?:{})(?=[/?#]|$)"
+_TEMPLATES: Tuple[Tuple[Pattern[str], str], ...] = (
+    (
+        re.compile(
+            _SEGMENT.format(
+                r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-"
+                r"[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+            )
+        ),
+        "{uuid}",
+    ),
+    # at least 16 hex digits with a digit in them: not a plain word
+    (re.compile(_SEGMENT.format(r"(?=[a-fA-F]*[0-9])[0-9a-fA-F]{16,}")), "{hash}"),
+    (re.compile(_SEGMENT.format(r"[0-9]+")), "{id}"),
+)
+
+_SCHEME = re.compile(r"[A-Za-z][\w+.-]*://")
+_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE")
+)
+_WORDS = re.compile(r"(\s+)")
+
+Rule = Tuple[Pattern[str], str]
+
+
+def _template_url(url: str) -> str:
+    cut = min((i for i in (url.find("?"), url.find("#")) if i >= 0), default=len(url))
+    url = url[:cut]
+    for pattern, replacement in _TEMPLATES:
+        url = pattern.sub(replacement, url)
+    return url
+
+
+def _template_urls(name: str) -> str:
+    # words and the whitespace between them alternate: words are even
+    parts = _WORDS.split(name)
+    for i in range(0, len(parts), 2):
+        word = parts[i]
+        if "/" in word and (
+            word.startswith("/")
+            or _SCHEME.match(word)
+            or (i >= 2 and parts[i - 2] in _METHODS)
+        ):
+            parts[i] = _template_url(word)
+    return "".join(parts)
+
+
+def parse_rule(text: str) -> Rule:
+    """
+    "PATTERN=REPLACEMENT" -> compiled rule; split at the last "=", so the
+    pattern may contain "=" (lookaheads) but the replacement may not.
+    """
+    pattern, sep, replacement = text.rpartition("=")
+    if not sep or not pattern:
+        raise ValueError(f"expected PATTERN=REPLACEMENT, got {text!r}")
+    try:
+        return re.compile(pattern), replacement
+    except re.error as exc:
+        raise ValueError(f"bad pattern {pattern!r}: {exc}") from None
+
+
+class Canonicalizer:
+    """
+    Callable name -> canonical name. `rules` are "PATTERN=REPLACEMENT"
+    strings or compiled (pattern, replacement) pairs; `templates=False`
+    keeps URL paths and query strings as they are.
+    """
+
+    __slots__ = ("rules", "templates", "memo_size", "_memo")
+
+    def __init__(
+        self,
+        rules: Iterable[str | Rule] = (),
+        *,
+        templates: bool = True,
+        memo_size: int = DEFAULT_MEMO_SIZE,
+    ) -> None:
+        self.rules: List[Rule] = [
+            parse_rule(r) if isinstance(r, str) else r for r in rules
+        ]
+        self.templates = templates
+        self.memo_size = memo_size
+        self._memo = lru_cache(maxsize=memo_size)(self._canonical)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # for process pools: the memo is rebuilt, not pickled
+        return (_restore, (self.rules, self.templates, self.memo_size))
+
+    def __bool__(self) -> bool:
+        """False when no name is ever changed."""
+        return self.templates or bool(self.rules)
+
+    def __call__(self, name: str) -> str:
+        return self._memo(name)
+
+    def _canonical(self, name: str) -> str:
+        for pattern, replacement in self.rules:
+            name = pattern.sub(replacement, name)
+        if self.templates and "/" in name:
+            name = _template_urls(name)
+        return sys.intern(name)
+
+
+def _restore(rules: List[Rule], templates: bool, memo_size: int) -> Canonicalizer:
+    return Canonicalizer(rules, templates=templates, memo_size=memo_size)
+
+
+class CanonicalSink:
+    """Renames steps on their way into `sink` (see core.pushdown)."""
+
+    __slots__ = ("canon", "_append")
+
+    def __init__(self, sink: StepSink, canon: Canonicalizer) -> None:
+        self.canon = canon
+        self._append = sink.append
+
+    def append(self, name: str, start_ms: int, end_ms: int) -> None:
+        self._append(self.canon(name), start_ms, end_ms)
+
+
+def canonicalize(steps: Sequence[Step], canon: Canonicalizer) -> List[Step]:
+    """Steps with canonical names; depth and parent are kept."""
+    return [Step(canon(s.name), s.start_ms, s.end_ms, s.depth, s.parent) for s in steps]
+
+
+def from_options(raw: bool, rules: Sequence[str]) -> Optional[Canonicalizer]:
+    """Canonicalizer for the --raw-names / --name-rule CLI options."""
+    canon = Canonicalizer(rules, templates=not raw)
+    return canon if canon else None
@@ -0,0 +1,200 @@
+"""
+Distribution-aware comparison of a baseline run set against a candidate set.
+
+For every step name all raw durations of each side are kept and compared
+with a two-sided Mann-Whitney U test (normal approximation with tie and
+continuity correction). The effect size is Cliff's delta: +1 means every
+candidate sample is slower than every baseline sample. With NumPy the test
+runs for all step names at once over a single lexsort.
+"""
+
+from __future__ import annotations
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from deeptrace.core.defaults import DEFAULT_ALPHA, DEFAULT_MIN_EFFECT
+from deeptrace.core.models import NUMPY_MIN_ROWS, StepTable, np
+
+__all__ = ["StepDiff", "compare_runs", "mann_whitney"]
+
+
+@dataclass(slots=True)
+class StepDiff:
+    """One row of an A/B comparison."""
+
+    name: str
+    n_a: int
+    n_b: int
+    avg_a: Optional[int]
+    avg_b: Optional[int]
+    effect: Optional[float] = None
+    p_value: Optional[float] = None
+    status: str = "same"  # slower | faster | same | new | gone
+
+    @property
+    def delta(self) -> Optional[int]:
+        if self.avg_a is None or self.avg_b is None:
+            return None
+        return self.avg_b - self.avg_a
+
+
+def _p_value(u1: float, n1: int, n2: int, tie_sum: float) -> float:
+    n = n1 + n2
+    var = n1 * n2 / 12 * ((n + 1) - tie_sum / (n * (n - 1))) if n > 1 else 0.0
+    if var <= 0:
+        return 1.0
+    z = max(abs(u1 - n1 * n2 / 2) - 0.5, 0.0) / math.sqrt(var)
+    return min(1.0, math.erfc(z / math.sqrt(2)))
+
+
+def mann_whitney(x: Sequence[int], y: Sequence[int]) -> Tuple[float, float]:
+    """Two-sided p-value and Cliff's delta of y relative to x."""
+    n1, n2 = len(x), len(y)
+    merged = sorted([(v, 0) for v in x] + [(v, 1) for v in y])
+    n = n1 + n2
+    r1 = 0.0
+    tie_sum = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and merged[j + 1][0] == merged[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        r1 += avg_rank * sum(1 for k in range(i, j + 1) if merged[k][1] == 0)
+        t = j - i + 1
+        tie_sum += t**3 - t
+        i = j + 1
+    u1 = r1 - n1 * (n1 + 1) / 2
+    return _p_value(u1, n1, n2, tie_sum), 1 - 2 * u1 / (n1 * n2)
+
+
+def _classify(row: StepDiff, alpha: float, min_effect: float) -> None:
+    if row.n_a == 0:
+        row.status = "new"
+    elif row.n_b == 0:
+        row.status = "gone"
+    elif row.p_value is not None and row.effect is not None and row.p_value < alpha:
+        if row.effect >= min_effect:
+            row.status = "slower"
+        elif row.effect <= -min_effect:
+            row.status = "faster"
+
+
+def _rows_python(
+    baseline: Sequence[StepTable], candidate: Sequence[StepTable]
+) -> List[StepDiff]:
+    samples: Dict[str, Tuple[array, array]] = {}
+    for side, tables in enumerate((baseline, candidate)):
+        for t in tables:
+            names = t.names
+            for idx, d in zip(t.name_ids, t.durations()):
+                pair = samples.get(names[idx])
+                if pair is None:
+                    pair = samples[names[idx]] = (array("q"), array("q"))
+                pair[side].append(d)
+
+    rows = []
+    for name, (a, b) in samples.items():
+        row = StepDiff(
+            name,
+            len(a),
+            len(b),
+            int(sum(a) / len(a)) if a else None,
+            int(sum(b) / len(b)) if b else None,
+        )
+        if a and b:
+            row.p_value, row.effect = mann_whitney(a, b)
+        rows.append(row)
+    return rows
+
+
+def _rows_numpy(
+    baseline: Sequence[StepTable], candidate: Sequence[StepTable]
+) -> List[StepDiff]:
+    gid_of: Dict[str, int] = {}
+    gids, vals, sides = [], [], []
+    for side_no, tables in enumerate((baseline, candidate)):
+        for t in tables:
+            remap = np.array(
+                [gid_of.setdefault(n, len(gid_of)) for n in t.names], dtype=np.int64
+            )
+            gids.append(remap[np.frombuffer(t.name_ids, dtype=np.int32)])
+            vals.append(np.frombuffer(t.durations(), dtype=np.int64))
+            sides.append(np.full(len(t), side_no, dtype=np.int8))
+    names = list(gid_of)
+    n_groups = len(names)
+    gid = np.concatenate(gids)
+    val = np.concatenate(vals)
+    side = np.concatenate(sides)
+
+    # rank every value inside its group, ties get the average rank
+    order = np.lexsort((val, gid))
+    g, v, s = gid[order], val[order], side[order]
+    n = len(g)
+    pos = np.arange(n)
+    new_group = np.r_[True, g[1:] != g[:-1]]
+    group_start = np.maximum.accumulate(np.where(new_group, pos, 0))
+    new_run = new_group | np.r_[True, v[1:] != v[:-1]]
+    run_start = pos[new_run]
+    run_len = np.diff(np.r_[run_start, n]).astype(np.float64)
+    run_rank = (2 * run_start + run_len - 1) / 2 - group_start[run_start] + 1
+    rank = run_rank[np.cumsum(new_run) - 1]
+
+    is_a = s == 0
+    n1 = np.bincount(g[is_a], minlength=n_groups)
+    n2 = np.bincount(g[~is_a], minlength=n_groups)
+    sum_a = np.bincount(g[is_a], weights=v[is_a], minlength=n_groups)
+    sum_b = np.bincount(g[~is_a], weights=v[~is_a], minlength=n_groups)
+    r1 = np.bincount(g[is_a], weights=rank[is_a], minlength=n_groups)
+    tie_sum = np.bincount(
+        g[run_start], weights=run_len**3 - run_len, minlength=n_groups
+    )
+    u1 = r1 - n1 * (n1 + 1) / 2
+
+    rows = []
+    for i, name in enumerate(names):
+        a, b = int(n1[i]), int(n2[i])
+        row = StepDiff(
+            name,
+            a,
+            b,
+            int(sum_a[i] / a) if a else None,
+            int(sum_b[i] / b) if b else None,
+        )
+        if a and b:
+            row.p_value = _p_value(float(u1[i]), a, b, float(tie_sum[i]))
+            row.effect = 1 - 2 * float(u1[i]) / (a * b)
+        rows.append(row)
+    return rows
+
+
+def compare_runs(
+    baseline: Sequence[StepTable],
+    candidate: Sequence[StepTable],
+    *,
+    alpha: float = DEFAULT_ALPHA,
+    min_effect: float = DEFAULT_MIN_EFFECT,
+) -> List[StepDiff]:
+    """
+    One StepDiff per step name, largest |effect| first; steps that exist on
+    one side only ("new" / "gone") come last.
+    """
+    total = sum(len(t) for t in baseline) + sum(len(t) for t in candidate)
+    if np is not None and total >= NUMPY_MIN_ROWS:
+        rows = _rows_numpy(baseline, candidate)
+    else:
+        rows = _rows_python(baseline, candidate)
+
+    for row in rows:
+        _classify(row, alpha, min_effect)
+    rows.sort(
+        key=lambda r: (
+            r.effect is None,
+            -abs(r.effect or 0.0),
+            -abs(r.delta or 0),
+            r.name,
+        )
+    )
+    return rows
@@ -0,0 +1,17 @@
+"""
+Tunable defaults shared by the core and the CLI option declarations.
+
+Kept free of imports so that building the CLI does not load the analysis
+modules (and NumPy) before a command actually runs.
+"""
+
+# relative error bound of QuantileSketch percentiles
+DEFAULT_ACCURACY = 0.01
+
+# compare: significance level of the Mann-Whitney test
+DEFAULT_ALPHA = 0.05
+# compare: |Cliff's delta| below this is negligible (Romano et al., 2006)
+DEFAULT_MIN_EFFECT = 0.147
+
+# variance: run means varying more than this (stddev / mean) are unstable
+DEFAULT_CV_LIMIT = 0.25
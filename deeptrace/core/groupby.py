@@ -0,0 +1,174 @@
+"""
+Single-pass per-name aggregation with constant-size state.
+
+Every step name keeps a StepStats: count, Welford mean / M2 (variance
+without a second pass or catastrophic cancellation) and a QuantileSketch
+for min, max, total and quantiles. Nothing grows with the number of
+steps, and two GroupBy objects built from different files or worker
+processes merge exactly (Chan et al. for the variance, bucket sums for the
+sketch), so ranking by p95, max or total time needs no raw durations.
+"""
+
+from __future__ import annotations
+import math
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+from deeptrace.core.models import NUMPY_MIN_ROWS, Step, StepTable, np
+from deeptrace.core.sketch import DEFAULT_ACCURACY, QuantileSketch
+
+__all__ = ["RANK_KEYS", "GroupBy", "StepStats"]
+
+
+class StepStats:
+    """Aggregated durations of one step name, ms."""
+
+    __slots__ = ("count", "mean", "m2", "sketch")
+
+    def __init__(self, relative_accuracy: float = DEFAULT_ACCURACY) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, duration: int) -> None:
+        self.count += 1
+        delta = duration - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (duration - self.mean)
+        self.sketch.add(duration)
+
+    def merge(self, other: StepStats) -> StepStats:
+        """Fold `other` into this one (in place) and return self."""
+        if not other.count:
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.mean += delta * other.count / n
+        self.count = n
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def total(self) -> float:
+        return self.sketch.total
+
+    @property
+    def min(self) -> float:
+        return self.sketch.min if self.count else 0
+
+    @property
+    def max(self) -> float:
+        return self.sketch.max if self.count else 0
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1), 0 for a single value."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def percentile(self, p: float) -> int:
+        return self.sketch.percentile(p)
+
+    def __repr__(self) -> str:
+        return (
+            f"StepStats(count={self.count}, mean={self.mean:.1f}, "
+            f"stddev={self.stddev:.1f}, max={self.max})"
+        )
+
+
+# --rank-by keys: StepStats -> ms; avg is total / count, as deduplicate_avg()
+RANK_KEYS: Dict[str, Callable[[StepStats], float]] = {
+    "avg": lambda s: s.total / s.count if s.count else 0.0,
+    "p50": lambda s: s.percentile(50),
+    "p90": lambda s: s.percentile(90),
+    "p95": lambda s: s.percentile(95),
+    "p99": lambda s: s.percentile(99),
+    "max": lambda s: s.max,
+    "total": lambda s: s.total,
+}
+
+
+class GroupBy:
+    """
+    Step sink (see core.pushdown) grouping durations by name into
+    StepStats; table() ranks them by `key` (one of RANK_KEYS).
+    """
+
+    __slots__ = ("key", "relative_accuracy", "groups", "count")
+
+    def __init__(
+        self, key: str = "avg", relative_accuracy: float = DEFAULT_ACCURACY
+    ) -> None:
+        if key not in RANK_KEYS:
+            raise ValueError(
+                f"unknown rank key {key!r}, expected {', '.join(RANK_KEYS)}"
+            )
+        self.key = key
+        self.relative_accuracy = relative_accuracy
+        self.groups: Dict[str, StepStats] = {}
+        self.count = 0
+
+    def _stats(self, name: str) -> StepStats:
+        stats = self.groups.get(name)
+        if stats is None:
+            stats = self.groups[name] = StepStats(self.relative_accuracy)
+        return stats
+
+    def append(self, name: str, start_ms: int, end_ms: int) -> None:
+        self.count += 1
+        self._stats(name).add(end_ms - start_ms if end_ms > start_ms else 0)
+
+    def update(self, steps: Union[Iterable[Step], StepTable]) -> GroupBy:
+        """Add parsed steps; a large StepTable is grouped in NumPy batches."""
+        if not isinstance(steps, StepTable):
+            for step in steps:
+                self.append(step.name, step.start_ms, step.end_ms)
+            return self
+        if np is None or len(steps) < NUMPY_MIN_ROWS:
+            names = steps.names
+            for idx, s, e in zip(steps.name_ids, steps.start, steps.end):
+                self.append(names[idx], s, e)
+            return self
+
+        ids = np.frombuffer(steps.name_ids, dtype=np.int32)
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+        cuts = np.flatnonzero(np.diff(sorted_ids)) + 1
+        firsts = sorted_ids[np.concatenate(([0], cuts))].tolist()
+        durations = np.frombuffer(steps.durations(), dtype=np.int64)[order]
+        for idx, chunk in zip(firsts, np.split(durations, cuts)):
+            batch = StepStats(self.relative_accuracy)
+            batch.count = int(chunk.size)
+            batch.mean = float(chunk.mean())
+            batch.m2 = float(((chunk - batch.mean) ** 2).sum())
+            batch.sketch.update(chunk)
+            self._stats(steps.names[idx]).merge(batch)
+        self.count += len(steps)
+        return self
+
+    def merge(self, other: GroupBy) -> GroupBy:
+        """Fold `other` (another file or worker) into this one."""
+        for name, stats in other.groups.items():
+            self._stats(name).merge(stats)
+        self.count += other.count
+        return self
+
+    def ranked(self) -> List[Tuple[str, StepStats]]:
+        """(name, stats) by `key`, largest first; ties keep first-seen order."""
+        value = RANK_KEYS[self.key]
+        return sorted(self.groups.items(), key=lambda item: -value(item[1]))
+
+    def table(self) -> StepTable:
+        """
+        One row per name with `key` as its duration (start_ms = 0), the shape
+        deduplicate_avg() returns.
+        """
+        value = RANK_KEYS[self.key]
+        out = StepTable()
+        for name, stats in self.groups.items():
+            out.append(name, 0, int(value(stats)))
+        return out
@@ -0,0 +1,112 @@
+"""
+HAR timing phases and per-host / per-resource-type aggregation.
+
+An entry's `timings` split its `time` into blocked, dns, connect, send,
+wait (time to first byte) and receive; `ssl` is part of `connect` (HAR
+1.2), so phase_durations() reports connect without it to keep the phases
+additive. -1 means "not applicable" and counts as 0.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+__all__ = [
+    "GROUP_KEYS",
+    "PHASES",
+    "PhaseRow",
+    "host",
+    "phase_breakdown",
+    "phase_durations",
+    "resource_type",
+]
+
+PHASES = ("blocked", "dns", "connect", "ssl", "send", "wait", "receive")
+
+# mimeType fragment -> resource type, first match wins
+_MIME_TYPES = (
+    ("html", "document"),
+    ("css", "stylesheet"),
+    ("javascript", "script"),
+    ("ecmascript", "script"),
+    ("image/", "image"),
+    ("font", "font"),
+    ("woff", "font"),
+    ("json", "xhr"),
+    ("xml", "xhr"),
+    ("video/", "media"),
+    ("audio/", "media"),
+)
+
+
+def phase_durations(entry: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """(phase, ms) in PHASES order, ssl taken out of connect."""
+    timings = entry.get("timings") or {}
+    values = {}
+    for name in PHASES:
+        try:
+            values[name] = max(float(timings.get(name) or 0), 0.0)
+        except (TypeError, ValueError):
+            values[name] = 0.0
+    values["connect"] = max(values["connect"] - values["ssl"], 0.0)
+    return [(name, values[name]) for name in PHASES]
+
+
+def host(entry: Dict[str, Any]) -> str:
+    url = entry.get("request", {}).get("url", "")
+    return urlsplit(url).netloc or "(none)"
+
+
+def resource_type(entry: Dict[str, Any]) -> str:
+    """Chrome's `_resourceType` when present, otherwise from the MIME type."""
+    kind = entry.get("_resourceType")
+    if kind:
+        return str(kind).lower()
+    mime = (entry.get("response", {}).get("content", {}).get("mimeType") or "").lower()
+    for fragment, kind in _MIME_TYPES:
+        if fragment in mime:
+            return kind
+    return "other"
+
+
+GROUP_KEYS = {"host": host, "type": resource_type}
+
+
+@dataclass(slots=True)
+class PhaseRow:
+    """Summed timings of the entries of one group."""
+
+    group: str
+    count: int = 0
+    total_ms: float = 0.0
+    phases: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0.0))
+
+    @property
+    def dominant(self) -> str:
+        """Phase with the largest share of the time, "-" without timings."""
+        name = max(PHASES, key=self.phases.__getitem__)
+        return name if self.phases[name] > 0 else "-"
+
+
+def phase_breakdown(
+    entries: Iterable[Dict[str, Any]], by: str = "host"
+) -> List[PhaseRow]:
+    """
+    One pass over HAR entries: per group (`by` is a GROUP_KEYS name) the
+    number of requests and the summed total and phase times, largest total
+    first.
+    """
+    key = GROUP_KEYS[by]
+    rows: Dict[str, PhaseRow] = {}
+    for entry in entries:
+        group = key(entry)
+        row = rows.get(group)
+        if row is None:
+            row = rows[group] = PhaseRow(group)
+        row.count += 1
+        row.total_ms += max(float(entry.get("time") or 0), 0.0)
+        phases = row.phases
+        for name, ms in phase_durations(entry):
+            phases[name] += ms
+    return sorted(rows.values(), key=lambda r: -r.total_ms)
@@ -0,0 +1,83 @@
+"""
+Transparent access to compressed inputs.
+
+Parsers open files through open_input() / read_input(): gzip, bzip2 and xz
+are recognised by their magic bytes and decompressed while reading, so CI
+artifacts never have to be extracted to disk first. logical_name() and
+logical_suffix() drop the compression suffix ("run.har.gz" -> ".har") for
+suffix-based sniffing.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from deeptrace.core import profiling
+
+__all__ = [
+    "COMPRESSION_SUFFIXES",
+    "compression",
+    "logical_name",
+    "logical_suffix",
+    "open_input",
+    "read_input",
+]
+
+COMPRESSION_SUFFIXES = (".gz", ".bz2", ".xz")
+
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+)
+
+
+def compression(path: Path) -> Optional[str]:
+    """Compression detected from the magic bytes: gzip, bz2, xz or None."""
+    if Path(path).is_dir():
+        return None
+    with open(path, "rb") as fh:
+        magic = fh.read(6)
+    for prefix, kind in _MAGIC:
+        if magic.startswith(prefix):
+            return kind
+    return None
+
+
+def open_input(path: Path) -> BinaryIO:
+    """Binary stream of the (decompressed) file contents."""
+    kind = compression(path)
+    if kind == "gzip":
+        import gzip
+
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    if kind == "bz2":
+        import bz2
+
+        return bz2.open(path, "rb")  # type: ignore[return-value]
+    if kind == "xz":
+        import lzma
+
+        return lzma.open(path, "rb")  # type: ignore[return-value]
+    return open(path, "rb")
+
+
+def read_input(path: Path) -> bytes:
+    with open_input(path) as fh:
+        data = fh.read()
+    profiling.count("bytes_read", len(data))
+    return data
+
+
+def logical_name(path: Path) -> str:
+    """File name without a trailing compression suffix."""
+    name = Path(path).name
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def logical_suffix(path: Path) -> str:
+    """Lower-cased suffix of logical_name(): "run.JSON.gz" -> ".json"."""
+    return Path(logical_name(path)).suffix.lower()
@@ -0,0 +1,142 @@
+"""
+Timeline analysis of step intervals: one sort plus a sweep line, O(n log n).
+
+While sweeping, two running integrals are kept: F(t) = ∫ 1/k dt and
+G(t) = ∫ [k == 1] dt over the time where k > 0 steps are active. A step
+open over [s, e) is then attributed F(e) - F(s) of wall-clock time (every
+covered millisecond split evenly between the steps running in it, so the
+attributions add up to the coverage) and owns G(e) - G(s) exclusively
+(the time it runs alone: removing it shortens the run by at least that).
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+from deeptrace.core.models import Step, StepTable
+
+__all__ = ["Contribution", "Timeline", "contributions", "leaf_steps", "sweep"]
+
+# events at the same instant: ends first, so touching steps do not overlap
+_END, _START = 0, 1
+
+
+@dataclass(slots=True)
+class Timeline:
+    """Result of sweep(); per-step lists follow the input order."""
+
+    span_ms: int = 0  # first start -> last end
+    coverage_ms: int = 0  # time with at least one step running
+    max_concurrency: int = 0
+    # ms spent at each concurrency level (1, 2, ...)
+    histogram: Dict[int, int] = field(default_factory=dict)
+    # idle [start, end) gaps between the first start and the last end
+    gaps: List[Tuple[int, int]] = field(default_factory=list)
+    attributed: List[float] = field(default_factory=list)
+    exclusive: List[int] = field(default_factory=list)
+
+    @property
+    def idle_ms(self) -> int:
+        return self.span_ms - self.coverage_ms
+
+    @property
+    def avg_concurrency(self) -> float:
+        """Average number of steps running while anything runs."""
+        if not self.coverage_ms:
+            return 0.0
+        return sum(k * ms for k, ms in self.histogram.items()) / self.coverage_ms
+
+
+def sweep(starts: Sequence[int], ends: Sequence[int]) -> Timeline:
+    """Timeline of the intervals [starts[i], ends[i]); end <= start is empty."""
+    n = len(starts)
+    out = Timeline(attributed=[0.0] * n, exclusive=[0] * n)
+    if not n:
+        return out
+
+    # empty steps take no time and change nothing
+    events = [(s, _START, i) for i, (s, e) in enumerate(zip(starts, ends)) if e > s]
+    events += [(e, _END, i) for i, (s, e) in enumerate(zip(starts, ends)) if e > s]
+    if not events:
+        return out
+    events.sort()
+
+    f_open = [0.0] * n
+    g_open = [0] * n
+    hist: Dict[int, int] = {}
+    gaps = out.gaps
+    f, g, active = 0.0, 0, 0
+    prev = events[0][0]
+    for t, kind, i in events:
+        if t > prev:
+            dt = t - prev
+            if active:
+                f += dt / active
+                hist[active] = hist.get(active, 0) + dt
+                if active == 1:
+                    g += dt
+            else:
+                gaps.append((prev, t))
+            prev = t
+        if kind == _START:
+            f_open[i] = f
+            g_open[i] = g
+            active += 1
+        else:
+            out.attributed[i] = f - f_open[i]
+            out.exclusive[i] = g - g_open[i]
+            active -= 1
+
+    out.span_ms = prev - events[0][0]
+    out.histogram = dict(sorted(hist.items()))
+    out.coverage_ms = sum(hist.values())
+    out.max_concurrency = max(hist, default=0)
+    return out
+
+
+def leaf_steps(steps: Sequence[Step]) -> List[Step]:
+    """
+    Steps that have no children (see Step.parent). A parent spans its
+    children, so counting both would double the concurrency; flat formats
+    are returned unchanged.
+    """
+    parents = {s.parent for s in steps if s.parent >= 0}
+    if not parents:
+        return list(steps)
+    return [s for i, s in enumerate(steps) if i not in parents]
+
+
+@dataclass(slots=True)
+class Contribution:
+    """What one step name adds to the run's wall-clock time."""
+
+    name: str
+    count: int
+    total_ms: int  # sum of raw durations
+    attributed_ms: float  # share of wall-clock time
+    exclusive_ms: int  # time no other step was running
+
+
+def contributions(
+    steps: Union[Iterable[Step], StepTable],
+) -> Tuple[List[Contribution], Timeline]:
+    """
+    Per-name contributions, largest wall-clock share first, and the
+    timeline they were computed from.
+    """
+    table = steps if isinstance(steps, StepTable) else StepTable.from_steps(steps)
+    timeline = sweep(table.start, table.end)
+    acc: Dict[int, Contribution] = {}
+    names = table.names
+    for idx, s, e, share, alone in zip(
+        table.name_ids, table.start, table.end, timeline.attributed, timeline.exclusive
+    ):
+        c = acc.get(idx)
+        if c is None:
+            c = acc[idx] = Contribution(names[idx], 0, 0, 0.0, 0)
+        c.count += 1
+        c.total_ms += max(e - s, 0)
+        c.attributed_ms += share
+        c.exclusive_ms += alone
+    ranked = sorted(acc.values(), key=lambda c: (-c.attributed_ms, -c.exclusive_ms))
+    return ranked, timeline
@@ -0,0 +1,205 @@
+"""
+Incremental JSON reading for event dumps that do not fit in memory.
+
+Only the event array is streamed: the file is read in fixed-size chunks
+through an incremental UTF-8 decoder and array elements are decoded one by
+one with JSONDecoder.raw_decode, so at most one chunk plus one element is
+held in memory at a time. An array that a preferred key later in the
+document may replace is decoded whole instead.
+"""
+
+from __future__ import annotations
+import codecs
+import json
+from typing import Any, BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+__all__ = ["CHUNK_SIZE", "decode_line", "iter_json_array"]
+
+CHUNK_SIZE = 1 << 16
+
+_WS = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+class _ChunkReader:
+    def __init__(self, fh: BinaryIO, chunk_size: int) -> None:
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, grow: bool = False) -> bool:
+        """Append the next chunk, dropping consumed text. False at EOF."""
+        if self.eof:
+            return False
+        # while a single value spans several chunks, read geometrically
+        # so that re-decoding it stays linear overall
+        size = max(self._chunk_size, len(self.buf) - self.pos if grow else 0)
+        data = self._fh.read(size)
+        if not data:
+            self.eof = True
+        text = self._utf8.decode(data, final=self.eof)
+        self.buf = self.buf[self.pos :] + text
+        self.pos = 0
+        return not self.eof or bool(text)
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF)."""
+        while True:
+            buf, pos, n = self.buf, self.pos, len(self.buf)
+            while pos < n and buf[pos] in _WS:
+                pos += 1
+            self.pos = pos
+            if pos < n:
+                return buf[pos]
+            if not self.fill():
+                return ""
+
+    def may_contain(self, tokens: Sequence[bytes]) -> bool:
+        """
+        Whether one of the ASCII `tokens` occurs in the unread input. The
+        file is searched as bytes and sought back; True when it cannot seek.
+        """
+        if not tokens:
+            return False
+        if not self._fh.seekable():
+            return True
+        text = self.buf[self.pos :]
+        if any(t.decode() in text for t in tokens):
+            return True
+        keep = max(map(len, tokens)) - 1
+        tail = text[-keep:].encode() if keep else b""
+        mark = self._fh.tell()
+        try:
+            while True:
+                data = self._fh.read(self._chunk_size)
+                if not data:
+                    return False
+                window = tail + data
+                if any(t in window for t in tokens):
+                    return True
+                tail = window[-keep:] if keep else b""
+        finally:
+            self._fh.seek(mark)
+
+    def take(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"malformed JSON: expected {ch!r}, got {got!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill(grow=True):
+                    continue
+                raise
+            # a number at the very end of the buffer may continue in the
+            # next chunk
+            if end == len(self.buf) and self.fill(grow=True):
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_items(reader: _ChunkReader) -> Iterator[Any]:
+    reader.take("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        ch = reader.peek()
+        reader.pos += 1
+        if ch == "]":
+            return
+        if ch != ",":
+            raise ValueError(f"malformed JSON array: unexpected {ch!r}")
+
+
+def _skip_rest_of_object(reader: _ChunkReader) -> None:
+    while True:
+        ch = reader.peek()
+        reader.pos += 1
+        if ch == "}":
+            return
+        if ch != ",":
+            raise ValueError(f"malformed JSON object: unexpected {ch!r}")
+        reader.value()
+        reader.take(":")
+        reader.value()
+
+
+def iter_json_array(
+    fh: BinaryIO, keys: Sequence[str], chunk_size: int = CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Yield the elements of a root-level array, or of the array stored under
+    the first of `keys` present in a root object, whatever the document
+    order. Values under other keys are decoded and discarded. An array is
+    streamed unless a byte search finds an earlier key of `keys` further
+    on; then it is decoded whole and kept until a better one turns up.
+    Raises ValueError when no event array is found or the document is
+    malformed.
+    """
+    reader = _ChunkReader(fh, chunk_size)
+    first = reader.peek()
+
+    if first == "[":
+        yield from _iter_items(reader)
+    elif first == "{":
+        reader.take("{")
+        if reader.peek() == "}":
+            raise ValueError("no event list found")
+        # (rank in keys, items) of the best array decoded so far
+        best: Optional[Tuple[int, List[Any]]] = None
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError("malformed JSON object: non-string key")
+            reader.take(":")
+            rank = keys.index(key) if key in keys else len(keys)
+            limit = len(keys) if best is None else best[0]
+            if rank < limit and reader.peek() == "[":
+                earlier = [json.dumps(k).encode() for k in keys[:rank]]
+                if not reader.may_contain(earlier):
+                    yield from _iter_items(reader)
+                    _skip_rest_of_object(reader)
+                    break
+                best = rank, reader.value()
+            else:
+                reader.value()
+            ch = reader.peek()
+            reader.pos += 1
+            if ch == "}":
+                if best is None:
+                    raise ValueError("no event list found")
+                yield from best[1]
+                break
+            if ch != ",":
+                raise ValueError(f"malformed JSON object: unexpected {ch!r}")
+    else:
+        raise ValueError("no event list found")
+
+    if reader.peek():
+        raise ValueError("malformed JSON: trailing data")
+
+
+def decode_line(line: Union[bytes, str]) -> Any:
+    """
+    Decode one line of a JSON Lines log. Also accepts an event array written
+    one element per line: bracket-only lines and blank lines give None and
+    a trailing comma is ignored. Raises ValueError for anything else.
+    """
+    text = line.decode() if isinstance(line, bytes) else line
+    text = text.strip()
+    if text.endswith(","):
+        text = text[:-1].rstrip()
+    if not text or text in ("[", "]"):
+        return None
+    return json.loads(text)
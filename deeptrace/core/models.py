@@ -1,5 +1,17 @@
 from __future__ import annotations
+import heapq
+import sys
+from array import array
 from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+try:  # optional fast path for batched column operations
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is not a hard dependency
+    np = None  # type: ignore[assignment]
+
+# below this size NumPy call overhead outweighs the gain
+NUMPY_MIN_ROWS = 4096
 
 
 @dataclass(slots=True)
@@ -7,14 +19,228 @@ class Step:
     """
     Unified model that represents a single log step.
 
-    All parsers must return List[Step].
+    All parsers must return List[Step]. Hierarchical formats (Allure) also
+    fill `depth` and `parent` – the index of the enclosing step in the same
+    list, -1 for top-level steps.
     """
 
     name: str
     start_ms: int
     end_ms: int
+    depth: int = 0
+    parent: int = -1
 
     @property
     def duration(self) -> int:
         """Step duration in milliseconds (non-negative)."""
         return max(self.end_ms - self.start_ms, 0)
+
+
+class StepTable:
+    """
+    Column-oriented replacement for List[Step] used by the analysis pipeline.
+
+    Names are interned into a dictionary (`names`) and referenced by index
+    from `name_ids`; start/end live in compact array('q') columns. Subsets
+    share the name dictionary. Step objects are only created when the table
+    is iterated or indexed, i.e. at the rendering boundary.
+    """
+
+    __slots__ = ("names", "name_ids", "start", "end", "_index")
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.name_ids = array("i")
+        self.start = array("q")
+        self.end = array("q")
+
+    @classmethod
+    def from_steps(cls, steps: Iterable[Step]) -> StepTable:
+        table = cls()
+        table.extend(steps)
+        return table
+
+    @classmethod
+    def from_buffers(
+        cls,
+        names: List[str],
+        name_ids: memoryview,
+        start: memoryview,
+        end: memoryview,
+    ) -> StepTable:
+        """
+        Read-only table over existing buffers (e.g. a memory-mapped cache
+        entry); columns are not copied, so append() is not supported.
+        """
+        table = cls()
+        table.names = [sys.intern(n) for n in names]
+        table._index = {n: i for i, n in enumerate(table.names)}
+        table.name_ids, table.start, table.end = name_ids, start, end  # type: ignore[assignment]
+        return table
+
+    # ------------------------------------------------------------------ #
+    def _intern(self, name: str) -> int:
+        idx = self._index.get(name)
+        if idx is None:
+            idx = self._index[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return idx
+
+    def append(self, name: str, start_ms: int, end_ms: int) -> None:
+        self.name_ids.append(self._intern(name))
+        self.start.append(start_ms)
+        self.end.append(end_ms)
+
+    def extend(self, steps: Iterable[Step]) -> None:
+        append = self.append
+        for s in steps:
+            append(s.name, s.start_ms, s.end_ms)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def __getitem__(self, i: int) -> Step:
+        return Step(self.names[self.name_ids[i]], self.start[i], self.end[i])
+
+    def __iter__(self) -> Iterator[Step]:
+        names = self.names
+        for idx, s, e in zip(self.name_ids, self.start, self.end):
+            yield Step(names[idx], s, e)
+
+    def __repr__(self) -> str:
+        return f"StepTable(rows={len(self)}, names={len(self.names)})"
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # memoryview columns (mapped cache entries) cannot be pickled
+        return {
+            "names": self.names,
+            "name_ids": array("i", self.name_ids),
+            "start": array("q", self.start),
+            "end": array("q", self.end),
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.names = state["names"]
+        self._index = {n: i for i, n in enumerate(self.names)}
+        self.name_ids = state["name_ids"]
+        self.start = state["start"]
+        self.end = state["end"]
+
+    @classmethod
+    def concat(cls, tables: Iterable[StepTable]) -> StepTable:
+        """Rows of all tables in order, re-interned into one dictionary."""
+        out = cls()
+        for t in tables:
+            remap = [out._intern(n) for n in t.names]
+            if remap == list(range(len(remap))):
+                out.name_ids.extend(t.name_ids)
+            elif t._use_numpy():
+                ids = np.asarray(remap, dtype=np.int32)[
+                    np.frombuffer(t.name_ids, dtype=np.int32)
+                ]
+                out.name_ids.frombytes(ids.tobytes())
+            else:
+                out.name_ids.extend(remap[i] for i in t.name_ids)
+            out.start.extend(t.start)
+            out.end.extend(t.end)
+        return out
+
+    def rename(self, fn: Callable[[str], str]) -> StepTable:
+        """
+        The same rows with every name mapped through `fn`; names mapped to
+        the same string merge. `fn` runs once per distinct name.
+        """
+        out = StepTable()
+        remap = [out._intern(fn(n)) for n in self.names]
+        if remap == list(range(len(remap))):
+            out.name_ids = array("i", self.name_ids)
+        elif self._use_numpy():
+            ids = np.asarray(remap, dtype=np.int32)[
+                np.frombuffer(self.name_ids, dtype=np.int32)
+            ]
+            out.name_ids = array("i", ids.tobytes())
+        else:
+            out.name_ids = array("i", [remap[i] for i in self.name_ids])
+        out.start = array("q", self.start)
+        out.end = array("q", self.end)
+        return out
+
+    # ------------------------------------------------------------------ #
+    def _use_numpy(self) -> bool:
+        return np is not None and len(self) >= NUMPY_MIN_ROWS
+
+    def _np_durations(self) -> Any:
+        s = np.frombuffer(self.start, dtype=np.int64)
+        e = np.frombuffer(self.end, dtype=np.int64)
+        return np.maximum(e - s, 0)
+
+    def durations(self) -> array:
+        """Duration column (non-negative, ms), computed in one batch."""
+        if self._use_numpy():
+            return array("q", self._np_durations().tobytes())
+        return array("q", [max(e - s, 0) for s, e in zip(self.start, self.end)])
+
+    def sorted_durations(self) -> array:
+        if self._use_numpy():
+            return array("q", np.sort(self._np_durations()).tobytes())
+        return array("q", sorted(self.durations()))
+
+    def total_duration(self) -> int:
+        if self._use_numpy():
+            return int(self._np_durations().sum())
+        return sum(self.durations())
+
+    def take(self, rows: Iterable[int]) -> StepTable:
+        """Subset by row indices (order preserved, name dictionary shared)."""
+        out = StepTable()
+        out.names, out._index = self.names, self._index
+        ids, start, end = self.name_ids, self.start, self.end
+        for i in rows:
+            out.name_ids.append(ids[i])
+            out.start.append(start[i])
+            out.end.append(end[i])
+        return out
+
+    def _take_np(self, rows: Any) -> StepTable:
+        out = StepTable()
+        out.names, out._index = self.names, self._index
+        out.name_ids = array(
+            "i", np.frombuffer(self.name_ids, np.int32)[rows].tobytes()
+        )
+        out.start = array("q", np.frombuffer(self.start, np.int64)[rows].tobytes())
+        out.end = array("q", np.frombuffer(self.end, np.int64)[rows].tobytes())
+        return out
+
+    def filter_min_duration(self, threshold: int) -> StepTable:
+        if self._use_numpy():
+            return self._take_np(np.flatnonzero(self._np_durations() >= threshold))
+        return self.take(i for i, d in enumerate(self.durations()) if d >= threshold)
+
+    def nlargest(self, n: int) -> StepTable:
+        """
+        The n longest steps, longest first. Ties keep table order, exactly
+        like heapq.nlargest(n, steps, key=duration).
+        """
+        if n <= 0:
+            return self.take(())
+        if self._use_numpy():
+            d = self._np_durations()
+            if n < len(d):
+                kth = np.partition(d, len(d) - n)[len(d) - n]
+                cand = np.flatnonzero(d >= kth)
+            else:
+                cand = np.arange(len(d))
+            order = cand[np.argsort(-d[cand], kind="stable")][:n]
+            return self._take_np(order)
+        durs = self.durations()
+        return self.take(heapq.nlargest(n, range(len(durs)), key=durs.__getitem__))
+
+    def sort_by_duration(self, *, reverse: bool = True) -> StepTable:
+        if self._use_numpy():
+            d = self._np_durations()
+            return self._take_np(np.argsort(-d if reverse else d, kind="stable"))
+        durs = self.durations()
+        return self.take(
+            sorted(range(len(durs)), key=durs.__getitem__, reverse=reverse)
+        )
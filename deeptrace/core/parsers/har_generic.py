@@ -1,37 +1,78 @@
 from __future__ import annotations
 import json
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List
 
+from deeptrace.core.har import phase_durations
+from deeptrace.core.inputs import logical_suffix, read_input
 from deeptrace.core.models import Step
 from deeptrace.core.registry import register
+from deeptrace.core.sniff import head_keys, head_kind
+from deeptrace.core.timestamps import iso_to_ms
 
 
 @register("har_generic")
 class HarParser:
-    """Supports standalone *.har files (directories are not accepted)."""
+    """
+    Supports standalone *.har files (directories are not accepted).
+
+    With `phases` (format har_phases) every request is followed by its
+    timing phases as child steps laid end to end from its start: blocked,
+    dns, connect, ssl, send, wait, receive (see core.har; empty phases are
+    skipped).
+    """
+
+    phases = False
+
+    def probe(self, path: Path, head: bytes) -> float:
+        if path.is_dir():
+            return 0.0
+        if logical_suffix(path) == ".har":
+            return 1.0
+        keys = head_keys(head)
+        if head_kind(head) == "{" and "log" in keys and "entries" in keys:
+            return 0.9
+        return 0.0
 
     def parse(self, path: str) -> List[Step]:
         p = Path(path)
         if p.is_dir():
             raise ValueError("har_generic parser supports *.har files only")
 
-        data = json.loads(p.read_text(encoding="utf-8"))
+        return self.parse_document(json.loads(read_input(p)), path)
+
+    def parse_document(self, data: Any, path: str) -> List[Step]:
+        if not isinstance(data, dict):
+            raise ValueError("har_generic: root must be an object")
         entries = data.get("log", {}).get("entries", [])
-        steps: List[Step] = []
+        if not self.phases:
+            return [self._entry_to_step(entry) for entry in entries]
 
+        out: List[Step] = []
         for entry in entries:
-            url = entry.get("request", {}).get("url", "request")
-            started = entry.get("startedDateTime", "")
-            duration = int(float(entry.get("time", 0)))
-
-            try:
-                t0 = datetime.fromisoformat(started.rstrip("Z")).replace(
-                    tzinfo=timezone.utc
-                )
-                start_ms = int(t0.timestamp() * 1000)
-            except Exception:
-                start_ms = 0
-            steps.append(Step(url[:120], start_ms, start_ms + duration))
-        return steps
+            parent = len(out)
+            step = self._entry_to_step(entry)
+            out.append(step)
+            t = float(step.start_ms)
+            for name, ms in phase_durations(entry):
+                if ms > 0:
+                    out.append(Step(name, int(t), int(t + ms), 1, parent))
+                    t += ms
+        return out
+
+    @staticmethod
+    def _entry_to_step(entry: Dict[str, Any]) -> Step:
+        url = entry.get("request", {}).get("url", "request")
+        duration = int(float(entry.get("time", 0)))
+        start_ms = iso_to_ms(entry.get("startedDateTime") or "") or 0
+        return Step(url[:120], start_ms, start_ms + duration)
+
+
+@register("har_phases")
+class HarPhasesParser(HarParser):
+    """har_generic with timing phases as child steps; never autodetected."""
+
+    phases = True
+
+    def probe(self, path: Path, head: bytes) -> float:
+        return 0.0
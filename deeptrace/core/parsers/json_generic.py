@@ -1,10 +1,14 @@
 from __future__ import annotations
 import json
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from deeptrace.core.inputs import open_input, read_input
+from deeptrace.core.jsonstream import CHUNK_SIZE, iter_json_array
 from deeptrace.core.models import Step
+from deeptrace.core.pushdown import FilteredSink, StepFilter, StepSink
 from deeptrace.core.registry import register
+from deeptrace.core.sniff import head_keys, head_kind
 
 
 @register("json_generic")
@@ -18,10 +22,22 @@ class JSONGenericParser:
       • {"entries": [...]}
       • or a list at the root.
     Directories are not supported (handled by Allure).
+
+    iter_steps() is the bounded-memory alternative to parse(): it streams
+    the event array and yields steps one by one, picking the array by KEYS
+    order like parse().
     """
 
     KEYS = ("actions", "events", "steps", "seleniumEvents", "entries")
 
+    def probe(self, path: Path, head: bytes) -> float:
+        kind = head_kind(head)
+        if kind == "[":
+            return 0.5
+        if kind == "{" and head_keys(head).intersection(self.KEYS):
+            return 0.6
+        return 0.0
+
     def parse(self, path: str) -> List[Step]:
         p = Path(path)
         if p.is_dir():
@@ -29,10 +45,43 @@ class JSONGenericParser:
                 "json_generic parser supports **single** *.json files only"
             )
 
-        data = json.loads(p.read_text(encoding="utf-8"))
+        return self.parse_document(json.loads(read_input(p)), path)
+
+    def parse_document(self, data: Any, path: str) -> List[Step]:
         events = self._events(data)
         return self._to_steps(events)
 
+    def iter_steps(self, path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Step]:
+        p = Path(path)
+        if p.is_dir():
+            raise ValueError(
+                "json_generic parser supports **single** *.json files only"
+            )
+
+        with open_input(p) as fh:
+            for ev in iter_json_array(fh, self.KEYS, chunk_size):
+                yield self._to_step(ev)
+
+    def parse_into(
+        self, path: str, sink: StepSink, where: Optional[StepFilter] = None
+    ) -> None:
+        """
+        iter_steps() straight into `sink`: events `where` rejects are
+        dropped before a Step is built.
+        """
+        p = Path(path)
+        if p.is_dir():
+            raise ValueError(
+                "json_generic parser supports **single** *.json files only"
+            )
+
+        if where:
+            sink = FilteredSink(sink, where)
+        append, fields = sink.append, self._fields
+        with open_input(p) as fh:
+            for ev in iter_json_array(fh, self.KEYS):
+                append(*fields(ev))
+
     # -------------------------------------------------------------- #
     def _events(self, data: Any) -> List[Dict[str, Any]]:
         if isinstance(data, list):
@@ -43,23 +92,29 @@ class JSONGenericParser:
                     return data[k]
         raise ValueError("json_generic: no event list found")
 
+    @classmethod
+    def _to_steps(cls, events: List[Dict[str, Any]]) -> List[Step]:
+        return [cls._to_step(ev) for ev in events]
+
+    @classmethod
+    def _to_step(cls, ev: Dict[str, Any]) -> Step:
+        return Step(*cls._fields(ev))
+
     @staticmethod
-    def _to_steps(events: List[Dict[str, Any]]) -> List[Step]:
-        out: List[Step] = []
-        for ev in events:
-            name = (
-                ev.get("name")
-                or ev.get("event")
-                or ev.get("eventName")
-                or ev.get("message")
-                or "step"
-            )
-            start = int(float(ev.get("startTime") or ev.get("timestamp") or 0))
-            if "endTime" in ev:
-                end = int(float(ev["endTime"]))
-            elif "duration" in ev:
-                end = start + int(float(ev["duration"]))
-            else:
-                end = start
-            out.append(Step(name, start, end))
-        return out
+    def _fields(ev: Dict[str, Any]) -> Tuple[str, int, int]:
+        """(name, start_ms, end_ms) of one event, without building a Step."""
+        name = (
+            ev.get("name")
+            or ev.get("event")
+            or ev.get("eventName")
+            or ev.get("message")
+            or "step"
+        )
+        start = int(float(ev.get("startTime") or ev.get("timestamp") or 0))
+        if "endTime" in ev:
+            end = int(float(ev["endTime"]))
+        elif "duration" in ev:
+            end = start + int(float(ev["duration"]))
+        else:
+            end = start
+        return name, start, end
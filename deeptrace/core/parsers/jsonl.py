@@ -0,0 +1,260 @@
+from __future__ import annotations
+import json
+import mmap
+import os
+from collections import deque
+from functools import partial
+from json.scanner import make_scanner
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from deeptrace.core import profiling
+from deeptrace.core.inputs import compression, logical_suffix, open_input
+from deeptrace.core.jsonstream import decode_line
+from deeptrace.core.models import Step, StepTable
+from deeptrace.core.parsers.json_generic import JSONGenericParser
+from deeptrace.core.pushdown import StepFilter, StepSink, feed
+from deeptrace.core.registry import register
+
+# text handed to one worker at a time
+CHUNK_BYTES = 8 << 20
+# below this size a process pool costs more than it saves
+PARALLEL_MIN_BYTES = 32 << 20
+# rough size ratio of decompressed to compressed event logs
+_COMPRESSION_RATIO = 8
+
+SUFFIXES = (".jsonl", ".ndjson")
+
+_Chunk = Tuple[str, int, int, Optional[StepFilter]]
+_ChunkResult = Tuple[StepTable, int, List[Tuple[int, str]]]
+
+_scan = make_scanner(json.JSONDecoder())  # type: ignore[arg-type]
+
+
+def line_to_step(line: Union[bytes, str]) -> Optional[Step]:
+    """
+    One event line -> Step (JSONGenericParser field rules); None for blank
+    or bracket-only lines. Raises ValueError for anything that is not an
+    event object.
+    """
+    event = decode_line(line)
+    if event is None:
+        return None
+    if not isinstance(event, dict):
+        raise ValueError(f"expected an object, got {type(event).__name__}")
+    return JSONGenericParser._to_step(event)
+
+
+def _chunk_bounds(mm: mmap.mmap, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split [0, len(mm)) into pieces of ~chunk_bytes ending after a newline."""
+    size = len(mm)
+    bounds = []
+    start = 0
+    while start < size:
+        cut = mm.find(b"\n", min(start + chunk_bytes, size) - 1)
+        end = size if cut < 0 else cut + 1
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _stream_chunks(fh: BinaryIO, chunk_bytes: int) -> Iterator[bytes]:
+    """Newline-aligned pieces of a stream that cannot be mapped (compressed)."""
+    rest = b""
+    while True:
+        block = fh.read(chunk_bytes)
+        if not block:
+            break
+        profiling.count("bytes_read", len(block))
+        data = rest + block
+        cut = data.rfind(b"\n") + 1
+        rest = data[cut:]
+        if cut:
+            yield data[:cut]
+    if rest:
+        yield rest
+
+
+def _parse_chunk(chunk: _Chunk) -> _ChunkResult:
+    """Worker entry point: decode one newline-aligned chunk of a mapped file."""
+    path, start, end, where = chunk
+    with open(path, "rb") as fh, mmap.mmap(
+        fh.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        data = mm[start:end]
+    return _parse_text(data, where)
+
+
+def _parse_text(data: bytes, where: Optional[StepFilter] = None) -> _ChunkResult:
+    """
+    Decode the lines of one chunk. Returns the steps `where` accepts, the
+    number of lines and (line index, message) for lines that failed. Only
+    this chunk's text is held in memory.
+    """
+    text = data.decode("utf-8", "replace")
+    table = StepTable()
+    append, fields = table.append, JSONGenericParser._fields
+    accepts = where.accepts if where else None
+    errors: List[Tuple[int, str]] = []
+    pos, n, lineno = 0, len(text), 0
+    while pos < n:
+        nl = text.find("\n", pos)
+        stop = n if nl < 0 else nl
+        try:
+            if text.startswith("{", pos):
+                # fast path: scan the object in place, no per-line copy
+                try:
+                    event, tail = _scan(text, pos)
+                except StopIteration as exc:
+                    raise ValueError(f"invalid JSON at column {exc.value}") from None
+                if tail > stop or text[tail:stop].strip() not in ("", ","):
+                    raise ValueError("extra data after the event object")
+            else:
+                event = decode_line(text[pos:stop])
+                if event is not None and not isinstance(event, dict):
+                    raise ValueError(f"expected an object, got {type(event).__name__}")
+            if event is not None:
+                name, start, end = fields(event)
+                if accepts is None or accepts(name, start, end):
+                    append(name, start, end)
+        except (ValueError, TypeError) as exc:
+            errors.append((lineno, f"{type(exc).__name__}: {exc}"))
+        pos = stop + 1
+        lineno += 1
+    return table, lineno, errors
+
+
+@register("jsonl")
+class JSONLParser:
+    """
+    JSON Lines / NDJSON: one event object per line, fields as in
+    JSONGenericParser.
+
+    The file is memory-mapped and cut into newline-aligned chunks of
+    `chunk_bytes`; each chunk is decoded on its own, in a process pool once
+    the file reaches PARALLEL_MIN_BYTES (`workers`; None picks
+    os.cpu_count()); a worker holds one chunk of text at a time. Compressed
+    files are decompressed as a stream and cut the same way, with at most
+    two chunks per worker in flight. Lines that fail to decode are listed
+    in `errors` as (path:line, message).
+    """
+
+    def __init__(
+        self, workers: Optional[int] = None, chunk_bytes: int = CHUNK_BYTES
+    ) -> None:
+        self.workers = workers
+        self.chunk_bytes = chunk_bytes
+        self.errors: List[Tuple[str, str]] = []
+
+    def probe(self, path: Path, head: bytes) -> float:
+        if path.is_dir():
+            return 0.0
+        if logical_suffix(path) in SUFFIXES:
+            return 1.0
+        # the last piece of the head may be cut short
+        lines = [ln for ln in head.split(b"\n")[:-1] if ln.strip()]
+        if len(lines) < 2:
+            return 0.0
+        try:
+            first, second = json.loads(lines[0]), json.loads(lines[1])
+        except ValueError:
+            return 0.0
+        return 0.7 if isinstance(first, dict) and isinstance(second, dict) else 0.0
+
+    def parse(self, path: str) -> List[Step]:
+        return list(self.parse_table(path))
+
+    def parse_table(self, path: str) -> StepTable:
+        """parse() without materialising Step objects."""
+        out = StepTable.concat(self._tables(path))
+        if not out and self.errors:
+            raise ValueError("jsonl: no event lines found")
+        return out
+
+    def parse_into(
+        self, path: str, sink: StepSink, where: Optional[StepFilter] = None
+    ) -> None:
+        """
+        Feed `sink` chunk by chunk; `where` is applied in the workers, so
+        rejected lines never leave them.
+        """
+        parsed = 0
+        for table in self._tables(path, where):
+            parsed += len(table)
+            feed(table, sink)
+        if not parsed and self.errors:
+            raise ValueError("jsonl: no event lines found")
+
+    # ------------------------------------------------------------------ #
+    def _tables(
+        self, path: str, where: Optional[StepFilter] = None
+    ) -> Iterator[StepTable]:
+        p = Path(path)
+        if p.is_dir():
+            raise ValueError("jsonl parser supports single files only")
+        self.errors = []
+        first_line = 1
+        for table, lines, errors in self._map(p, where):
+            self.errors += [(f"{p}:{first_line + i}", msg) for i, msg in errors]
+            first_line += lines
+            yield table
+
+    def _map(
+        self, path: Path, where: Optional[StepFilter] = None
+    ) -> Iterator[_ChunkResult]:
+        size = path.stat().st_size
+        if size == 0:
+            return
+        workers = self.workers
+        if compression(path) is not None:
+            if workers is None:
+                big = size * _COMPRESSION_RATIO >= PARALLEL_MIN_BYTES
+                workers = (os.cpu_count() or 1) if big else 1
+            with open_input(path) as fh:
+                yield from _pool_map(
+                    partial(_parse_text, where=where),
+                    _stream_chunks(fh, self.chunk_bytes),
+                    workers,
+                )
+            return
+
+        with path.open("rb") as fh, mmap.mmap(
+            fh.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            bounds = _chunk_bounds(mm, self.chunk_bytes)
+        profiling.count("bytes_read", size)
+        chunks = [(str(path), start, end, where) for start, end in bounds]
+        if workers is None:
+            big = size >= PARALLEL_MIN_BYTES
+            workers = (os.cpu_count() or 1) if big else 1
+        yield from _pool_map(_parse_chunk, chunks, min(workers, len(chunks)))
+
+
+def _pool_map(
+    fn: Callable[[Any], _ChunkResult], items: Iterable[Any], workers: int
+) -> Iterator[_ChunkResult]:
+    """map() in order over a process pool, keeping 2 * workers tasks in flight."""
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -1,28 +1,378 @@
 """
-Auto-selects the first parser that can successfully parse the given path.
+Picks a parser for the given path.
+
+Every parser that implements `probe` scores the first few KB of the file;
+candidates are tried in descending score order (ties keep registration
+order), and the file is decoded at most once – the decoded document is
+handed to `parse_document`. Parsers of non-JSON inputs (no
+`parse_document`, e.g. jsonl) read the path themselves. Parsers whose
+manifest hints (suffix, directory) match the path are imported and tried
+first; the rest of the manifest is imported only if none of them accepts
+the input. Parsers without `probe` are trial-parsed last. Compressed files
+(.gz / .bz2 / .xz) are decompressed on the fly, see core.inputs.
+
+The loading functions take an optional `canon` (core.canonical) that
+renames steps whatever parser produced them; the cache keeps raw names,
+so one cached parse serves any set of rules.
 """
 
 from __future__ import annotations
+import json
+import logging
+import os
+import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from deeptrace.core.models import Step
-from deeptrace.core.registry import get_all, preload_all_parsers
+from deeptrace.core import profiling
+from deeptrace.core.inputs import read_input
+from deeptrace.core.models import Step, StepTable
+from deeptrace.core.pushdown import StepFilter, StepSink, feed
+from deeptrace.core.registry import (
+    BaseParser,
+    ProbingParser,
+    SniffingParser,
+    available_parsers,
+    get_all,
+    load_parser,
+    manifest,
+    preload_all_parsers,
+)
+from deeptrace.core.sniff import read_head
 
+if TYPE_CHECKING:
+    from deeptrace.core.cache import StepCache
+    from deeptrace.core.canonical import Canonicalizer
 
-def autodetect_parser(path: Path) -> Tuple[Optional[str], list[Step]]:
-    preload_all_parsers()
+logger = logging.getLogger(__name__)
 
-    for name, factory in get_all().items():
-        parser = factory()
+_UNSET: Any = object()
+_INVALID: Any = object()
+
+# parsers with parse_table() (e.g. jsonl) hand over columns directly
+ParsedSteps = Union[List[Step], StepTable]
+
+
+def rank_parsers(
+    path: Path, names: Optional[Iterable[str]] = None, head: Optional[bytes] = None
+) -> List[Tuple[float, str, ProbingParser]]:
+    """
+    Return (score, name, parser) for every parser whose probe is > 0.
+    Only `names` are imported and probed when given, otherwise all of them.
+    """
+    if names is None:
+        preload_all_parsers()
+        names = get_all()
+    if head is None:
+        head = read_head(path)
+
+    ranked: List[Tuple[float, str, ProbingParser]] = []
+    for name in names:
         try:
-            steps = parser.parse(str(path))
+            parser = load_parser(name)()
+        except Exception as exc:
+            logger.error("%s parser failed to load: %s", name, exc)
+            continue
+        if isinstance(parser, ProbingParser):
+            score = parser.probe(path, head)
+            if score > 0:
+                ranked.append((score, name, parser))
+    # sort() is stable, so equal scores keep registration order
+    ranked.sort(key=lambda c: -c[0])
+    return ranked
+
+
+def _staged_candidates(path: Path) -> Iterator[Tuple[float, str, ProbingParser]]:
+    """Parsers hinted by the manifest first, the rest only when asked for."""
+    head = read_head(path)
+    hinted = [name for name, spec in manifest().items() if spec.matches(path)]
+    yield from rank_parsers(path, hinted, head)
+    rest = [name for name in available_parsers() if name not in hinted]
+    yield from rank_parsers(path, rest, head)
+
+
+def _report_errors(name: str, parser: object, limit: int = 5) -> None:
+    """Summarise per-file (per-line) errors collected by tolerant parsers."""
+    errors = getattr(parser, "errors", None)
+    if not errors:
+        return
+    lines = [f"{name}: {len(errors)} input(s) skipped"]
+    lines += [f"  {file}: {message}" for file, message in errors[:limit]]
+    if len(errors) > limit:
+        lines.append(f"  ... and {len(errors) - limit} more")
+    logger.warning("\n".join(lines))
+
+
+def _parse_path(parser: BaseParser, path: Path) -> ParsedSteps:
+    parse_table = getattr(parser, "parse_table", None)
+    if parse_table is not None:
+        return parse_table(str(path))
+    return parser.parse(str(path))
+
+
+def _as_list(steps: ParsedSteps) -> List[Step]:
+    return steps if isinstance(steps, list) else list(steps)
+
+
+def _detect(path: Path) -> Tuple[Optional[str], ParsedSteps]:
+    path = Path(path)
+    document = _UNSET
+    steps: ParsedSteps
+
+    for score, name, parser in _staged_candidates(path):
+        t0 = time.perf_counter()
+        outcome = "empty"
+        try:
+            if path.is_dir() or not isinstance(parser, SniffingParser):
+                steps = _parse_path(parser, path)
+            elif document is _INVALID:
+                # the document is not valid JSON – no JSON parser can use it
+                outcome = "skipped"
+                continue
+            else:
+                if document is _UNSET:
+                    try:
+                        with profiling.phase("decode"):
+                            document = json.loads(read_input(path))
+                    except ValueError:
+                        document = _INVALID
+                        outcome = "rejected"
+                        continue
+                steps = parser.parse_document(document, str(path))
             if steps:
+                outcome = "accepted"
+                profiling.count("steps", len(steps))
+                _report_errors(name, parser)
                 return name, steps
         except ValueError:
             # Expected when parser does not support the given input.
+            outcome = "rejected"
+            continue
+        except Exception as exc:
+            outcome = "error"
+            logger.error("%s parser failed: %s", name, exc)
+        finally:
+            profiling.attempt(name, outcome, time.perf_counter() - t0, score)
+
+    preload_all_parsers()
+    for name, factory in get_all().items():
+        legacy = factory()
+        if isinstance(legacy, ProbingParser):
+            continue
+        try:
+            steps = legacy.parse(str(path))
+            if steps:
+                return name, steps
+        except ValueError:
             continue
         except Exception as exc:
-            print(f"[ERROR] {name} parser failed: {exc}")
+            logger.error("%s parser failed: %s", name, exc)
 
     return None, []
+
+
+def autodetect_parser(path: Path) -> Tuple[Optional[str], List[Step]]:
+    fmt, steps = _detect(path)
+    return fmt, _as_list(steps)
+
+
+def _parse_as(path: Path, fmt: str) -> ParsedSteps:
+    parser = load_parser(fmt)()
+    steps = _parse_path(parser, Path(path))
+    profiling.count("steps", len(steps))
+    _report_errors(fmt, parser)
+    return steps
+
+
+def parse_as(path: Path, fmt: str) -> List[Step]:
+    """Parse with the named parser only: nothing else is imported or probed."""
+    return _as_list(_parse_as(path, fmt))
+
+
+def detect_and_parse(
+    path: Path, fmt: Optional[str] = None, canon: Optional[Canonicalizer] = None
+) -> Tuple[Optional[str], List[Step]]:
+    """parse_as() when the format is known, autodetect_parser() otherwise."""
+    if fmt is None:
+        fmt, steps = autodetect_parser(path)
+    else:
+        steps = parse_as(path, fmt)
+    if canon:
+        from deeptrace.core.canonical import canonicalize
+
+        with profiling.phase("canonicalize"):
+            steps = canonicalize(steps, canon)
+    return fmt, steps
+
+
+def _renamed(
+    loaded: Tuple[Optional[str], StepTable], canon: Optional[Canonicalizer]
+) -> Tuple[Optional[str], StepTable]:
+    if not canon:
+        return loaded
+    with profiling.phase("canonicalize"):
+        return loaded[0], loaded[1].rename(canon)
+
+
+def load_steps(
+    path: Path,
+    cache: Optional[StepCache] = None,
+    fmt: Optional[str] = None,
+    canon: Optional[Canonicalizer] = None,
+) -> Tuple[Optional[str], StepTable]:
+    """
+    detect_and_parse() returning a StepTable, served from / stored into
+    the on-disk cache when one is given. Caches that keep renamed tables
+    too (get_renamed(path, canon), e.g. MemoryCache) serve those.
+    """
+    get_renamed = getattr(cache, "get_renamed", None) if canon else None
+    if cache is not None:
+        with profiling.phase("cache"):
+            hit = get_renamed(path, canon) if get_renamed else cache.get(path)
+        if hit is not None and fmt in (None, hit[0]):
+            profiling.count("cache_hits")
+            return hit if get_renamed else _renamed(hit, canon)
+
+    steps: ParsedSteps
+    if fmt is None:
+        fmt, steps = _detect(path)
+    else:
+        steps = _parse_as(path, fmt)
+    table = steps if isinstance(steps, StepTable) else StepTable.from_steps(steps)
+    if fmt and cache is not None:
+        with profiling.phase("cache"):
+            cache.put(path, fmt, table)
+        if get_renamed:
+            renamed = get_renamed(path, canon)
+            if renamed is not None:
+                return renamed
+    return _renamed((fmt, table), canon)
+
+
+class _CountingSink:
+    __slots__ = ("count", "_append")
+
+    def __init__(self, sink: StepSink) -> None:
+        self.count = 0
+        self._append = sink.append
+
+    def append(self, name: str, start_ms: int, end_ms: int) -> None:
+        self.count += 1
+        self._append(name, start_ms, end_ms)
+
+
+def _parse_into(
+    parser: BaseParser, path: Path, sink: StepSink, where: Optional[StepFilter]
+) -> None:
+    parse_into = getattr(parser, "parse_into", None)
+    if parse_into is not None:
+        parse_into(str(path), sink, where)
+    else:
+        feed(_parse_path(parser, path), sink, where)
+
+
+def stream_steps(
+    path: Path,
+    sink: StepSink,
+    fmt: Optional[str] = None,
+    where: Optional[StepFilter] = None,
+    cache: Optional[StepCache] = None,
+    canon: Optional[Canonicalizer] = None,
+) -> Optional[str]:
+    """
+    Parse straight into `sink` (see core.pushdown), dropping the steps
+    `where` rejects while reading; returns the format or None. Nothing is
+    collected here and nothing is cached, but a cache hit is fed as is.
+
+    Without `fmt` the best-scored parser is used without a trial parse. If
+    it rejects the input or fails (logged) before producing anything, full
+    autodetection runs and its result is fed instead; if it fails half-way,
+    None is returned and the sink should be discarded. `where` sees the raw
+    names, `sink` the canonical ones.
+    """
+    path = Path(path)
+    if canon:
+        from deeptrace.core.canonical import CanonicalSink
+
+        sink = CanonicalSink(sink, canon)
+    if cache is not None:
+        with profiling.phase("cache"):
+            hit = cache.get(path)
+        if hit is not None and fmt in (None, hit[0]):
+            profiling.count("cache_hits")
+            feed(hit[1], sink, where)
+            return hit[0]
+
+    counting = _CountingSink(sink)
+    if fmt is not None:
+        parser = load_parser(fmt)()
+        _parse_into(parser, path, counting, where)
+        profiling.count("steps", counting.count)
+        _report_errors(fmt, parser)
+        return fmt
+
+    best = next(_staged_candidates(path), None)
+    if best is not None:
+        score, name, parser = best
+        t0 = time.perf_counter()
+        outcome = "empty"
+        try:
+            _parse_into(parser, path, counting, where)
+            if counting.count:
+                outcome = "accepted"
+        except ValueError:
+            outcome = "rejected"
+            if counting.count:
+                # malformed past the part already fed: nothing to fall back on
+                return None
+        except Exception as exc:
+            outcome = "error"
+            logger.error("%s parser failed: %s", name, exc)
+            if counting.count:
+                return None
+        finally:
+            profiling.attempt(name, outcome, time.perf_counter() - t0, score)
+        if outcome == "accepted":
+            profiling.count("steps", counting.count)
+            _report_errors(name, parser)
+            return name
+
+    detected, steps = _detect(path)
+    if detected:
+        feed(steps, sink, where)
+    return detected
+
+
+def load_many(
+    paths: Iterable[Path],
+    cache: Optional[StepCache] = None,
+    jobs: Optional[int] = None,
+    fmt: Optional[str] = None,
+    canon: Optional[Canonicalizer] = None,
+) -> List[Tuple[Optional[str], StepTable]]:
+    """
+    load_steps() for several inputs, parsed in a process pool; names are
+    canonicalized here, so workers need no copy of `canon`.
+    """
+    paths = list(paths)
+    if jobs is None:
+        jobs = min(len(paths), os.cpu_count() or 1)
+    if jobs <= 1 or len(paths) < 2:
+        return [load_steps(p, cache, fmt, canon) for p in paths]
+    n = len(paths)
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        loaded = list(pool.map(load_steps, paths, [cache] * n, [fmt] * n))
+    # counters of the workers are lost, keep at least the step count
+    profiling.count("steps", sum(len(table) for _, table in loaded))
+    return [_renamed(item, canon) for item in loaded]
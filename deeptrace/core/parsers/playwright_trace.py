@@ -0,0 +1,137 @@
+from __future__ import annotations
+import zipfile
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Tuple
+
+from deeptrace.core.jsonstream import decode_line
+from deeptrace.core.models import Step
+from deeptrace.core.parsers.har_generic import HarParser
+from deeptrace.core.registry import register
+
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+def _action_name(ev: Dict[str, Any]) -> str:
+    if ev.get("title") or ev.get("apiName"):
+        return ev.get("title") or ev["apiName"]
+    if ev.get("class") and ev.get("method"):
+        return f"{ev['class']}.{ev['method']}"
+    return "action"
+
+
+@register("playwright_trace")
+class PlaywrightTraceParser:
+    """
+    Playwright trace.zip, read in place: every *.trace member is streamed
+    line by line and `before` / `after` events are paired by callId into
+    steps (nested calls keep their parent via parentId); *.network members
+    add one step per resource snapshot (`network=False` skips them).
+
+    Times are monotonic milliseconds, shifted to wall-clock epoch ms when
+    the member starts with context-options. Unpaired or undecodable events
+    are listed in `errors` as (member:line, message).
+    """
+
+    def __init__(self, network: bool = True) -> None:
+        self.network = network
+        self.errors: List[Tuple[str, str]] = []
+
+    def probe(self, path: Path, head: bytes) -> float:
+        if path.is_dir() or not head.startswith(_ZIP_MAGIC):
+            return 0.0
+        try:
+            with zipfile.ZipFile(path) as zf:
+                names = zf.namelist()
+        except (OSError, zipfile.BadZipFile):
+            return 0.0
+        return 1.0 if any(n.endswith(".trace") for n in names) else 0.0
+
+    def parse(self, path: str) -> List[Step]:
+        p = Path(path)
+        if p.is_dir():
+            raise ValueError("playwright_trace parser supports trace.zip files only")
+        try:
+            zf = zipfile.ZipFile(p)
+        except zipfile.BadZipFile as exc:
+            raise ValueError(f"playwright_trace: {exc}") from None
+
+        self.errors = []
+        steps: List[Step] = []
+        shifts: Dict[str, float] = {}
+        with zf:
+            names = sorted(zf.namelist())
+            traces = [n for n in names if n.endswith(".trace")]
+            if not traces:
+                raise ValueError("playwright_trace: no *.trace member")
+            for name in traces:
+                with zf.open(name) as fh:
+                    shifts[name[: -len(".trace")]] = self._actions(fh, name, steps)
+            if self.network:
+                for name in names:
+                    if name.endswith(".network"):
+                        shift = shifts.get(name[: -len(".network")], 0.0)
+                        with zf.open(name) as fh:
+                            self._resources(fh, name, shift, steps)
+        return steps
+
+    # -------------------------------------------------------------- #
+    def _events(
+        self, fh: IO[bytes], member: str
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for lineno, line in enumerate(fh, 1):
+            try:
+                ev = decode_line(line)
+            except ValueError as exc:
+                self.errors.append((f"{member}:{lineno}", str(exc)))
+                continue
+            if isinstance(ev, dict):
+                yield lineno, ev
+
+    def _actions(self, fh: IO[bytes], member: str, out: List[Step]) -> float:
+        """Append the member's actions; returns its monotonic -> epoch shift."""
+        index: Dict[str, int] = {}
+        unfinished: Dict[str, int] = {}  # callId -> line of its `before`
+        shift = 0.0
+        for lineno, ev in self._events(fh, member):
+            kind = ev.get("type")
+            if kind == "context-options":
+                if "wallTime" in ev and "monotonicTime" in ev:
+                    shift = float(ev["wallTime"]) - float(ev["monotonicTime"])
+            elif kind == "before":
+                start = int(float(ev.get("startTime", 0)) + shift)
+                parent = index.get(ev.get("parentId", ""), -1)
+                depth = out[parent].depth + 1 if parent >= 0 else 0
+                call = ev.get("callId", "")
+                index[call], unfinished[call] = len(out), lineno
+                out.append(Step(_action_name(ev), start, start, depth, parent))
+            elif kind == "after":
+                call = ev.get("callId", "")
+                idx = index.get(call)
+                if idx is None:
+                    self.errors.append((f"{member}:{lineno}", "no matching before"))
+                    continue
+                end = float(ev.get("endTime", 0)) + shift
+                out[idx].end_ms = int(end)
+                unfinished.pop(call, None)
+            elif kind == "action":  # traces written before v1.30
+                meta = ev.get("metadata", {})
+                start = int(float(meta.get("startTime", 0)) + shift)
+                end = int(float(meta.get("endTime", 0)) + shift)
+                out.append(Step(_action_name(meta), start, end))
+        for lineno in unfinished.values():
+            self.errors.append((f"{member}:{lineno}", "no matching after"))
+        return shift
+
+    def _resources(
+        self, fh: IO[bytes], member: str, shift: float, out: List[Step]
+    ) -> None:
+        for _, ev in self._events(fh, member):
+            if ev.get("type") != "resource-snapshot":
+                continue
+            snapshot = ev.get("snapshot", {})
+            step = HarParser._entry_to_step(snapshot)
+            if "_monotonicTime" in snapshot:
+                # same clock as the actions of the matching *.trace member
+                start = int(float(snapshot["_monotonicTime"]) + shift)
+                step.start_ms, step.end_ms = start, start + step.duration
+            out.append(step)
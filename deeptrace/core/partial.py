@@ -0,0 +1,136 @@
+"""
+Partial aggregates: the GroupBy state of one shard, written to disk.
+
+`analyze --emit-partial` stores, per step name, the count, Welford mean
+and M2 and the quantile sketch of the durations, never the steps
+themselves, so a shard's partial is a few KB however large its logs are.
+`deeptrace merge` folds any number of partials into one GroupBy in linear
+time; the result is exactly what one `analyze` over all the shards would
+have aggregated.
+
+Layout (little-endian): header, detected format, then one record per step
+name: name length, count, mean, M2, sketch length, name (UTF-8), sketch
+(QuantileSketch.to_bytes()). Files of another PARTIAL_VERSION are
+rejected rather than misread.
+"""
+
+from __future__ import annotations
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Tuple
+
+from deeptrace.core.groupby import GroupBy, StepStats
+from deeptrace.core.sketch import QuantileSketch
+
+__all__ = ["PARTIAL_VERSION", "load_partial", "merge_partials", "save_partial"]
+
+PARTIAL_VERSION = 1
+
+_MAGIC = b"DTPA"
+# magic, version, relative accuracy, steps, names, format length
+_HEADER = struct.Struct("<4sHdQIH")
+# name length, count, mean, M2, sketch length
+_RECORD = struct.Struct("<IQddI")
+
+
+def _dump(fh: BinaryIO, fmt: str, groups: GroupBy) -> None:
+    fmt_b = fmt.encode()
+    fh.write(
+        _HEADER.pack(
+            _MAGIC,
+            PARTIAL_VERSION,
+            groups.relative_accuracy,
+            groups.count,
+            len(groups.groups),
+            len(fmt_b),
+        )
+    )
+    fh.write(fmt_b)
+    for name, stats in groups.groups.items():
+        name_b = name.encode("utf-8", "surrogatepass")
+        sketch_b = stats.sketch.to_bytes()
+        fh.write(
+            _RECORD.pack(len(name_b), stats.count, stats.mean, stats.m2, len(sketch_b))
+        )
+        fh.write(name_b)
+        fh.write(sketch_b)
+
+
+def save_partial(path: Path, fmt: str, groups: GroupBy) -> None:
+    """Write `groups` (of logs in format `fmt`) to `path`, atomically."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        # mkstemp creates 0600 files; a partial is a CI artifact to share
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0o666 & ~umask)
+        with os.fdopen(fd, "wb") as fh:
+            _dump(fh, fmt, groups)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_partial(path: Path, key: str = "avg") -> Tuple[str, GroupBy]:
+    """(format, GroupBy ranking by `key`); ValueError for a foreign file."""
+    blob = Path(path).read_bytes()
+    try:
+        magic, version, accuracy, count, n_names, fmt_len = _HEADER.unpack_from(blob)
+    except struct.error:
+        raise ValueError(f"{path}: not a deeptrace partial") from None
+    if magic != _MAGIC:
+        raise ValueError(f"{path}: not a deeptrace partial")
+    if version != PARTIAL_VERSION:
+        raise ValueError(
+            f"{path}: partial version {version}, expected {PARTIAL_VERSION}"
+        )
+    off = _HEADER.size
+    fmt = blob[off : off + fmt_len].decode()
+    off += fmt_len
+
+    groups = GroupBy(key, accuracy)
+    groups.count = count
+    try:
+        for _ in range(n_names):
+            name_len, n, mean, m2, sketch_len = _RECORD.unpack_from(blob, off)
+            off += _RECORD.size
+            name = blob[off : off + name_len].decode("utf-8", "surrogatepass")
+            off += name_len
+            stats = StepStats(accuracy)
+            stats.count, stats.mean, stats.m2 = n, mean, m2
+            stats.sketch = QuantileSketch.from_bytes(blob[off : off + sketch_len])
+            off += sketch_len
+            groups.groups[name] = stats
+    except struct.error:
+        raise ValueError(f"{path}: truncated partial") from None
+    return fmt, groups
+
+
+def merge_partials(
+    paths: Iterable[Path], key: str = "avg"
+) -> Tuple[List[str], GroupBy]:
+    """
+    The formats of the partials (in order, without repeats) and their
+    merged GroupBy. Partials written with different sketch accuracies
+    cannot be merged (ValueError).
+    """
+    formats: List[str] = []
+    merged = None
+    for path in paths:
+        fmt, groups = load_partial(path, key)
+        if fmt not in formats:
+            formats.append(fmt)
+        if merged is None:
+            merged = groups
+        elif groups.relative_accuracy != merged.relative_accuracy:
+            raise ValueError(
+                f"{path}: sketch accuracy {groups.relative_accuracy}, "
+                f"expected {merged.relative_accuracy}"
+            )
+        else:
+            merged.merge(groups)
+    return formats, merged if merged is not None else GroupBy(key)
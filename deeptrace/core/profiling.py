@@ -0,0 +1,159 @@
+"""
+Opt-in phase instrumentation for `--profile`.
+
+Code marks its phases with `with phase("parse"):` and reports counters
+with `count("bytes_read", n)` / `attempt(...)`. While no Profile is active
+(the default) these are a None check and a shared no-op context, so the
+hooks can stay in hot paths. Nested phases are recorded as "outer/inner".
+Counters only see this process: work done in process pools is summarised
+by the parent (step counts, input sizes).
+"""
+
+from __future__ import annotations
+import contextlib
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+__all__ = [
+    "ParserAttempt",
+    "Profile",
+    "active",
+    "attempt",
+    "count",
+    "peak_rss_kb",
+    "phase",
+    "session",
+]
+
+_NULL: ContextManager[None] = contextlib.nullcontext()
+_active: Optional[Profile] = None
+
+
+@dataclass(slots=True)
+class ParserAttempt:
+    """One parser tried by autodetection."""
+
+    parser: str
+    outcome: str  # accepted / rejected / empty / error / skipped
+    seconds: float
+    score: Optional[float] = None
+
+
+@dataclass(slots=True)
+class Profile:
+    command: str
+    phases: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    attempts: List[ParserAttempt] = field(default_factory=list)
+    total_s: float = 0.0
+    peak_rss_kb: Optional[int] = None
+    _stack: List[str] = field(default_factory=list, repr=False)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._stack.append(name)
+        key = "/".join(self._stack)
+        # keep phases in the order they were entered: parents before children
+        self.phases.setdefault(key, 0.0)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[key] += time.perf_counter() - t0
+            self._stack.pop()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "command": self.command,
+            "total_s": round(self.total_s, 6),
+            "peak_rss_kb": self.peak_rss_kb,
+            "phases": {k: round(v, 6) for k, v in self.phases.items()},
+            "counters": dict(self.counters),
+            "parsers": [asdict(a) for a in self.attempts],
+        }
+
+
+def active() -> Optional[Profile]:
+    return _active
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Time the enclosed block when profiling; no-op otherwise."""
+    if _active is None:
+        return _NULL
+    return _active.phase(name)
+
+
+def count(key: str, n: int = 1) -> None:
+    if _active is not None:
+        _active.counters[key] = _active.counters.get(key, 0) + n
+
+
+def attempt(
+    parser: str, outcome: str, seconds: float, score: Optional[float] = None
+) -> None:
+    if _active is not None:
+        _active.attempts.append(ParserAttempt(parser, outcome, seconds, score))
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+@contextlib.contextmanager
+def session(
+    command: str,
+    enabled: bool = True,
+    json_path: Optional[Path] = None,
+    pstats_path: Optional[Path] = None,
+) -> Iterator[Optional[Profile]]:
+    """
+    Profile the enclosed command: prints the phase breakdown on exit and
+    writes it to `json_path`; `pstats_path` additionally runs cProfile and
+    dumps its stats there (load with pstats / snakeviz). Yields None and
+    records nothing unless enabled or one of the paths is given.
+    """
+    global _active
+    if not (enabled or json_path or pstats_path):
+        yield None
+        return
+
+    prof = Profile(command)
+    profiler = None
+    if pstats_path is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    _active = prof
+    t0 = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield prof
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        prof.total_s = time.perf_counter() - t0
+        prof.peak_rss_kb = peak_rss_kb()
+        _active = None
+
+        from deeptrace.utils import print_rich_profile
+
+        print_rich_profile(prof)
+        if json_path is not None:
+            json_path.write_text(
+                json.dumps(prof.to_dict(), indent=2) + "\n", encoding="utf-8"
+            )
+        if profiler is not None and pstats_path is not None:
+            profiler.dump_stats(str(pstats_path))
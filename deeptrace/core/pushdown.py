@@ -0,0 +1,123 @@
+"""
+Filters and sinks that parsers can apply while they read.
+
+A parser with `parse_into(path, sink, where=None)` hands every step to
+`sink.append(name, start_ms, end_ms)` instead of building Step objects,
+skipping the ones `where` rejects on the raw fields. A StepTable is the
+collecting sink; analyzer.StreamingAverages and groupby.GroupBy aggregate
+per name on the fly, so memory follows the number of names, not the log.
+"""
+
+from __future__ import annotations
+import fnmatch
+import re
+from dataclasses import dataclass, field
+from typing import (
+    Iterable,
+    Optional,
+    Pattern,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from deeptrace.core.models import Step, StepTable
+
+__all__ = ["FilteredSink", "StepFilter", "StepSink", "feed"]
+
+
+class StepSink(Protocol):
+    def append(self, name: str, start_ms: int, end_ms: int) -> None: ...
+
+
+def _glob_regex(patterns: Sequence[str]) -> Optional[Pattern[str]]:
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+@dataclass(slots=True)
+class StepFilter:
+    """
+    Per-step predicate: duration at least `min_duration` ms, name matching
+    one of `include` and none of `exclude` (shell globs, case-sensitive),
+    start within [since_ms, until_ms]. Picklable, so process-pool workers
+    can apply it too.
+    """
+
+    min_duration: Optional[int] = None
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+    since_ms: Optional[int] = None
+    until_ms: Optional[int] = None
+    _include_re: Optional[Pattern[str]] = field(default=None, init=False, repr=False)
+    _exclude_re: Optional[Pattern[str]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.include = tuple(self.include)
+        self.exclude = tuple(self.exclude)
+        self._include_re = _glob_regex(self.include)
+        self._exclude_re = _glob_regex(self.exclude)
+
+    def __bool__(self) -> bool:
+        """False when every step passes."""
+        return (
+            self.min_duration is not None
+            or bool(self.include or self.exclude)
+            or self.since_ms is not None
+            or self.until_ms is not None
+        )
+
+    def accepts(self, name: str, start_ms: int, end_ms: int) -> bool:
+        if self.min_duration is not None and end_ms - start_ms < self.min_duration:
+            return False
+        if self.since_ms is not None and start_ms < self.since_ms:
+            return False
+        if self.until_ms is not None and start_ms > self.until_ms:
+            return False
+        if self._include_re is not None and not self._include_re.match(name):
+            return False
+        if self._exclude_re is not None and self._exclude_re.match(name):
+            return False
+        return True
+
+
+class FilteredSink:
+    """Forwards the steps `where` accepts to `sink`."""
+
+    __slots__ = ("accepts", "sink", "_append")
+
+    def __init__(self, sink: StepSink, where: StepFilter) -> None:
+        self.sink = sink
+        self.accepts = where.accepts
+        self._append = sink.append
+
+    def append(self, name: str, start_ms: int, end_ms: int) -> None:
+        if self.accepts(name, start_ms, end_ms):
+            self._append(name, start_ms, end_ms)
+
+
+def feed(
+    steps: Union[Iterable[Step], StepTable],
+    sink: StepSink,
+    where: Optional[StepFilter] = None,
+) -> None:
+    """Push already parsed steps (or table rows) through `where` into `sink`."""
+    rows: Iterable[Tuple[str, int, int]]
+    if isinstance(steps, StepTable):
+        names = steps.names
+        rows = (
+            (names[i], s, e) for i, s, e in zip(steps.name_ids, steps.start, steps.end)
+        )
+    else:
+        rows = ((s.name, s.start_ms, s.end_ms) for s in steps)
+    append = sink.append
+    if where:
+        accepts = where.accepts
+        for name, start, end in rows:
+            if accepts(name, start, end):
+                append(name, start, end)
+    else:
+        for name, start, end in rows:
+            append(name, start, end)
@@ -1,13 +1,38 @@
 """
 A very small plugin registry for parsers.
+
+Parsers are listed in a manifest (BUILTIN_PARSERS plus the
+`deeptrace.parsers` entry point group) and imported only when selected, so
+neither built-in nor third-party parsers cost anything at startup. A plugin
+declares itself in its own pyproject.toml:
+
+    [project.entry-points."deeptrace.parsers"]
+    my_fmt = "my_package.parser:MyParser"
 """
 
 from __future__ import annotations
 import importlib
-import pkgutil
-from typing import Callable, Dict, List, Protocol
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Protocol,
+    Tuple,
+    runtime_checkable,
+)
+
+if TYPE_CHECKING:
+    from deeptrace.core.models import Step
+
+# Bump whenever built-in parser output changes: invalidates cached results.
+PARSERS_VERSION = 2
 
-from deeptrace.core.models import Step
+ENTRY_POINT_GROUP = "deeptrace.parsers"
 
 
 class BaseParser(Protocol):
@@ -16,6 +41,76 @@ class BaseParser(Protocol):
     def parse(self, path: str) -> List[Step]: ...
 
 
+@runtime_checkable
+class ProbingParser(BaseParser, Protocol):
+    """
+    Optional extension used by autodetect_parser: probe() looks only at the
+    head of the file (empty for directories) and returns a confidence in
+    [0, 1]. Parsers of non-JSON inputs stop here and read the path.
+    """
+
+    def probe(self, path: Path, head: bytes) -> float: ...
+
+
+@runtime_checkable
+class SniffingParser(ProbingParser, Protocol):
+    """
+    JSON parsers also provide parse_document(), which builds steps from an
+    already decoded document so the input is decoded at most once.
+    """
+
+    def parse_document(self, data: Any, path: str) -> List[Step]: ...
+
+
+@dataclass(frozen=True)
+class ParserSpec:
+    """
+    Manifest entry: "module:attr" of the parser factory plus cheap hints
+    (file suffixes, directory support) that decide which parsers
+    autodetect_parser imports first.
+    """
+
+    name: str
+    target: str
+    suffixes: Tuple[str, ...] = ()
+    directories: bool = False
+
+    def matches(self, path: Path) -> bool:
+        if path.is_dir():
+            return self.directories
+        from deeptrace.core.inputs import logical_suffix
+
+        return logical_suffix(path) in self.suffixes
+
+
+# Registration order: equal probe scores keep this order.
+BUILTIN_PARSERS: Tuple[ParserSpec, ...] = (
+    ParserSpec(
+        "allure",
+        "deeptrace.core.parsers.allure:AllureParser",
+        (".json",),
+        directories=True,
+    ),
+    ParserSpec(
+        "har_generic", "deeptrace.core.parsers.har_generic:HarParser", (".har", ".json")
+    ),
+    # explicit --format only: probe() is always 0
+    ParserSpec("har_phases", "deeptrace.core.parsers.har_generic:HarPhasesParser"),
+    ParserSpec(
+        "json_generic",
+        "deeptrace.core.parsers.json_generic:JSONGenericParser",
+        (".json",),
+    ),
+    ParserSpec(
+        "jsonl", "deeptrace.core.parsers.jsonl:JSONLParser", (".jsonl", ".ndjson")
+    ),
+    ParserSpec(
+        "playwright_trace",
+        "deeptrace.core.parsers.playwright_trace:PlaywrightTraceParser",
+        (".zip",),
+    ),
+)
+
 _parsers: Dict[str, Callable[[], BaseParser]] = {}
 
 
@@ -30,15 +125,55 @@ def register(fmt: str):
 
 
 def get_all() -> Dict[str, Callable[[], BaseParser]]:
+    """Parsers imported so far; call preload_all_parsers() first for all."""
     return _parsers.copy()
 
 
-def preload_all_parsers() -> None:
-    """
-    Import every module in deeptrace.core.parsers so that @register
-    decorators are executed.
-    """
-    import deeptrace.core.parsers  # noqa: F401
+@lru_cache(maxsize=None)
+def _plugin_specs() -> Tuple[ParserSpec, ...]:
+    from importlib.metadata import entry_points
+
+    eps: Any = entry_points()
+    if hasattr(eps, "select"):
+        group = eps.select(group=ENTRY_POINT_GROUP)
+    else:  # Python 3.9 returns a dict of groups
+        group = eps.get(ENTRY_POINT_GROUP, ())
+    return tuple(ParserSpec(ep.name, ep.value) for ep in group)
+
 
-    for _, name, _ in pkgutil.iter_modules(deeptrace.core.parsers.__path__):
-        importlib.import_module(f"deeptrace.core.parsers.{name}")
+def manifest() -> Dict[str, ParserSpec]:
+    """Every known parser, built-in first, without importing any of them."""
+    specs = {spec.name: spec for spec in BUILTIN_PARSERS}
+    for spec in _plugin_specs():
+        specs.setdefault(spec.name, spec)
+    return specs
+
+
+def available_parsers() -> List[str]:
+    """Names accepted by load_parser(): the manifest plus ad-hoc registrations."""
+    names = list(manifest())
+    names += [name for name in _parsers if name not in names]
+    return names
+
+
+def load_parser(name: str) -> Callable[[], BaseParser]:
+    """Import the parser `name` on first use and return its factory."""
+    if name in _parsers:
+        return _parsers[name]
+    spec = manifest().get(name)
+    if spec is None:
+        raise KeyError(f"unknown log format {name!r}")
+    module, _, attr = spec.target.partition(":")
+    obj = importlib.import_module(module.strip())
+    if name not in _parsers:
+        # plugins do not have to use @register: the entry point names the factory
+        if attr:
+            obj = reduce(getattr, attr.strip().split("."), obj)
+        _parsers[name] = obj  # type: ignore[assignment]
+    return _parsers[name]
+
+
+def preload_all_parsers() -> None:
+    """Import every parser in the manifest so that get_all() lists them all."""
+    for name in manifest():
+        load_parser(name)
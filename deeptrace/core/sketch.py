@@ -0,0 +1,213 @@
+"""
+Mergeable streaming quantile sketch.
+
+Values are counted in logarithmic buckets (the DDSketch scheme), so every
+reported quantile is within `relative_accuracy` of the exact order
+statistic, memory grows with log(max / min) rather than with the number of
+values, and two sketches built with the same accuracy merge losslessly.
+"""
+
+from __future__ import annotations
+import math
+import struct
+from array import array
+from typing import Any, Dict, Iterable, Union
+
+from deeptrace.core.defaults import DEFAULT_ACCURACY
+from deeptrace.core.models import np
+
+__all__ = ["DEFAULT_ACCURACY", "QuantileSketch"]
+
+_MAGIC = b"DTQS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBdQQdddI")
+
+Number = Union[int, float]
+
+
+class QuantileSketch:
+    """
+    Streaming quantiles with a relative error bound.
+
+    count / sum / min / max are tracked exactly; quantile() is approximate.
+    Negative values are not supported (durations are clamped at 0).
+    """
+
+    __slots__ = (
+        "relative_accuracy",
+        "_gamma",
+        "_log_gamma",
+        "bins",
+        "zero_count",
+        "count",
+        "total",
+        "min",
+        "max",
+    )
+
+    def __init__(self, relative_accuracy: float = DEFAULT_ACCURACY) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total: Number = 0
+        self.min: float = math.inf
+        self.max: float = -math.inf
+
+    # ------------------------------------------------------------------ #
+    def add(self, value: Number, count: int = 1) -> None:
+        if value < 0:
+            raise ValueError("QuantileSketch accepts non-negative values only")
+        if value == 0:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def update(self, values: Iterable[Number]) -> QuantileSketch:
+        """Add many values; NumPy arrays and array.array use a batch path."""
+        if np is not None:
+            if isinstance(values, np.ndarray):
+                self._update_np(values)
+                return self
+            if isinstance(values, array) and len(values) > 1024:
+                self._update_np(np.frombuffer(values, dtype=values.typecode))
+                return self
+        add = self.add
+        for v in values:
+            add(v)
+        return self
+
+    def _update_np(self, vals: Any) -> None:
+        if vals.size == 0:
+            return
+        if (vals < 0).any():
+            raise ValueError("QuantileSketch accepts non-negative values only")
+        positive = vals[vals > 0]
+        self.zero_count += int(vals.size - positive.size)
+        if positive.size:
+            keys = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+            uniq, counts = np.unique(keys, return_counts=True)
+            bins = self.bins
+            for k, c in zip(uniq.tolist(), counts.tolist()):
+                bins[k] = bins.get(k, 0) + c
+        self.count += int(vals.size)
+        self.total += int(vals.sum()) if vals.dtype.kind in "iu" else float(vals.sum())
+        self.min = min(self.min, vals.min().item())
+        self.max = max(self.max, vals.max().item())
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        """Fold `other` into this sketch (in place) and return self."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different accuracy")
+        bins = self.bins
+        for k, c in other.bins.items():
+            bins[k] = bins.get(k, 0) + c
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    # ------------------------------------------------------------------ #
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximate value at quantile q in [0, 1], ranked like _perc():
+        the order statistic at index q * (count - 1).
+        """
+        if not self.count:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                value = 2 * self._gamma**key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentile(self, p: float) -> int:
+        return int(round(self.quantile(p / 100)))
+
+    # ------------------------------------------------------------------ #
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "bins": {str(k): c for k, c in sorted(self.bins.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> QuantileSketch:
+        sk = cls(data["relative_accuracy"])
+        sk.zero_count = data["zero_count"]
+        sk.count = data["count"]
+        sk.total = data["total"]
+        if sk.count:
+            sk.min, sk.max = data["min"], data["max"]
+        sk.bins = {int(k): c for k, c in data["bins"].items()}
+        return sk
+
+    def to_bytes(self) -> bytes:
+        keys = array("i", sorted(self.bins))
+        counts = array("Q", (self.bins[k] for k in keys))
+        header = _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            self.relative_accuracy,
+            self.zero_count,
+            self.count,
+            float(self.total),
+            self.min,
+            self.max,
+            len(keys),
+        )
+        return header + keys.tobytes() + counts.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> QuantileSketch:
+        magic, version, acc, zero, count, total, lo, hi, n = _HEADER.unpack_from(blob)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("not a deeptrace quantile sketch")
+        sk = cls(acc)
+        sk.zero_count, sk.count, sk.min, sk.max = zero, count, lo, hi
+        sk.total = int(total) if total.is_integer() else total
+        keys = array("i")
+        counts = array("Q")
+        off = _HEADER.size
+        keys.frombytes(blob[off : off + n * keys.itemsize])
+        off += n * keys.itemsize
+        counts.frombytes(blob[off : off + n * counts.itemsize])
+        sk.bins = dict(zip(keys, counts))
+        return sk
+
+    def __repr__(self) -> str:
+        return (
+            f"QuantileSketch(count={self.count}, bins={len(self.bins)}, "
+            f"relative_accuracy={self.relative_accuracy})"
+        )
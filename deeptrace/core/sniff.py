@@ -0,0 +1,47 @@
+"""
+Cheap helpers for format sniffing: look at the first few KB of a file
+without decoding the whole document.
+"""
+
+from __future__ import annotations
+import re
+from pathlib import Path
+from typing import Optional, Set
+
+from deeptrace.core import profiling
+from deeptrace.core.inputs import open_input
+
+__all__ = ["HEAD_SIZE", "read_head", "head_kind", "head_keys"]
+
+HEAD_SIZE = 4096
+
+_KEY_RE = re.compile(rb'"([A-Za-z_][\w\-]*)"\s*:')
+
+
+def read_head(path: Path, size: int = HEAD_SIZE) -> bytes:
+    """
+    Return the first `size` bytes of a file (empty for directories);
+    compressed files are decompressed just far enough.
+    """
+    if path.is_dir():
+        return b""
+    with open_input(path) as fh:
+        head = fh.read(size)
+    profiling.count("bytes_read", len(head))
+    return head
+
+
+def head_kind(head: bytes) -> Optional[str]:
+    """First significant JSON character: "{" / "[" or None."""
+    stripped = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    if stripped[:1] in (b"{", b"["):
+        return stripped[:1].decode()
+    return None
+
+
+def head_keys(head: bytes) -> Set[str]:
+    """
+    Object keys seen in the head. Nesting is not tracked, so the result is
+    a hint for scoring rather than the exact set of top-level keys.
+    """
+    return {m.decode() for m in _KEY_RE.findall(head)}
@@ -0,0 +1,150 @@
+"""
+Local SQLite run history.
+
+Every ingested run stores one row per step name with its aggregates
+(count, sum, min, max and a serialised QuantileSketch). Trend queries are
+served by the (name, run_time) index and merge the stored sketches, so no
+log has to be parsed again.
+"""
+
+from __future__ import annotations
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from deeptrace.core.sketch import QuantileSketch
+
+__all__ = ["RunStore", "TrendPoint", "default_db_path"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT    NOT NULL,
+    format      TEXT    NOT NULL,
+    run_time    REAL    NOT NULL,
+    ingested_at REAL    NOT NULL,
+    label       TEXT,
+    steps       INTEGER NOT NULL,
+    UNIQUE (path, run_time)
+);
+CREATE TABLE IF NOT EXISTS step_stats (
+    run_id   INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name     TEXT    NOT NULL,
+    run_time REAL    NOT NULL,
+    count    INTEGER NOT NULL,
+    total    REAL    NOT NULL,
+    min      REAL    NOT NULL,
+    max      REAL    NOT NULL,
+    sketch   BLOB    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_step_stats_name_time
+    ON step_stats (name, run_time DESC);
+CREATE INDEX IF NOT EXISTS ix_step_stats_run ON step_stats (run_id);
+CREATE INDEX IF NOT EXISTS ix_runs_time ON runs (run_time);
+"""
+
+
+def default_db_path() -> Path:
+    base = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(base) / "deeptrace" / "history.db"
+
+
+@dataclass(slots=True)
+class TrendPoint:
+    """Aggregates of one step in one run."""
+
+    run_id: int
+    run_time: float
+    path: str
+    sketch: QuantileSketch
+
+
+class RunStore:
+    """SQLite-backed history of per-step aggregates."""
+
+    def __init__(self, db_path: Optional[Path] = None) -> None:
+        self.path = Path(db_path) if db_path is not None else default_db_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> RunStore:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    def has_run(self, path: str, run_time: float) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM runs WHERE path = ? AND run_time = ?", (path, run_time)
+        ).fetchone()
+        return row is not None
+
+    def ingest(
+        self,
+        path: str,
+        fmt: str,
+        sketches: Dict[str, QuantileSketch],
+        *,
+        run_time: float,
+        label: Optional[str] = None,
+    ) -> int:
+        """Insert one run and its per-step aggregates in a single transaction."""
+        steps = sum(sk.count for sk in sketches.values())
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (path, format, run_time, ingested_at, label, steps)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (path, fmt, run_time, time.time(), label, steps),
+            )
+            run_id = cur.lastrowid
+            assert run_id is not None
+            self.conn.executemany(
+                "INSERT INTO step_stats"
+                " (run_id, name, run_time, count, total, min, max, sketch)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        run_id,
+                        name,
+                        run_time,
+                        sk.count,
+                        sk.total,
+                        sk.min,
+                        sk.max,
+                        sk.to_bytes(),
+                    )
+                    for name, sk in sketches.items()
+                ),
+            )
+        return run_id
+
+    def trend(self, name: str, last: int = 500) -> List[TrendPoint]:
+        """Aggregates of `name` in its `last` most recent runs, newest first."""
+        rows = self.conn.execute(
+            "SELECT s.run_id, s.run_time, r.path, s.sketch"
+            " FROM step_stats s JOIN runs r ON r.id = s.run_id"
+            " WHERE s.name = ? ORDER BY s.run_time DESC LIMIT ?",
+            (name, last),
+        )
+        return [
+            TrendPoint(run_id, run_time, path, QuantileSketch.from_bytes(blob))
+            for run_id, run_time, path, blob in rows
+        ]
+
+    def step_names(self, pattern: str = "%") -> List[str]:
+        rows = self.conn.execute(
+            "SELECT DISTINCT name FROM step_stats WHERE name LIKE ? ORDER BY name",
+            (pattern,),
+        )
+        return [name for (name,) in rows]
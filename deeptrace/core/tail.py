@@ -0,0 +1,96 @@
+"""
+Follow a growing log file the way `tail -F` does.
+
+Only bytes appended since the previous poll are read. The file is tracked
+by (device, inode): after a rotation the rest of the old file is drained
+before the new one is followed from its start, and a file truncated in
+place is re-read from offset 0. An incomplete last line is held back
+until its newline arrives.
+"""
+
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+from deeptrace.core.jsonstream import CHUNK_SIZE
+
+__all__ = ["LogTailer"]
+
+
+class LogTailer:
+    """Incremental reader of complete lines appended to `path`."""
+
+    def __init__(
+        self, path: Path, *, from_end: bool = False, chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.rotations = 0
+        self.truncations = 0
+        self._fh: Optional[BinaryIO] = None
+        self._id: Optional[Tuple[int, int]] = None
+        self._pending = b""
+        self._open(from_end)
+
+    def _open(self, from_end: bool = False) -> bool:
+        try:
+            fh = self.path.open("rb")
+        except FileNotFoundError:
+            return False
+        st = os.fstat(fh.fileno())
+        self._fh, self._id = fh, (st.st_dev, st.st_ino)
+        self.offset = st.st_size if from_end else 0
+        self._pending = b""
+        fh.seek(self.offset)
+        return True
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self) -> LogTailer:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    def _drain(self) -> List[bytes]:
+        assert self._fh is not None
+        lines: List[bytes] = []
+        while True:
+            chunk = self._fh.read(self.chunk_size)
+            if not chunk:
+                return lines
+            self.offset += len(chunk)
+            *complete, self._pending = (self._pending + chunk).split(b"\n")
+            lines += complete
+
+    def poll(self) -> List[bytes]:
+        """Complete lines appended since the last call (without newlines)."""
+        if self._fh is None and not self._open():
+            return []
+        try:
+            st: Optional[os.stat_result] = os.stat(self.path)
+        except FileNotFoundError:
+            st = None  # rotated away, the new file is not there yet
+
+        lines: List[bytes] = []
+        if st is not None and (st.st_dev, st.st_ino) != self._id:
+            lines = self._drain()
+            if self._pending:
+                lines.append(self._pending)  # the old file is complete
+            self.close()
+            self._open()
+            self.rotations += 1
+        elif st is not None and st.st_size < self.offset:
+            assert self._fh is not None
+            self._fh.seek(0)
+            self.offset = 0
+            self._pending = b""
+            self.truncations += 1
+        lines += self._drain()
+        return lines
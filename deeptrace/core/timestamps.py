@@ -0,0 +1,96 @@
+"""
+Fast ISO-8601 timestamps -> epoch milliseconds.
+
+Logs repeat the same date, hour and minute for thousands of entries, so the
+"YYYY-MM-DDTHH:MM" prefix is converted once and cached; seconds, fraction
+and the UTC offset are sliced off the rest of the string. Anything the fast
+path does not recognise goes through datetime.fromisoformat (with "Z"
+accepted on every Python version).
+"""
+
+from __future__ import annotations
+import calendar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+__all__ = ["iso_to_ms"]
+
+_MINUTES: Dict[str, int] = {}
+_MINUTES_MAX = 4096
+_DIGITS = frozenset("0123456789")
+
+
+def _minute_ms(prefix: str) -> int:
+    ms = _MINUTES.get(prefix)
+    if ms is None:
+        if len(_MINUTES) >= _MINUTES_MAX:
+            _MINUTES.clear()
+        ts = calendar.timegm(
+            (
+                int(prefix[0:4]),
+                int(prefix[5:7]),
+                int(prefix[8:10]),
+                int(prefix[11:13]),
+                int(prefix[14:16]),
+                0,
+            )
+        )
+        ms = _MINUTES[prefix] = ts * 1000
+    return ms
+
+
+def _offset_ms(tz: str) -> Optional[int]:
+    """ "Z", "", "+03:00", "+0300" or "+03" -> milliseconds east of UTC."""
+    if tz in ("", "Z", "z"):
+        return 0
+    sign = tz[0]
+    digits = tz[1:].replace(":", "")
+    if sign not in "+-" or len(digits) not in (2, 4) or not digits.isdigit():
+        return None
+    minutes = int(digits[:2]) * 60 + int(digits[2:] or 0)
+    return (minutes if sign == "+" else -minutes) * 60_000
+
+
+def _fast(value: str) -> Optional[int]:
+    # 2024-05-15T13:00:00[.fff][Z|±HH:MM]
+    if len(value) < 19 or value[4] != "-" or value[7] != "-" or value[16] != ":":
+        return None
+    if value[10] not in "Tt " or value[13] != ":":
+        return None
+    if not value[17:19].isdigit():
+        return None
+    ms = int(value[17:19]) * 1000
+    pos = 19
+    if pos < len(value) and value[pos] in ".,":
+        end = pos + 1
+        while end < len(value) and value[end] in _DIGITS:
+            end += 1
+        frac = value[pos + 1 : end]
+        if not frac:
+            return None
+        ms += int((frac + "00")[:3])
+        pos = end
+    offset = _offset_ms(value[pos:])
+    if offset is None:
+        return None
+    try:
+        return _minute_ms(value[:16]) + ms - offset
+    except ValueError:
+        return None
+
+
+def iso_to_ms(value: str) -> Optional[int]:
+    """
+    Epoch milliseconds of an ISO-8601 timestamp; naive values are taken as
+    UTC, offsets are honoured. None when the value cannot be parsed.
+    """
+    ms = _fast(value)
+    if ms is not None:
+        return ms
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
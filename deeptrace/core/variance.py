@@ -0,0 +1,299 @@
+"""
+Run-to-run timing variance: which steps are unstable across many runs.
+
+Every run contributes one sample per step name, the step's mean duration
+in that run, to a VarianceStats: run count, Welford mean / M2 and a
+HIST_BINS-bin histogram whose bin width doubles (2**shift ms) when a
+sample does not fit. The state per name is fixed-size however many runs
+are folded in, and two RunVariance objects merge exactly, so runs can be
+parsed in worker processes and a run is dropped as soon as it is folded:
+parse_run() reduces a run to its per-name means while parsing.
+
+Instability is ranked by the coefficient of variation (stddev / mean) or
+by bimodality: a score in [0, 1] of the deepest valley between two modes
+of the histogram, each holding at least a few runs. A step that is either
+fast or slow (a retry, a cold cache, a race) scores near 1 even when its
+CV is moderate; one noisy mode scores near 0.
+"""
+
+from __future__ import annotations
+import glob
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from deeptrace.core.canonical import Canonicalizer
+    from deeptrace.core.pushdown import StepFilter
+
+__all__ = [
+    "BIMODAL_SCORE",
+    "VARIANCE_KEYS",
+    "RunResult",
+    "RunVariance",
+    "VarianceStats",
+    "discover_runs",
+    "parse_run",
+]
+
+HIST_BINS = 32
+# bimodality() needs this many runs at all, and on each side of the valley
+MIN_MODE_RUNS = 3
+# ... and at least this share of the runs on each side
+MIN_MODE_SHARE = 0.05
+# bimodality() from which a step is reported as bimodal
+BIMODAL_SCORE = 0.5
+
+
+class VarianceStats:
+    """Per-run mean durations of one step name, ms."""
+
+    __slots__ = ("runs", "mean", "m2", "hist", "shift")
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.hist = [0] * HIST_BINS
+        self.shift = 0
+
+    def add(self, value: float) -> None:
+        self.runs += 1
+        delta = value - self.mean
+        self.mean += delta / self.runs
+        self.m2 += delta * (value - self.mean)
+        b = int(value) >> self.shift
+        while b >= HIST_BINS:
+            self._coarsen()
+            b >>= 1
+        self.hist[b] += 1
+
+    def _coarsen(self) -> None:
+        h = self.hist
+        self.hist = [h[i] + h[i + 1] for i in range(0, HIST_BINS, 2)]
+        self.hist += [0] * (HIST_BINS // 2)
+        self.shift += 1
+
+    def merge(self, other: VarianceStats) -> VarianceStats:
+        """Fold `other` into this one (in place) and return self."""
+        if not other.runs:
+            return self
+        n = self.runs + other.runs
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.runs * other.runs / n
+        self.mean += delta * other.runs / n
+        self.runs = n
+        while self.shift < other.shift:
+            self._coarsen()
+        hist = other.hist
+        for _ in range(self.shift - other.shift):
+            hist = [hist[i] + hist[i + 1] for i in range(0, HIST_BINS, 2)]
+            hist += [0] * (HIST_BINS // 2)
+        self.hist = [a + b for a, b in zip(self.hist, hist)]
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1) of the run means, 0 for a single run."""
+        return self.m2 / (self.runs - 1) if self.runs > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def cv(self) -> float:
+        """Coefficient of variation, stddev / mean (0 for a zero mean)."""
+        return self.stddev / self.mean if self.mean > 0 else 0.0
+
+    def histogram(self, max_bins: int = HIST_BINS) -> Tuple[int, int, List[int]]:
+        """
+        (start ms, bin width ms, counts) over the occupied range, with
+        adjacent bins summed until at most `max_bins` remain.
+        """
+        occupied = [i for i, c in enumerate(self.hist) if c]
+        if not occupied:
+            return 0, 1 << self.shift, []
+        h, shift = self.hist, self.shift
+        lo, hi = occupied[0], occupied[-1]
+        while hi - lo + 1 > max(max_bins, 1):
+            h = [h[i] + h[i + 1] for i in range(0, len(h), 2)]
+            lo, hi, shift = lo // 2, hi // 2, shift + 1
+        return lo << shift, 1 << shift, h[lo : hi + 1]
+
+    @property
+    def bimodality(self) -> float:
+        """
+        1 - valley / smaller peak for the deepest valley with enough runs
+        on both sides, on a histogram of about sqrt(runs) bins so that
+        sampling noise is not taken for a valley.
+        """
+        n = self.runs
+        if n < 2 * MIN_MODE_RUNS:
+            return 0.0
+        _, _, h = self.histogram(max(4, math.isqrt(n)))
+        least = max(MIN_MODE_RUNS, MIN_MODE_SHARE * n)
+        best = 0.0
+        for v in range(1, len(h) - 1):
+            left, right = h[:v], h[v + 1 :]
+            if sum(left) < least or sum(right) < least:
+                continue
+            peak = min(max(left), max(right))
+            best = max(best, (peak - h[v]) / peak)
+        return best
+
+    def __repr__(self) -> str:
+        return (
+            f"VarianceStats(runs={self.runs}, mean={self.mean:.1f}, "
+            f"cv={self.cv:.2f}, bimodality={self.bimodality:.2f})"
+        )
+
+
+# --rank-by keys of `deeptrace variance`, largest is least stable
+VARIANCE_KEYS: Dict[str, Callable[[VarianceStats], float]] = {
+    "cv": lambda s: s.cv,
+    "stddev": lambda s: s.stddev,
+    "bimodality": lambda s: s.bimodality,
+}
+
+
+class RunVariance:
+    """VarianceStats per step name over the runs folded in with add_run()."""
+
+    __slots__ = ("groups", "runs")
+
+    def __init__(self) -> None:
+        self.groups: Dict[str, VarianceStats] = {}
+        self.runs = 0
+
+    def add_run(self, means: Dict[str, float]) -> None:
+        """One run: its mean duration per step name."""
+        self.runs += 1
+        for name, value in means.items():
+            stats = self.groups.get(name)
+            if stats is None:
+                stats = self.groups[name] = VarianceStats()
+            stats.add(value)
+
+    def merge(self, other: RunVariance) -> RunVariance:
+        for name, stats in other.groups.items():
+            mine = self.groups.get(name)
+            if mine is None:
+                mine = self.groups[name] = VarianceStats()
+            mine.merge(stats)
+        self.runs += other.runs
+        return self
+
+    def ranked(
+        self, key: str = "cv", min_runs: int = 3, threshold: Optional[float] = None
+    ) -> List[Tuple[str, VarianceStats]]:
+        """
+        (name, stats) of the steps seen in at least `min_runs` runs with a
+        mean of at least `threshold` ms, least stable by `key` first.
+        """
+        value = VARIANCE_KEYS[key]
+        rows = [
+            (name, stats)
+            for name, stats in self.groups.items()
+            if stats.runs >= min_runs and (threshold is None or stats.mean >= threshold)
+        ]
+        rows.sort(key=lambda item: (-value(item[1]), -item[1].mean))
+        return rows
+
+
+@dataclass(slots=True)
+class RunResult:
+    """
+    One run. `format` is None for a run no parser recognises, `error` is
+    set when parsing failed; `means` holds the per-name mean durations
+    until the run is folded in.
+    """
+
+    path: Path
+    format: Optional[str]
+    steps: int = 0
+    error: Optional[str] = None
+    means: Optional[Dict[str, float]] = None
+
+
+def parse_run(
+    path: Path,
+    fmt: Optional[str] = None,
+    where: Optional[StepFilter] = None,
+    canon: Optional[Canonicalizer] = None,
+) -> RunResult:
+    """
+    The per-name means of one run, parsed without keeping its steps. Runs
+    in pool workers, so failures are reported, not raised.
+    """
+    from deeptrace.core.analyzer import StreamingAverages
+    from deeptrace.core.parsers.parser_manager import stream_steps
+
+    sink = StreamingAverages()
+    try:
+        found = stream_steps(path, sink, fmt, where, None, canon)
+    except Exception as exc:
+        return RunResult(path, fmt, error=str(exc))
+    if found is None:
+        return RunResult(path, None)
+    means = {name: total / count for name, (count, total) in sink.totals.items()}
+    return RunResult(path, found, sink.count, means=means)
+
+
+def _runs_under(root: Path) -> Iterator[Path]:
+    from deeptrace.core.batch import is_allure_dir
+
+    if is_allure_dir(root):
+        yield root
+        return
+    try:
+        with os.scandir(root) as it:
+            entries = sorted(
+                (e for e in it if not e.name.startswith(".")), key=lambda e: e.name
+            )
+    except OSError:
+        return
+    for e in entries:
+        if e.is_file():
+            yield Path(e.path)
+        elif e.is_dir(follow_symlinks=False):
+            yield from _runs_under(Path(e.path))
+
+
+def discover_runs(
+    paths: Iterable[Union[str, Path]], missing: Optional[List[str]] = None
+) -> Iterator[Path]:
+    """
+    Every run under `paths` (files, directories, glob patterns with `**`),
+    each once: a log file or an Allure results directory. Other
+    directories are walked for runs. Arguments matching nothing are
+    appended to `missing` when given.
+    """
+    seen: Set[Path] = set()
+    for arg in paths:
+        arg = str(arg)
+        if os.path.exists(arg) or not glob.has_magic(arg):
+            matches = [arg] if os.path.exists(arg) else []
+        else:
+            matches = sorted(glob.glob(arg, recursive=True))
+        if not matches and missing is not None:
+            missing.append(arg)
+        for match in matches:
+            path = Path(match)
+            for run in _runs_under(path) if path.is_dir() else (path,):
+                if run not in seen:
+                    seen.add(run)
+                    yield run
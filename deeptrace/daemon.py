@@ -0,0 +1,557 @@
+"""
+`deeptrace serve`: a local daemon answering analyze / compare queries.
+
+The daemon imports every parser once and keeps parsed step tables in a
+core.cache.MemoryCache (LRU bounded by size, keyed by path, size and
+mtime, in front of the on-disk cache), so a repeated query costs the
+aggregation only. Queries are served concurrently: every connection is an
+asyncio task, the parsing runs in a thread pool.
+
+The protocol is one JSON object per line in each direction, over a Unix
+socket (default) or a localhost TCP port:
+
+    → {"op": "analyze", "paths": ["/abs/run.json"], "options": {"top": 5}}
+    ← {"ok": true, "result": [...]}
+    ← {"ok": false, "kind": "AnalysisError", "error": "..."}
+
+Ops: analyze, compare, stats. Client speaks it with the signatures of
+api.analyze / api.compare, so the CLI forwards to a running daemon
+(connect()) and falls back to parsing itself when none answers. This
+module imports nothing but the standard library at the top; the client
+side stays cheap.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import re
+import socket
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Executor
+
+    from deeptrace.api import AnalysisResult, ComparisonResult, PathLike
+    from deeptrace.core.cache import MemoryCache, StepCache
+    from deeptrace.core.canonical import Canonicalizer
+    from deeptrace.core.pushdown import StepFilter
+    from deeptrace.utils import Summary
+
+__all__ = [
+    "ADDRESS_ENV",
+    "Client",
+    "DaemonError",
+    "connect",
+    "default_address",
+    "serve",
+]
+
+logger = logging.getLogger(__name__)
+
+# where the CLI looks for a daemon; "off" disables forwarding
+ADDRESS_ENV = "DEEPTRACE_DAEMON"
+
+_TCP = re.compile(r"^(?P<host>[\w.\-]*|\[[0-9a-fA-F:]+\]):(?P<port>\d+)$")
+# a response can carry every step name of a large run
+_LINE_LIMIT = 1 << 28
+
+_ANALYZE_OPTIONS = (
+    "top",
+    "threshold",
+    "percentiles",
+    "exact",
+    "relative_accuracy",
+    "self_time",
+    "rank_by",
+    "keep_groups",
+    "fmt",
+)
+_COMPARE_OPTIONS = ("alpha", "min_effect", "exact", "fmt")
+_OPS = ("analyze", "compare", "stats")
+
+_DEFAULT_CANON: Any = object()
+
+
+class DaemonError(RuntimeError):
+    """The daemon failed to answer (connection lost, internal error)."""
+
+
+def default_address() -> str:
+    """Unix socket in $XDG_RUNTIME_DIR (the temp directory without it)."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return str(Path(base) / f"deeptrace-{uid}.sock")
+
+
+def _split(address: str) -> Optional[Tuple[str, int]]:
+    """(host, port) for "HOST:PORT", None for a Unix socket path."""
+    m = _TCP.match(address)
+    if m is None:
+        return None
+    return m["host"].strip("[]") or "127.0.0.1", int(m["port"])
+
+
+def _is_loopback(host: str) -> bool:
+    import ipaddress
+
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+# ───────────────────────── wire format ───────────────────────── #
+
+
+def _encode_canon(canon: Optional[Canonicalizer]) -> Optional[Dict[str, Any]]:
+    if canon is _DEFAULT_CANON:
+        return {"rules": [], "templates": True}
+    if canon is None:
+        return None
+    return {
+        "rules": [[pattern.pattern, repl] for pattern, repl in canon.rules],
+        "templates": canon.templates,
+    }
+
+
+def _encode_where(where: Optional[StepFilter]) -> Optional[List[Any]]:
+    if not where:
+        return None
+    return [
+        where.min_duration,
+        list(where.include),
+        list(where.exclude),
+        where.since_ms,
+        where.until_ms,
+    ]
+
+
+def _encode_summary(summary: Summary) -> Dict[str, Any]:
+    return asdict(summary)
+
+
+def _decode_summary(data: Dict[str, Any]) -> Summary:
+    from deeptrace.utils import Summary
+
+    data["percentiles"] = {int(p): v for p, v in data["percentiles"].items()}
+    return Summary(**data)
+
+
+def _encode_analysis(result: AnalysisResult) -> Dict[str, Any]:
+    groups = None
+    if result.groups is not None:
+        # the slowest names are all a renderer needs
+        stats = {}
+        for s in result.slowest:
+            st = result.groups.groups[s.name]
+            stats[s.name] = [st.count, st.mean, st.m2, st.sketch.to_dict()]
+        groups = {
+            "key": result.groups.key,
+            "relative_accuracy": result.groups.relative_accuracy,
+            "count": result.groups.count,
+            "stats": stats,
+        }
+    return {
+        "path": str(result.path),
+        "format": result.format,
+        "error": result.error,
+        "averages": [[s.name, s.duration] for s in result.averages],
+        "slowest": [[s.name, s.start_ms, s.end_ms] for s in result.slowest],
+        "summary": _encode_summary(result.summary),
+        "slowest_summary": _encode_summary(result.slowest_summary),
+        "groups": groups,
+    }
+
+
+def _decode_analysis(data: Dict[str, Any]) -> AnalysisResult:
+    from deeptrace.api import AnalysisResult
+    from deeptrace.core.groupby import GroupBy, StepStats
+    from deeptrace.core.models import Step, StepTable
+    from deeptrace.core.sketch import QuantileSketch
+
+    averages = StepTable()
+    for name, ms in data["averages"]:
+        averages.append(name, 0, ms)
+    groups = None
+    if data["groups"] is not None:
+        g = data["groups"]
+        groups = GroupBy(g["key"], g["relative_accuracy"])
+        groups.count = g["count"]
+        for name, (count, mean, m2, sketch) in g["stats"].items():
+            st = groups.groups[name] = StepStats(g["relative_accuracy"])
+            st.count, st.mean, st.m2 = count, mean, m2
+            st.sketch = QuantileSketch.from_dict(sketch)
+    return AnalysisResult(
+        Path(data["path"]),
+        data["format"],
+        averages,
+        [Step(*row) for row in data["slowest"]],
+        _decode_summary(data["summary"]),
+        _decode_summary(data["slowest_summary"]),
+        groups,
+        data["error"],
+    )
+
+
+_DIFF_FIELDS = ("name", "n_a", "n_b", "avg_a", "avg_b", "effect", "p_value", "status")
+
+
+def _encode_comparison(result: ComparisonResult) -> Dict[str, Any]:
+    return {
+        "format": result.format,
+        "diffs": [[getattr(d, f) for f in _DIFF_FIELDS] for d in result.diffs],
+        "summary_a": _encode_summary(result.summary_a),
+        "summary_b": _encode_summary(result.summary_b),
+    }
+
+
+def _decode_comparison(data: Dict[str, Any]) -> ComparisonResult:
+    from deeptrace.api import ComparisonResult
+    from deeptrace.core.comparison import StepDiff
+
+    return ComparisonResult(
+        data["format"],
+        [StepDiff(*row) for row in data["diffs"]],
+        _decode_summary(data["summary_a"]),
+        _decode_summary(data["summary_b"]),
+    )
+
+
+def _absolute(paths: Union[PathLike, Iterable[PathLike]]) -> List[str]:
+    # the daemon has its own working directory
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    return [str(Path(p).absolute()) for p in paths]
+
+
+# ───────────────────────── client ───────────────────────── #
+
+
+T = TypeVar("T")
+
+# what a reply that is not deeptrace's JSON raises while being read
+_MALFORMED = (ValueError, KeyError, IndexError, TypeError, AttributeError)
+
+
+class Client:
+    """
+    Connection to a running daemon. analyze() / compare() take the
+    arguments of their api counterparts (`cache` and `jobs` are the
+    daemon's business and ignored) and return the same result objects;
+    AnalysisResult.groups only carries the statistics of the slowest
+    names.
+    """
+
+    def __init__(self, address: str, sock: socket.socket) -> None:
+        self.address = address
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    def __enter__(self) -> Client:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def request(self, op: str, **payload: Any) -> Any:
+        """Send one query, return its "result"; AnalysisError is re-raised."""
+        try:
+            self._file.write(json.dumps({"op": op, **payload}).encode() + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        except OSError as exc:
+            raise DaemonError(f"{self.address}: {exc}") from None
+        if not line:
+            raise DaemonError(f"{self.address}: connection closed")
+        try:
+            response = json.loads(line)
+            ok = response["ok"]
+            body = response["result"] if ok else response["error"]
+            kind = response.get("kind")
+        except _MALFORMED:
+            # something else listens there: not a deeptrace daemon
+            raise DaemonError(f"{self.address}: unexpected response") from None
+        if ok:
+            return body
+        if kind == "AnalysisError":
+            from deeptrace.api import AnalysisError
+
+            raise AnalysisError(body)
+        raise DaemonError(f"{self.address}: {body}")
+
+    def _decoded(self, decode: Callable[[], T]) -> T:
+        try:
+            return decode()
+        except _MALFORMED:
+            raise DaemonError(f"{self.address}: unexpected response") from None
+
+    def analyze(
+        self,
+        paths: Union[PathLike, Iterable[PathLike]],
+        *,
+        top: int = 5,
+        threshold: Optional[int] = None,
+        percentiles: Sequence[int] = (95, 99),
+        exact: Optional[bool] = None,
+        relative_accuracy: Optional[float] = None,
+        self_time: bool = False,
+        rank_by: str = "avg",
+        keep_groups: bool = False,
+        fmt: Optional[str] = None,
+        where: Optional[StepFilter] = None,
+        canon: Optional[Canonicalizer] = _DEFAULT_CANON,
+        cache: Optional[StepCache] = None,
+    ) -> List[AnalysisResult]:
+        options = {
+            "top": top,
+            "threshold": threshold,
+            "percentiles": list(percentiles),
+            "exact": exact,
+            "relative_accuracy": relative_accuracy,
+            "self_time": self_time,
+            "rank_by": rank_by,
+            "keep_groups": keep_groups,
+            "fmt": fmt,
+        }
+        results = self.request(
+            "analyze",
+            paths=_absolute(paths),
+            options={k: v for k, v in options.items() if v is not None},
+            where=_encode_where(where),
+            canon=_encode_canon(canon),
+        )
+        return self._decoded(lambda: [_decode_analysis(r) for r in results])
+
+    def compare(
+        self,
+        runs_a: Union[PathLike, Iterable[PathLike]],
+        runs_b: Union[PathLike, Iterable[PathLike]],
+        *,
+        alpha: Optional[float] = None,
+        min_effect: Optional[float] = None,
+        exact: Optional[bool] = None,
+        jobs: Optional[int] = None,
+        fmt: Optional[str] = None,
+        canon: Optional[Canonicalizer] = _DEFAULT_CANON,
+        cache: Optional[StepCache] = None,
+    ) -> ComparisonResult:
+        options = {"alpha": alpha, "min_effect": min_effect, "exact": exact, "fmt": fmt}
+        result = self.request(
+            "compare",
+            runs_a=_absolute(runs_a),
+            runs_b=_absolute(runs_b),
+            options={k: v for k, v in options.items() if v is not None},
+            canon=_encode_canon(canon),
+        )
+        return self._decoded(lambda: _decode_comparison(result))
+
+    def stats(self) -> Dict[str, Any]:
+        """Uptime, queries served and the state of the daemon's cache."""
+        return self.request("stats")
+
+
+def connect(address: Optional[str] = None, timeout: float = 0.5) -> Optional[Client]:
+    """
+    Client of the daemon at `address` ($DEEPTRACE_DAEMON, else
+    default_address()), or None when forwarding is off or nothing listens.
+    """
+    address = address or os.environ.get(ADDRESS_ENV) or default_address()
+    if address.lower() in ("off", "0", "no"):
+        return None
+    tcp = _split(address)
+    if tcp is None and not os.path.exists(address):
+        return None
+    try:
+        if tcp is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            sock.connect(address)
+        else:
+            sock = socket.create_connection(tcp, timeout)
+    except OSError as exc:
+        logger.debug("no daemon at %s: %s", address, exc)
+        return None
+    # a cold query may parse for a while
+    sock.settimeout(None)
+    return Client(address, sock)
+
+
+# ───────────────────────── server ───────────────────────── #
+
+
+class _Server:
+    def __init__(self, cache: MemoryCache, executor: Optional[Executor]) -> None:
+        self.cache = cache
+        self.executor = executor
+        self.started = time.monotonic()
+        self.queries = 0
+        # one Canonicalizer per set of rules: its memo stays warm, and the
+        # cache keeps the tables it renamed
+        self._canons: Dict[str, Canonicalizer] = {}
+
+    def _canon(self, spec: Optional[Dict[str, Any]]) -> Optional[Canonicalizer]:
+        from deeptrace.core.canonical import Canonicalizer
+
+        if spec is None:
+            return None
+        key = json.dumps(spec, sort_keys=True)
+        canon = self._canons.get(key)
+        if canon is None:
+            rules = [(re.compile(p), r) for p, r in spec["rules"]]
+            canon = self._canons[key] = Canonicalizer(
+                rules, templates=spec["templates"]
+            )
+        return canon
+
+    def _analyze(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        from deeptrace.api import analyze
+        from deeptrace.core.pushdown import StepFilter
+
+        options = {k: v for k, v in query["options"].items() if k in _ANALYZE_OPTIONS}
+        where = query.get("where")
+        results = analyze(
+            query["paths"],
+            **options,
+            where=StepFilter(*where) if where else None,
+            canon=self._canon(query.get("canon")),
+            cache=self.cache,
+        )
+        return [_encode_analysis(r) for r in results]
+
+    def _compare(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        from deeptrace.api import compare
+
+        options = {k: v for k, v in query["options"].items() if k in _COMPARE_OPTIONS}
+        # parsed in this process: worker processes would not fill the cache
+        result = compare(
+            query["runs_a"],
+            query["runs_b"],
+            **options,
+            jobs=1,
+            canon=self._canon(query.get("canon")),
+            cache=self.cache,
+        )
+        return _encode_comparison(result)
+
+    def _stats(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 3),
+            "queries": self.queries,
+            "cached_tables": len(self.cache),
+            "cached_bytes": self.cache.nbytes,
+            "max_bytes": self.cache.max_bytes,
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+        }
+
+    def answer(self, line: bytes) -> Dict[str, Any]:
+        from deeptrace.api import AnalysisError
+
+        t0 = time.perf_counter()
+        try:
+            query = json.loads(line)
+            if query.get("op") not in _OPS:
+                raise ValueError(f"unknown op {query.get('op')!r}")
+            result = getattr(self, f"_{query['op']}")(query)
+        except AnalysisError as exc:
+            return {"ok": False, "kind": "AnalysisError", "error": str(exc)}
+        except Exception as exc:
+            logger.exception("query failed")
+            return {"ok": False, "kind": type(exc).__name__, "error": str(exc)}
+        self.queries += 1
+        logger.info("%s in %.1f ms", query["op"], (time.perf_counter() - t0) * 1000)
+        return {"ok": True, "result": result}
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        try:
+            while line := await reader.readline():
+                response = await loop.run_in_executor(self.executor, self.answer, line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError) as exc:
+            logger.debug("connection dropped: %s", exc)
+        finally:
+            writer.close()
+
+
+async def serve(
+    address: Optional[str] = None,
+    cache: Optional[MemoryCache] = None,
+    executor: Optional[Executor] = None,
+    ready: Optional[asyncio.Event] = None,
+) -> None:
+    """
+    Serve queries at `address` (default_address() unless given; "HOST:PORT"
+    for TCP on a loopback address only: queries are not authenticated and
+    read any path the daemon can) until cancelled. `executor` parses the inputs (the loop's
+    default thread pool unless given); `ready` is set once listening.
+    """
+    import asyncio
+
+    from deeptrace.core.cache import MemoryCache
+    from deeptrace.core.registry import preload_all_parsers
+
+    preload_all_parsers()
+    server_state = _Server(cache if cache is not None else MemoryCache(), executor)
+    address = address or default_address()
+    tcp = _split(address)
+    if tcp is not None and not _is_loopback(tcp[0]):
+        raise OSError(f"{address}: the daemon only listens on a loopback address")
+    if tcp is None:
+        if os.path.exists(address):
+            # a socket left behind by a daemon that did not shut down cleanly
+            probe = connect(address)
+            if probe is not None:
+                probe.close()
+                raise OSError(f"{address}: a daemon is already listening")
+            os.unlink(address)
+        # created owner-only: a chmod afterwards leaves a window in which
+        # other users can connect
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                server_state.handle, address, limit=_LINE_LIMIT
+            )
+        finally:
+            os.umask(umask)
+    else:
+        server = await asyncio.start_server(
+            server_state.handle, *tcp, limit=_LINE_LIMIT
+        )
+    try:
+        async with server:
+            if ready is not None:
+                ready.set()
+            await server.serve_forever()
+    finally:
+        if tcp is None and os.path.exists(address):
+            os.unlink(address)
@@ -0,0 +1,329 @@
+"""
+Report writers: Markdown, JSON and CSV, streamed to an open text file.
+
+Rows are written as they are produced, so a compare report over 100k step
+names never exists as one big string. JSON reports follow
+schemas/report.schema.json (see schema_path()); CSV carries the step rows
+only, one per line, with a header.
+
+Every report kind has one entry point taking the target format:
+
+    path = get_report_path(report_dir, "json")
+    with open_report(path) as fh:
+        write_analyze_report(fh, "json", steps, summary, source=str(log))
+"""
+
+from __future__ import annotations
+import csv
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+)
+
+from deeptrace.core.models import Step
+
+if TYPE_CHECKING:
+    from deeptrace.core.comparison import StepDiff
+    from deeptrace.core.intervals import Contribution, Timeline
+    from deeptrace.utils import Summary
+
+__all__ = [
+    "REPORT_FORMATS",
+    "SCHEMA_ID",
+    "open_report",
+    "schema_path",
+    "write_ab_markdown_report",
+    "write_analyze_report",
+    "write_compare_report",
+    "write_critical_path_markdown",
+    "write_critical_path_report",
+    "write_markdown_report",
+]
+
+REPORT_FORMATS = ("md", "json", "csv")
+SCHEMA_ID = "deeptrace-report/1"
+
+Rows = Sequence[Tuple[str, str]]
+
+
+def schema_path() -> Path:
+    """JSON schema of the JSON reports, shipped with the package."""
+    return Path(__file__).with_name("schemas") / "report.schema.json"
+
+
+def open_report(path: Path) -> TextIO:
+    """Text file for a writer below; pick `path` with utils.get_report_path."""
+    # the csv module does its own line endings
+    newline = "" if path.suffix == ".csv" else None
+    return path.open("w", encoding="utf-8", newline=newline)
+
+
+def _check(fmt: str) -> None:
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(
+            f"unknown report format {fmt!r}, expected {', '.join(REPORT_FORMATS)}"
+        )
+
+
+# ───────────────────────── json ───────────────────────── #
+
+
+def _summary(summary: Summary) -> Dict[str, Any]:
+    return {
+        "count": summary.count,
+        "min_ms": summary.min_ms,
+        "max_ms": summary.max_ms,
+        "median_ms": summary.median_ms,
+        "avg_ms": round(summary.avg_ms, 3),
+        "percentiles": {str(p): v for p, v in summary.percentiles.items()},
+        "approximate": summary.approximate,
+    }
+
+
+def _write_json(
+    fh: TextIO, kind: str, header: Dict[str, Any], rows: Iterable[Dict[str, Any]]
+) -> None:
+    """{"schema", "kind", "generated_at", **header, "steps": [rows...]}"""
+    head = {
+        "schema": SCHEMA_ID,
+        "kind": kind,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **header,
+    }
+    fh.write("{\n")
+    for key, value in head.items():
+        fh.write(f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n")
+    fh.write('  "steps": [')
+    sep = "\n    "
+    for row in rows:
+        fh.write(sep + json.dumps(row, ensure_ascii=False))
+        sep = ",\n    "
+    fh.write("\n  ]\n}\n")
+
+
+# ───────────────────────── analyze ───────────────────────── #
+
+
+def write_markdown_report(
+    fh: TextIO, steps: Iterable[Step], stats: Rows, title: str = "DeepTrace Report"
+) -> None:
+    """utils.generate_markdown_report(), written line by line."""
+    fh.write(f"# {title}\n\n")
+    i = 0
+    for i, s in enumerate(steps, 1):
+        if i == 1:
+            fh.write("## Steps\n\n| № | Step | ms |\n|---|------|---:|\n")
+        fh.write(f"| {i} | {s.name} | {s.duration} |\n")
+    if not i:
+        fh.write("_No steps found_\n")
+        return
+    fh.write("\n## Stats\n\n| metric | value |\n|--------|-------|\n")
+    _markdown_rows(fh, stats)
+
+
+def _markdown_rows(fh: TextIO, stats: Rows) -> None:
+    for k, v in stats:
+        fh.write(f"| {k} | {v} |\n")
+
+
+def write_analyze_report(
+    fh: TextIO,
+    fmt: str,
+    steps: Iterable[Step],
+    summary: Summary,
+    *,
+    title: str = "DeepTrace Report",
+    source: Optional[str] = None,
+    log_format: Optional[str] = None,
+) -> None:
+    """The slowest steps (`steps`, already ranked) and their statistics."""
+    _check(fmt)
+    if fmt == "md":
+        from deeptrace.utils import get_stats
+
+        write_markdown_report(fh, steps, get_stats(summary), title)
+    elif fmt == "json":
+        header = {"source": source, "format": log_format, "stats": _summary(summary)}
+        rows = (
+            {"rank": i, "name": s.name, "ms": s.duration}
+            for i, s in enumerate(steps, 1)
+        )
+        _write_json(fh, "analyze", header, rows)
+    else:
+        out = csv.writer(fh)
+        out.writerow(("rank", "name", "ms"))
+        for i, s in enumerate(steps, 1):
+            out.writerow((i, s.name, s.duration))
+
+
+# ───────────────────────── compare ───────────────────────── #
+
+
+def write_ab_markdown_report(
+    fh: TextIO,
+    diffs: Sequence[StepDiff],
+    stats_a: Rows,
+    stats_b: Rows,
+    *,
+    title: str = "A/B Log Comparison",
+    label_a: str = "A",
+    label_b: str = "B",
+    limit: Optional[int] = None,
+) -> None:
+    """utils.generate_ab_diff_markdown_report(), written line by line."""
+    from deeptrace.utils import format_effect
+
+    fh.write(f"# {title}\n\n## Summary\n\n")
+    fh.write(f"- {label_a}: {sum(1 for d in diffs if d.n_a)} steps\n")
+    fh.write(f"- {label_b}: {sum(1 for d in diffs if d.n_b)} steps\n")
+    fh.write(
+        f"- slower: {sum(1 for d in diffs if d.status == 'slower')}, "
+        f"faster: {sum(1 for d in diffs if d.status == 'faster')}\n\n"
+    )
+    fh.write(
+        "## Steps comparison\n\n"
+        f"| step | {label_a} | {label_b} | Δ | effect | p | verdict |\n"
+        "|------|------:|------:|----:|------:|----:|---------|\n"
+    )
+    for d in diffs[:limit]:
+        d_a = "" if d.avg_a is None else d.avg_a
+        d_b = "" if d.avg_b is None else d.avg_b
+        if d.delta is not None:
+            delta = f"{'+' if d.delta >= 0 else ''}{d.delta}"
+        else:
+            delta = d.status
+        effect, p = format_effect(d)
+        fh.write(
+            f"| {d.name} | {d_a} | {d_b} | {delta} | {effect} | {p} | {d.status} |\n"
+        )
+    for label, stats in ((label_a, stats_a), (label_b, stats_b)):
+        fh.write(f"\n## Stats for {label}\n\n| metric | value |\n|--------|-------|\n")
+        _markdown_rows(fh, stats)
+
+
+def write_compare_report(
+    fh: TextIO,
+    fmt: str,
+    diffs: Sequence[StepDiff],
+    summary_a: Summary,
+    summary_b: Summary,
+    *,
+    label_a: str = "A",
+    label_b: str = "B",
+    limit: Optional[int] = None,
+    log_format: Optional[str] = None,
+) -> None:
+    """An A/B comparison; `diffs` come from compare_runs(), effect order."""
+    _check(fmt)
+    if fmt == "md":
+        from deeptrace.utils import get_stats
+
+        write_ab_markdown_report(
+            fh,
+            diffs,
+            get_stats(summary_a),
+            get_stats(summary_b),
+            label_a=label_a,
+            label_b=label_b,
+            limit=limit,
+        )
+        return
+    fields = ("name", "status", "n_a", "n_b", "avg_a", "avg_b", "delta")
+    if fmt == "json":
+        header = {
+            "format": log_format,
+            "labels": {"a": label_a, "b": label_b},
+            "stats_a": _summary(summary_a),
+            "stats_b": _summary(summary_b),
+        }
+        rows = (
+            {
+                **{f: getattr(d, f) for f in fields},
+                "effect": d.effect,
+                "p_value": d.p_value,
+            }
+            for d in diffs[:limit]
+        )
+        _write_json(fh, "compare", header, rows)
+    else:
+        out = csv.writer(fh)
+        out.writerow((*fields, "effect", "p_value"))
+        for d in diffs[:limit]:
+            out.writerow((*(getattr(d, f) for f in fields), d.effect, d.p_value))
+
+
+# ───────────────────────── critical path ───────────────────────── #
+
+
+def write_critical_path_markdown(
+    fh: TextIO,
+    rows: Sequence[Contribution],
+    timeline: Timeline,
+    title: str = "DeepTrace Critical Path",
+) -> None:
+    """utils.generate_critical_path_report(), written line by line."""
+    from deeptrace.utils import timeline_summary
+
+    fh.write(f"# {title}\n\n## Steps\n\n")
+    fh.write("| № | Step | count | wall ms | alone ms | sum ms |\n")
+    fh.write("|---|------|------:|--------:|---------:|-------:|\n")
+    for i, r in enumerate(rows, 1):
+        fh.write(
+            f"| {i} | {r.name} | {r.count} | {r.attributed_ms:.0f} "
+            f"| {r.exclusive_ms} | {r.total_ms} |\n"
+        )
+    fh.write("\n## Timeline\n\n| metric | value |\n|--------|-------|\n")
+    _markdown_rows(fh, timeline_summary(timeline))
+    fh.write("\n| concurrency | ms |\n|---:|---:|\n")
+    for k, ms in timeline.histogram.items():
+        fh.write(f"| {k} | {ms} |\n")
+
+
+def write_critical_path_report(
+    fh: TextIO,
+    fmt: str,
+    rows: Sequence[Contribution],
+    timeline: Timeline,
+    *,
+    source: Optional[str] = None,
+    log_format: Optional[str] = None,
+) -> None:
+    """Step names ranked by their share of the run's wall-clock time."""
+    _check(fmt)
+    if fmt == "md":
+        write_critical_path_markdown(fh, rows, timeline)
+        return
+    fields = ("name", "count", "attributed_ms", "exclusive_ms", "total_ms")
+    if fmt == "json":
+        header = {
+            "source": source,
+            "format": log_format,
+            "timeline": {
+                "span_ms": timeline.span_ms,
+                "coverage_ms": timeline.coverage_ms,
+                "idle_ms": timeline.idle_ms,
+                "gaps": len(timeline.gaps),
+                "max_concurrency": timeline.max_concurrency,
+                "avg_concurrency": round(timeline.avg_concurrency, 3),
+                "histogram": {str(k): ms for k, ms in timeline.histogram.items()},
+            },
+        }
+        steps = (
+            {"rank": i, **{f: getattr(r, f) for f in fields}}
+            for i, r in enumerate(rows, 1)
+        )
+        _write_json(fh, "critical-path", header, steps)
+    else:
+        out = csv.writer(fh)
+        out.writerow(("rank", *fields))
+        for i, r in enumerate(rows, 1):
+            out.writerow((i, *(getattr(r, f) for f in fields)))
@@ -1,38 +1,82 @@
 from __future__ import annotations
+import io
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from rich.columns import Columns
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich import box
-from statistics import mean, median
-from typing import Iterable, List, Sequence, Tuple, Dict
-
-from deeptrace.core.models import Step
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple, Dict, Union
+
+from deeptrace.core.models import Step, StepTable
+from deeptrace.core.sketch import DEFAULT_ACCURACY, QuantileSketch
+
+# rich is imported by the rendering functions only: plain statistics and
+# markdown reports do not pay for it.
+if TYPE_CHECKING:
+    from rich.console import Console, RenderableType
+    from rich.table import Table
+
+    from deeptrace.api import AnalysisResult, BatchResult, VarianceResult
+    from deeptrace.core.analyzer import LiveAnalysis
+    from deeptrace.core.comparison import StepDiff
+    from deeptrace.core.groupby import StepStats
+    from deeptrace.core.har import PhaseRow
+    from deeptrace.core.intervals import Contribution, Timeline
+    from deeptrace.core.profiling import Profile
+    from deeptrace.core.store import TrendPoint
 
 __all__ = [
+    "Summary",
+    "summarize",
+    "get_console",
     "get_report_path",
     "get_stats",
     "generate_markdown_report",
     "generate_ab_markdown_report",
+    "generate_ab_diff_markdown_report",
+    "generate_critical_path_report",
+    "format_effect",
+    "timeline_summary",
     "make_rich_stats_table",
     "print_rich_steps_table",
+    "print_rich_step_stats",
+    "print_rich_analysis",
+    "print_rich_batch_breakdown",
     "print_rich_ab_comparison",
+    "print_rich_trend_table",
+    "make_rich_live_view",
+    "print_rich_profile",
+    "print_rich_critical_path",
+    "print_rich_har_breakdown",
+    "print_rich_variance",
 ]
 
 # ───────────────────────── helpers ────────────────────────── #
 
 
-def get_report_path(report_dir: str | Path, fmt: str = "md") -> Path:
+def get_report_path(
+    report_dir: str | Path, fmt: str = "md", name: Optional[str] = None
+) -> Path:
+    """
+    `name` as given (".fmt" added when it has no suffix), otherwise a new
+    report-YYYYmmdd-HHMMSS[-N].fmt that does not overwrite earlier reports.
+    """
     dst = Path(report_dir)
     dst.mkdir(parents=True, exist_ok=True)
-    return dst / f"report.{fmt}"
+    if name:
+        path = dst / name
+        return path if path.suffix else path.with_name(f"{path.name}.{fmt}")
+    stem = f"report-{datetime.now():%Y%m%d-%H%M%S}"
+    path = dst / f"{stem}.{fmt}"
+    n = 1
+    while path.exists():
+        n += 1
+        path = dst / f"{stem}-{n}.{fmt}"
+    return path
 
 
 # ───────────────────────── statistics ─────────────────────── #
 
 
-def _perc(vals: list[int], p: int) -> int:
+def _perc(vals: Sequence[int], p: int) -> int:
     if not vals:
         return 0
     if p <= 0:
@@ -46,22 +90,112 @@ def _perc(vals: list[int], p: int) -> int:
     return int(vals[f] * (c - k) + vals[c] * (k - f))
 
 
+# tables up to this size get exact percentiles unless exact=False
+EXACT_LIMIT = 100_000
+
+
+@dataclass(slots=True)
+class Summary:
+    """
+    Duration statistics of a set of steps, ms. `approximate`: median and
+    percentiles come from a QuantileSketch.
+    """
+
+    count: int = 0
+    min_ms: int = 0
+    max_ms: int = 0
+    median_ms: int = 0
+    avg_ms: float = 0.0
+    percentiles: Dict[int, int] = field(default_factory=dict)
+    approximate: bool = False
+
+
+def _sketch_summary(sketch: QuantileSketch, percentiles: Sequence[int]) -> Summary:
+    if not sketch.count:
+        return Summary()
+    return Summary(
+        sketch.count,
+        int(sketch.min),
+        int(sketch.max),
+        sketch.percentile(50),
+        sketch.mean,
+        {p: sketch.percentile(p) for p in percentiles},
+        approximate=True,
+    )
+
+
+def summarize(
+    steps: Union[Iterable[Step], StepTable, QuantileSketch],
+    percentiles: Sequence[int] = (95, 99),
+    *,
+    exact: Optional[bool] = None,
+    relative_accuracy: float = DEFAULT_ACCURACY,
+) -> Summary:
+    """
+    exact=True sorts every duration; exact=False feeds a QuantileSketch in
+    one pass; None is exact for inputs up to EXACT_LIMIT steps. A ready
+    sketch is summarised as is.
+    """
+    if isinstance(steps, QuantileSketch):
+        return _sketch_summary(steps, percentiles)
+    if isinstance(steps, StepTable):
+        if exact is None:
+            exact = len(steps) <= EXACT_LIMIT
+        if not exact:
+            sketch = QuantileSketch(relative_accuracy).update(steps.durations())
+            return _sketch_summary(sketch, percentiles)
+        vals: Sequence[int] = steps.sorted_durations()
+        total = steps.total_duration()
+    elif exact is False:
+        sketch = QuantileSketch(relative_accuracy).update(s.duration for s in steps)
+        return _sketch_summary(sketch, percentiles)
+    else:
+        vals = sorted(s.duration for s in steps)
+        total = sum(vals)
+    n = len(vals)
+    if not n:
+        return Summary()
+    mid = n // 2
+    median = vals[mid] if n % 2 else (vals[mid - 1] + vals[mid]) / 2
+    return Summary(
+        n,
+        vals[0],
+        vals[-1],
+        int(median),
+        total / n,
+        {p: _perc(vals, p) for p in percentiles},
+    )
+
+
 def get_stats(
-    steps: Iterable[Step], percentiles: Sequence[int] = (95, 99)
+    steps: Union[Iterable[Step], StepTable, QuantileSketch, Summary],
+    percentiles: Sequence[int] = (95, 99),
+    *,
+    exact: Optional[bool] = None,
+    relative_accuracy: float = DEFAULT_ACCURACY,
 ) -> List[Tuple[str, str]]:
-    vals = [s.duration for s in steps]
-    if not vals:
+    """
+    summarize() as (metric, value) rows, approximate values marked with ≈.
+    A ready Summary is formatted as is.
+    """
+    if isinstance(steps, Summary):
+        summary = steps
+    else:
+        summary = summarize(
+            steps, percentiles, exact=exact, relative_accuracy=relative_accuracy
+        )
+    if not summary.count:
         return [("Total steps", "0")]
-    vals.sort()
+    approx = "≈" if summary.approximate else ""
     stats: List[Tuple[str, str]] = [
-        ("Total steps", str(len(vals))),
-        ("Min", f"{vals[0]} ms"),
-        ("Max", f"{vals[-1]} ms"),
-        ("Median (p50)", f"{int(median(vals))} ms"),
-        ("Avg", f"{mean(vals):.1f} ms"),
+        ("Total steps", str(summary.count)),
+        ("Min", f"{summary.min_ms} ms"),
+        ("Max", f"{summary.max_ms} ms"),
+        ("Median (p50)", f"{approx}{summary.median_ms} ms"),
+        ("Avg", f"{summary.avg_ms:.1f} ms"),
     ]
-    for p in percentiles:
-        stats.append((f"P{p}", f"{_perc(vals, p)} ms"))
+    for p, value in summary.percentiles.items():
+        stats.append((f"P{p}", f"{approx}{value} ms"))
     return stats
 
 
@@ -74,82 +208,114 @@ def generate_markdown_report(
     *,
     title: str = "DeepTrace Report",
 ) -> str:
-    steps = list(steps)
-    lines = [f"# {title}", ""]
-    if not steps:
-        lines.append("_No steps found_")
-        return "\n".join(lines)
+    from deeptrace.reports import write_markdown_report
 
-    lines += ["## Steps", "", "| № | Step | ms |", "|---|------|---:|"]
-    for i, s in enumerate(steps, 1):
-        lines.append(f"| {i} | {s.name} | {s.duration} |")
+    buf = io.StringIO()
+    write_markdown_report(buf, steps, stats, title)
+    return buf.getvalue().rstrip("\n")
 
-    lines += ["", "## Stats", "", "| metric | value |", "|--------|-------|"]
-    lines += [f"| {k} | {v} |" for k, v in stats]
-    return "\n".join(lines)
+
+def format_effect(d: StepDiff) -> Tuple[str, str]:
+    if d.effect is None or d.p_value is None:
+        return "", ""
+    return f"{d.effect:+.2f}", f"{d.p_value:.3g}"
 
 
 def generate_ab_markdown_report(
-    steps_a,
-    steps_b,
+    steps_a: Iterable[Step],
+    steps_b: Iterable[Step],
     stats_a,
     stats_b,
     *,
     title: str = "A/B Log Comparison",
     label_a: str = "A",
     label_b: str = "B",
+    limit: Optional[int] = None,
 ) -> str:
-    sa, sb = list(steps_a), list(steps_b)
-    da, db = {s.name: s for s in sa}, {s.name: s for s in sb}
-    names = sorted(set(da) | set(db))
-
-    lines = [
-        f"# {title}",
-        "",
-        "## Summary",
-        "",
-        f"- {label_a}: {len(sa)} steps",
-        f"- {label_b}: {len(sb)} steps",
-        "",
+    """Two single runs: compares them with compare_runs() first."""
+    from deeptrace.core.comparison import compare_runs
+
+    tables = [
+        steps if isinstance(steps, StepTable) else StepTable.from_steps(steps)
+        for steps in (steps_a, steps_b)
     ]
+    diffs = compare_runs(tables[:1], tables[1:])
+    return generate_ab_diff_markdown_report(
+        diffs,
+        stats_a,
+        stats_b,
+        title=title,
+        label_a=label_a,
+        label_b=label_b,
+        limit=limit,
+    )
+
 
-    lines += [
-        "## Steps comparison",
-        "",
-        f"| step | {label_a} | {label_b} | Δ |",
-        "|------|------:|------:|----:|",
+def generate_ab_diff_markdown_report(
+    diffs: Sequence[StepDiff],
+    stats_a,
+    stats_b,
+    *,
+    title: str = "A/B Log Comparison",
+    label_a: str = "A",
+    label_b: str = "B",
+    limit: Optional[int] = None,
+) -> str:
+    """`diffs` come from compare_runs(), already ordered by effect size."""
+    from deeptrace.reports import write_ab_markdown_report
+
+    buf = io.StringIO()
+    write_ab_markdown_report(
+        buf,
+        diffs,
+        stats_a,
+        stats_b,
+        title=title,
+        label_a=label_a,
+        label_b=label_b,
+        limit=limit,
+    )
+    return buf.getvalue().rstrip("\n")
+
+
+def timeline_summary(timeline: Timeline) -> List[Tuple[str, str]]:
+    longest = max((e - s for s, e in timeline.gaps), default=0)
+    return [
+        ("Wall clock", f"{timeline.span_ms} ms"),
+        ("Busy", f"{timeline.coverage_ms} ms"),
+        ("Idle", f"{timeline.idle_ms} ms in {len(timeline.gaps)} gap(s)"),
+        ("Longest gap", f"{longest} ms"),
+        ("Max concurrency", str(timeline.max_concurrency)),
+        ("Avg concurrency", f"{timeline.avg_concurrency:.2f}"),
     ]
-    for n in names:
-        a = da.get(n)
-        b = db.get(n)
-        d_a = a.duration if a else ""
-        d_b = b.duration if b else ""
-        if a and b:
-            delta = f"{'+' if b.duration - a.duration >= 0 else ''}{b.duration - a.duration}"
-        elif a is None:
-            delta = "new"
-        else:
-            delta = "gone"
-        lines.append(f"| {n} | {d_a} | {d_b} | {delta} |")
 
-    def _stats_block(label, stats):
-        return [
-            "",
-            f"## Stats for {label}",
-            "",
-            "| metric | value |",
-            "|--------|-------|",
-            *[f"| {k} | {v} |" for k, v in stats],
-        ]
 
-    lines += _stats_block(label_a, stats_a)
-    lines += _stats_block(label_b, stats_b)
-    return "\n".join(lines)
+def generate_critical_path_report(
+    rows: Sequence[Contribution],
+    timeline: Timeline,
+    *,
+    title: str = "DeepTrace Critical Path",
+) -> str:
+    from deeptrace.reports import write_critical_path_markdown
+
+    buf = io.StringIO()
+    write_critical_path_markdown(buf, rows, timeline, title)
+    return buf.getvalue().rstrip("\n")
 
 
 # ───────────────────────── rich ────────────────────── #
 
-console = Console()
+_console: Optional[Console] = None
+
+
+def get_console() -> Console:
+    """Shared rich Console, created on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -157,6 +323,9 @@ console = Console()
 # ─────────────────────────────────────────────────────────────────────────────
 def _make_table(title: str) -> Table:
     """Единый стиль таблиц: скруглённая рамка + жирные заголовки."""
+    from rich import box
+    from rich.table import Table
+
     return Table(title=title, show_header=True, header_style="bold", box=box.ROUNDED)
 
 
@@ -183,6 +352,9 @@ def print_run_summary(
     stats: List[Tuple[str, str]], *, title: str = "Run summary"
 ) -> None:
     """Печатает небольшую панель-сводку до таблиц."""
+    from rich.panel import Panel
+    from rich.table import Table
+
     d = _stats_to_dict(stats)
     grid = Table.grid(padding=(0, 2))
     grid.add_column(style="bold cyan")
@@ -190,7 +362,7 @@ def print_run_summary(
     for key in ("Total steps", "Avg", "Median (p50)", "Min", "Max"):
         if key in d:
             grid.add_row(key.replace(" (p50)", ""), d[key])
-    console.print(Panel(grid, title=title, border_style="green"))
+    get_console().print(Panel(grid, title=title, border_style="green"))
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -203,50 +375,152 @@ def print_rich_steps_table(steps: Iterable[Step], *, title: str = "Slow steps")
     tbl.add_column("ms", justify="right")
     for idx, s in enumerate(steps, 1):
         tbl.add_row(str(idx), s.name, str(s.duration))
-    console.print(tbl)
+    get_console().print(tbl)
+
+
+def print_rich_step_stats(
+    rows: Sequence[Tuple[str, StepStats]], rank_by: str, *, title: str = "Slow steps"
+) -> None:
+    """Шаги со статистикой длительностей (GroupBy), отсортированные по rank_by."""
+    from deeptrace.core.groupby import RANK_KEYS
+
+    keys = ["avg", "p50", "p95", "max", "total"]
+    if rank_by not in keys:
+        keys.insert(keys.index("max"), rank_by)
+    tbl = _make_table(f"{title} (by {rank_by})")
+    tbl.add_column("#", justify="right", style="dim")
+    tbl.add_column("step")
+    tbl.add_column("count", justify="right")
+    for key in keys:
+        tbl.add_column(key, justify="right", style="bold" if key == rank_by else "")
+    tbl.add_column("stddev", justify="right", style="dim")
+    for idx, (name, st) in enumerate(rows, 1):
+        tbl.add_row(
+            str(idx),
+            name,
+            str(st.count),
+            *(f"{RANK_KEYS[key](st):.0f}" for key in keys),
+            f"{st.stddev:.0f}",
+        )
+    get_console().print(tbl)
+
+
+def print_rich_analysis(result: AnalysisResult) -> None:
+    """Самые долгие шаги результата api.analyze()/merge() и их статистика."""
+    from rich.columns import Columns
+
+    groups = result.groups
+    if groups is not None and groups.key != "avg":
+        print_rich_step_stats(
+            [(s.name, groups.groups[s.name]) for s in result.slowest], groups.key
+        )
+    else:
+        print_rich_steps_table(result.slowest)
+    get_console().print(
+        Columns(
+            [
+                make_rich_stats_table(
+                    get_stats(result.slowest_summary), "Stats (filtered)"
+                ),
+                make_rich_stats_table(get_stats(result.summary), "Stats (all)"),
+            ]
+        )
+    )
+
+
+def print_rich_batch_breakdown(batch: BatchResult, *, limit: int = 5) -> None:
+    """Разбивка пакетного анализа по форматам и самые медленные/сбойные файлы."""
+    from rich.columns import Columns
+
+    fmt_tbl = _make_table("Formats")
+    fmt_tbl.add_column("format")
+    fmt_tbl.add_column("files", justify="right")
+    fmt_tbl.add_column("steps", justify="right")
+    fmt_tbl.add_column("parse s", justify="right")
+    fmt_tbl.add_column("errors", justify="right")
+    for row in batch.by_format().values():
+        fmt_tbl.add_row(
+            row.format,
+            str(row.files),
+            str(row.steps),
+            f"{row.seconds:.2f}",
+            f"[red]{row.errors}[/]" if row.errors else "0",
+        )
+
+    file_tbl = _make_table("Slowest files to parse")
+    file_tbl.add_column("file")
+    file_tbl.add_column("format")
+    file_tbl.add_column("steps", justify="right")
+    file_tbl.add_column("ms", justify="right")
+    slowest = sorted(batch.files, key=lambda f: -f.seconds)[:limit]
+    for f in slowest:
+        file_tbl.add_row(
+            str(f.path), f.format or "?", str(f.steps), f"{f.seconds * 1000:.0f}"
+        )
+    get_console().print(Columns([fmt_tbl, file_tbl]))
+
+    failed = [f for f in batch.files if f.error]
+    if failed:
+        err_tbl = _make_table(f"Failed files ({len(failed)})")
+        err_tbl.add_column("file")
+        err_tbl.add_column("format")
+        err_tbl.add_column("error", style="red")
+        for f in failed[:limit]:
+            err_tbl.add_row(str(f.path), f.format or "?", f.error)
+        get_console().print(err_tbl)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # A/B сравнение
 # ─────────────────────────────────────────────────────────────────────────────
+_VERDICT_STYLE = {
+    "slower": "[red]slower[/]",
+    "faster": "[green]faster[/]",
+    "same": "[dim]≈[/dim]",
+    "new": "[blue]new[/]",
+    "gone": "[dim]gone[/dim]",
+}
+
+
 def print_rich_ab_comparison(
-    steps_a: Iterable[Step],
-    steps_b: Iterable[Step],
+    diffs: Sequence[StepDiff],
     stats_a: List[Tuple[str, str]],
     stats_b: List[Tuple[str, str]],
     *,
     label_a: str = "A",
     label_b: str = "B",
+    limit: Optional[int] = None,
 ) -> None:
-    steps_a, steps_b = list(steps_a), list(steps_b)
-    dict_a = {s.name: s for s in steps_a}
-    dict_b = {s.name: s for s in steps_b}
-    all_names = sorted(dict_a.keys() | dict_b.keys())
+    from rich.columns import Columns
 
     tbl = _make_table(f"Steps comparison: {label_a} vs {label_b}")
     tbl.add_column("step")
     tbl.add_column(label_a, justify="right")
     tbl.add_column(label_b, justify="right")
     tbl.add_column("Δ", justify="right")
-
-    for name in all_names:
-        a, b = dict_a.get(name), dict_b.get(name)
-        if a and b:
-            delta = b.duration - a.duration
-            delta_str = f"[red]+{delta}[/]" if delta > 0 else f"[green]{delta}[/]"
-        elif a is None:
-            delta_str = "[blue]new[/]"
+    tbl.add_column("effect", justify="right")
+    tbl.add_column("p", justify="right")
+    tbl.add_column("verdict")
+
+    for d in diffs[:limit]:
+        delta = d.delta
+        if delta is None:
+            delta_str = ""
         else:
-            delta_str = "[dim]gone[/dim]"
+            delta_str = f"[red]+{delta}[/]" if delta > 0 else f"[green]{delta}[/]"
+        effect, p = format_effect(d)
         tbl.add_row(
-            name,
-            str(a.duration) if a else "",
-            str(b.duration) if b else "",
+            d.name,
+            "" if d.avg_a is None else str(d.avg_a),
+            "" if d.avg_b is None else str(d.avg_b),
             delta_str,
+            effect,
+            p,
+            _VERDICT_STYLE.get(d.status, d.status),
         )
 
-    console.print(tbl)
-    console.print(
+    get_console().print(tbl)
+    get_console().print(
         Columns(
             [
                 make_rich_stats_table(stats_a, f"Stats {label_a}"),
@@ -254,3 +528,218 @@ def print_rich_ab_comparison(
             ]
         )
     )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# История прогонов
+# ─────────────────────────────────────────────────────────────────────────────
+def print_rich_trend_table(
+    points: Sequence[TrendPoint],
+    percentiles: Sequence[int] = (95, 99),
+    *,
+    title: str = "Trend",
+) -> None:
+    """Одна строка на прогон, от старых к новым."""
+    tbl = _make_table(title)
+    tbl.add_column("run time")
+    tbl.add_column("count", justify="right")
+    tbl.add_column("avg", justify="right")
+    for p in percentiles:
+        tbl.add_column(f"P{p}", justify="right")
+    tbl.add_column("max", justify="right")
+
+    for pt in reversed(points):
+        sk = pt.sketch
+        tbl.add_row(
+            datetime.fromtimestamp(pt.run_time).isoformat(sep=" ", timespec="seconds"),
+            str(sk.count),
+            f"{sk.mean:.1f}",
+            *[str(sk.percentile(p)) for p in percentiles],
+            str(int(sk.max)),
+        )
+    get_console().print(tbl)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Живой просмотр (watch)
+# ─────────────────────────────────────────────────────────────────────────────
+def make_rich_live_view(
+    live: LiveAnalysis,
+    percentiles: Sequence[int] = (95, 99),
+    *,
+    title: str = "Slow steps (live)",
+    status: str = "",
+) -> RenderableType:
+    """Самые долгие шаги + сводка; строится за O(top + бакеты скетча)."""
+    from rich.console import Group
+
+    tbl = _make_table(title)
+    tbl.add_column("#", justify="right", style="dim")
+    tbl.add_column("step")
+    tbl.add_column("ms", justify="right")
+    tbl.add_column("avg", justify="right")
+    for idx, s in enumerate(live.slowest(), 1):
+        tbl.add_row(str(idx), s.name, str(s.duration), str(live.average(s.name)))
+
+    stats = make_rich_stats_table(get_stats(live.sketch, percentiles), "Stats (all)")
+    return Group(tbl, stats, status)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Профиль (--profile)
+# ─────────────────────────────────────────────────────────────────────────────
+def print_rich_profile(prof: Profile) -> None:
+    """Фазы с долей от общего времени, попытки парсеров и счётчики."""
+    total = prof.total_s or 1e-9
+    tbl = _make_table(f"Profile: {prof.command}")
+    tbl.add_column("phase")
+    tbl.add_column("ms", justify="right")
+    tbl.add_column("%", justify="right")
+    for key, seconds in prof.phases.items():
+        depth = key.count("/")
+        tbl.add_row(
+            "  " * depth + key.rsplit("/", 1)[-1],
+            f"{seconds * 1000:.1f}",
+            f"{seconds / total * 100:.0f}",
+        )
+    tbl.add_row("[bold]total[/]", f"{prof.total_s * 1000:.1f}", "100")
+    console = get_console()
+    console.print(tbl)
+
+    if prof.attempts:
+        parsers = _make_table("Parser attempts")
+        parsers.add_column("parser")
+        parsers.add_column("score", justify="right")
+        parsers.add_column("outcome")
+        parsers.add_column("ms", justify="right")
+        for a in prof.attempts:
+            parsers.add_row(
+                a.parser,
+                "" if a.score is None else f"{a.score:.2f}",
+                a.outcome,
+                f"{a.seconds * 1000:.1f}",
+            )
+        console.print(parsers)
+
+    counters = [f"{k}={v:,}" for k, v in prof.counters.items()]
+    if prof.peak_rss_kb is not None:
+        counters.append(f"peak_rss={prof.peak_rss_kb / 1024:.1f} MiB")
+    if counters:
+        console.print("  ".join(counters))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Критический путь (--critical-path)
+# ─────────────────────────────────────────────────────────────────────────────
+def print_rich_critical_path(
+    rows: Sequence[Contribution],
+    timeline: Timeline,
+    *,
+    title: str = "Critical path",
+) -> None:
+    """Вклад шагов во время прогона + сводка по таймлайну и параллельности."""
+    from rich.columns import Columns
+
+    busy = timeline.coverage_ms or 1
+    tbl = _make_table(title)
+    tbl.add_column("#", justify="right", style="dim")
+    tbl.add_column("step")
+    tbl.add_column("count", justify="right")
+    tbl.add_column("wall ms", justify="right")
+    tbl.add_column("%", justify="right")
+    tbl.add_column("alone ms", justify="right")
+    tbl.add_column("sum ms", justify="right", style="dim")
+    for idx, r in enumerate(rows, 1):
+        tbl.add_row(
+            str(idx),
+            r.name,
+            str(r.count),
+            f"{r.attributed_ms:.0f}",
+            f"{r.attributed_ms / busy * 100:.1f}",
+            str(r.exclusive_ms),
+            str(r.total_ms),
+        )
+
+    hist = _make_table("Concurrency")
+    hist.add_column("steps", justify="right")
+    hist.add_column("ms", justify="right")
+    hist.add_column("%", justify="right")
+    for k, ms in timeline.histogram.items():
+        hist.add_row(str(k), str(ms), f"{ms / busy * 100:.1f}")
+
+    console = get_console()
+    console.print(tbl)
+    console.print(
+        Columns([make_rich_stats_table(timeline_summary(timeline), "Timeline"), hist])
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Фазы HAR (deeptrace har)
+# ─────────────────────────────────────────────────────────────────────────────
+def print_rich_har_breakdown(
+    rows: Sequence[PhaseRow], *, title: str = "HAR timings"
+) -> None:
+    """Сумма фаз запросов (blocked … receive) по хостам или типам ресурсов."""
+    from deeptrace.core.har import PHASES
+
+    tbl = _make_table(title)
+    tbl.add_column("group")
+    tbl.add_column("req", justify="right")
+    tbl.add_column("total", justify="right")
+    for name in PHASES:
+        tbl.add_column(name, justify="right", style="dim")
+    tbl.add_column("dominant")
+    for r in rows:
+        tbl.add_row(
+            r.group,
+            str(r.count),
+            f"{r.total_ms:.0f}",
+            *(f"{r.phases[name]:.0f}" for name in PHASES),
+            r.dominant,
+        )
+    get_console().print(tbl)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Нестабильность шагов (deeptrace variance)
+# ─────────────────────────────────────────────────────────────────────────────
+_SPARK = " ▁▂▃▄▅▆▇█"
+
+
+def _sparkline(counts: Sequence[int]) -> str:
+    top = max(counts, default=0) or 1
+    return "".join(_SPARK[-(-c * (len(_SPARK) - 1) // top)] for c in counts)
+
+
+def print_rich_variance(result: VarianceResult, *, limit: int = 10) -> None:
+    """Шаги с нестабильным временем между прогонами и гистограмма средних."""
+    from deeptrace.core.variance import BIMODAL_SCORE
+
+    runs = result.stats.runs
+    unstable = set(result.unstable)
+    tbl = _make_table(f"Timing variance over {runs} runs")
+    tbl.add_column("#", justify="right", style="dim")
+    tbl.add_column("step")
+    tbl.add_column("runs", justify="right")
+    tbl.add_column("mean", justify="right")
+    tbl.add_column("stddev", justify="right")
+    tbl.add_column("cv", justify="right")
+    tbl.add_column("bimodal", justify="right")
+    tbl.add_column("run means, ms")
+    for idx, (name, st) in enumerate(result.steps[:limit], 1):
+        start, width, counts = st.histogram(16)
+        bimodal = f"{st.bimodality:.2f}"
+        if st.bimodality >= BIMODAL_SCORE:
+            bimodal = f"[bold]{bimodal}[/]"
+        tbl.add_row(
+            str(idx),
+            f"[red]{name}[/]" if name in unstable else name,
+            f"{st.runs}/{runs}",
+            f"{st.mean:.0f}",
+            f"{st.stddev:.0f}",
+            f"{st.cv:.2f}",
+            bimodal,
+            f"{start} [cyan]{_sparkline(counts)}[/] {start + width * len(counts)}",
+        )
+    get_console().print(tbl)
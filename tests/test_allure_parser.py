@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from deeptrace.core.analyzer import self_times
+from deeptrace.core.parsers.allure import AllureParser
+
+
+def _result(uuid: str) -> dict:
+    return {
+        "uuid": uuid,
+        "name": f"test {uuid}",
+        "steps": [
+            {
+                "name": "login",
+                "start": 0,
+                "stop": 100,
+                "steps": [
+                    {"name": "open", "start": 0, "stop": 30},
+                    {
+                        "name": "submit",
+                        "start": 30,
+                        "stop": 90,
+                        "steps": [{"name": "wait", "start": 40, "stop": 80}],
+                    },
+                ],
+            },
+            {"name": "logout", "start": 100, "stop": 110},
+        ],
+    }
+
+
+@pytest.fixture
+def results_dir(tmp_path: Path) -> Path:
+    for uuid in ("a", "b"):
+        (tmp_path / f"{uuid}-result.json").write_text(json.dumps(_result(uuid)))
+    (tmp_path / "c-container.json").write_text("{ not even json")
+    (tmp_path / "d-attachment.json").write_text("{ not even json")
+    (tmp_path / "e-result.json").write_text("{ broken")
+    return tmp_path
+
+
+def test_hierarchy(results_dir: Path) -> None:
+    parser = AllureParser(workers=1)
+    steps = parser.parse(str(results_dir / "a-result.json"))
+    assert [s.name for s in steps] == ["login", "open", "submit", "wait", "logout"]
+    assert [s.depth for s in steps] == [0, 1, 1, 2, 0]
+    assert [s.parent for s in steps] == [-1, 0, 0, 2, -1]
+    assert self_times(steps) == [10, 30, 20, 40, 10]
+
+
+def test_directory_skips_and_reports(results_dir: Path) -> None:
+    parser = AllureParser(workers=1)
+    steps = parser.parse(str(results_dir))
+    assert len(steps) == 10
+    assert [s.parent for s in steps[5:]] == [-1, 5, 5, 7, -1]
+    assert [Path(f).name for f, _ in parser.errors] == ["e-result.json"]
+
+
+def test_parallel_matches_serial(results_dir: Path) -> None:
+    serial = AllureParser(workers=1).parse(str(results_dir))
+    parallel = AllureParser(workers=2)
+    assert parallel.parse(str(results_dir)) == serial
+    assert len(parallel.errors) == 1
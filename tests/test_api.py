@@ -0,0 +1,70 @@
+import asyncio
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from deeptrace import api
+from deeptrace.core.pushdown import StepFilter
+
+
+def test_analyze_returns_results_without_printing(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], caplog: pytest.LogCaptureFixture
+) -> None:
+    results_dir = tmp_path / "allure-results"
+    results_dir.mkdir()
+    (results_dir / "a-result.json").write_text(
+        json.dumps(
+            {"name": "t", "steps": [{"name": "/users/1", "start": 0, "stop": 40}]}
+        )
+    )
+    (results_dir / "b-result.json").write_text("{ broken")
+
+    with caplog.at_level(logging.WARNING, logger="deeptrace"):
+        har, broken, allure = api.analyze(
+            ["examples/selenium_har.har", "examples/broken.json", results_dir], top=1
+        )
+    assert capsys.readouterr() == ("", "")
+    assert any("1 input(s) skipped" in r.getMessage() for r in caplog.records)
+
+    assert har.ok and har.format == "har_generic"
+    assert [(s.name, s.duration) for s in har.slowest] == [
+        ("https://example.com/dashboard", 1500)
+    ]
+    assert har.summary.count == 2 and har.summary.max_ms == 1500
+    assert har.slowest_summary.count == 1
+    assert not broken.ok and broken.format is None
+    assert allure.averages.names == ["/users/{id}"]
+
+
+def test_analyze_options() -> None:
+    (result,) = api.analyze(
+        "examples/selenium_har.har",
+        where=StepFilter(include=("*login",)),
+        percentiles=(50,),
+    )
+    assert result.summary.count == 1 and list(result.summary.percentiles) == [50]
+    with pytest.raises(api.AnalysisError, match="Unknown format"):
+        api.analyze("examples/selenium_har.har", fmt="no_such_format")
+
+
+def test_async_matches_sync() -> None:
+    paths = ["examples/playwright_steps.json", "examples/selenium_har.har"] * 3
+    results = asyncio.run(api.analyze_async(paths, concurrency=2, top=2))
+    assert [r.path for r in results] == [Path(p) for p in paths]
+    assert [r.slowest for r in results] == [
+        r.slowest for r in api.analyze(paths, top=2)
+    ]
+
+
+def test_compare() -> None:
+    log = "examples/playwright_steps.json"
+    result = asyncio.run(api.compare_async(log, [log, log], canon=None))
+    assert result.format == "json_generic"
+    assert {d.status for d in result.diffs} == {"same"}
+    assert result.summary_a.count == result.summary_b.count
+    with pytest.raises(api.AnalysisError, match="Format mismatch"):
+        api.compare(log, "examples/selenium_har.har")
+    with pytest.raises(api.AnalysisError, match="No runs given for B"):
+        api.compare(log, [])
@@ -0,0 +1,112 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from deeptrace import api
+from deeptrace.core import batch
+from deeptrace.core.batch import classify, discover, is_allure_dir
+
+
+def _write_jsonl(path, rows) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        "".join(
+            json.dumps({"name": n, "startTime": 0, "duration": d}) + "\n"
+            for n, d in rows
+        )
+    )
+
+
+def _write_allure(path, steps) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "name": "t",
+                "start": 0,
+                "stop": 1000,
+                "steps": [
+                    {"name": n, "start": 0, "stop": d, "steps": []} for n, d in steps
+                ],
+            }
+        )
+    )
+
+
+@pytest.fixture
+def tree(tmp_path):
+    _write_jsonl(tmp_path / "a" / "one.jsonl", [("open", 10), ("click", 30)])
+    _write_jsonl(tmp_path / "a" / "deep" / "two.jsonl", [("open", 50)])
+    _write_jsonl(tmp_path / ".hidden" / "x.jsonl", [("open", 999)])
+    results = tmp_path / "b" / "allure-results"
+    _write_allure(results / "r1-result.json", [("open", 20)])
+    _write_allure(results / "r2-result.json", [("click", 70)])
+    (results / "c-container.json").write_text("{}")
+    (tmp_path / "b" / "broken.json").write_text('{"steps": [')
+    (tmp_path / "b" / "shot.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+    return tmp_path
+
+
+def test_discover_walks_tree(tree) -> None:
+    found = [p.relative_to(tree).as_posix() for p in discover([tree])]
+    assert found == [
+        "a/one.jsonl",
+        "a/deep/two.jsonl",
+        "b/broken.json",
+        "b/shot.png",
+        "b/allure-results/r1-result.json",
+        "b/allure-results/r2-result.json",
+    ]
+    assert is_allure_dir(tree / "b" / "allure-results")
+    assert not is_allure_dir(tree / "a")
+
+
+def test_discover_globs_and_missing(tree) -> None:
+    missing: list = []
+    found = list(
+        discover(
+            [tree / "a" / "one.jsonl", f"{tree}/**/*.jsonl", tree / "nope"], missing
+        )
+    )
+    assert [p.name for p in found] == ["one.jsonl", "two.jsonl"]
+    assert missing == [str(tree / "nope")]
+
+
+def test_classify_memoized(tree, monkeypatch) -> None:
+    monkeypatch.setattr(batch, "_memo", {})
+    assert classify(tree / "a" / "one.jsonl") == "jsonl"
+    assert classify(tree / "a" / "deep" / "two.jsonl") == "jsonl"
+    assert classify(tree / "b" / "allure-results" / "r1-result.json") == "allure"
+    assert classify(tree / "b" / "shot.png") is None
+    assert len(batch._memo) == 3
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_analyze_batch(tree, jobs) -> None:
+    with ThreadPoolExecutor(jobs) as pool:
+        out = api.analyze_batch(
+            [tree], top=5, rank_by="max", executor=pool if jobs > 1 else None, jobs=jobs
+        )
+    assert out.result.format == "allure, jsonl"
+    assert [(s.name, s.duration) for s in out.result.slowest] == [
+        ("click", 70),
+        ("open", 50),
+    ]
+    by_path = {f.path.name: f for f in out.files}
+    assert by_path["one.jsonl"].steps == 2
+    assert by_path["shot.png"].format is None
+    assert by_path["broken.json"].format is None
+    assert all(f.groups is None for f in out.files)
+    assert [(s.format, s.files, s.steps) for s in out.by_format().values()] == [
+        ("jsonl", 2, 3),
+        ("allure", 2, 2),
+        ("?", 2, 0),
+    ]
+
+
+def test_analyze_batch_errors(tree) -> None:
+    with pytest.raises(api.AnalysisError, match="No such file"):
+        api.analyze_batch([tree / "nope"], jobs=1)
+    with pytest.raises(api.AnalysisError, match="No recognised logs"):
+        api.analyze_batch([tree / "b" / "shot.png"], jobs=1)
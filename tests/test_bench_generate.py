@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.generate import FORMATS, generate
+from deeptrace.core.parsers.parser_manager import autodetect_parser
+
+EXPECTED = {
+    "playwright": "json_generic",
+    "selenium": "json_generic",
+    "har": "har_generic",
+    "allure": "allure",
+}
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_generated_log_is_detected(tmp_path: Path, fmt: str) -> None:
+    path = generate(fmt, tmp_path / fmt, 1234, names=20, depth=4)
+    detected, steps = autodetect_parser(path)
+    assert detected == EXPECTED[fmt]
+    assert len(steps) == 1234
+    assert len({s.name for s in steps}) == 20
+    if fmt == "allure":
+        assert max(s.depth for s in steps) == 3
+
+
+def test_generator_is_deterministic(tmp_path: Path) -> None:
+    a = generate("har", tmp_path / "a.har", 500, seed=7)
+    b = generate("har", tmp_path / "b.har", 500, seed=7)
+    c = generate("har", tmp_path / "c.har", 500, seed=8)
+    assert a.read_bytes() == b.read_bytes() != c.read_bytes()
@@ -0,0 +1,93 @@
+import os
+from pathlib import Path
+
+from deeptrace.core.cache import StepCache
+from deeptrace.core.models import Step, StepTable
+from deeptrace.core.parsers import parser_manager
+from deeptrace.core.parsers.parser_manager import load_steps
+
+
+def _table() -> StepTable:
+    return StepTable.from_steps(
+        [Step("open", 0, 10), Step("ünïcode", 5, 50), Step("open", 60, 65)]
+    )
+
+
+def test_roundtrip(tmp_path: Path) -> None:
+    log = tmp_path / "run.json"
+    log.write_text("{}")
+    cache = StepCache(tmp_path / "cache")
+    assert cache.get(log) is None
+
+    cache.put(log, "json_generic", _table())
+    hit = cache.get(log)
+    assert hit is not None
+    fmt, table = hit
+    assert fmt == "json_generic"
+    assert list(table) == list(_table())
+    assert list(table.nlargest(1)) == [Step("ünïcode", 5, 50)]
+
+
+def test_invalidated_by_change(tmp_path: Path) -> None:
+    log = tmp_path / "run.json"
+    log.write_text("{}")
+    cache = StepCache(tmp_path / "cache")
+    cache.put(log, "json_generic", _table())
+    log.write_text('{"changed": true}')
+    assert cache.get(log) is None
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    cache = StepCache(tmp_path / "cache")
+    logs = []
+    for i in range(3):
+        log = tmp_path / f"run{i}.json"
+        log.write_text(str(i))
+        cache.put(log, "json_generic", _table())
+        logs.append(log)
+    entries = sorted((tmp_path / "cache").iterdir())
+    size = entries[0].stat().st_size
+
+    # run0 is the least recently used once run1/run2 are touched
+    for i, log in enumerate(logs):
+        f = cache._file(log)
+        os.utime(f, (1000 + i, 1000 + i))
+    cache.get(logs[0])
+    cache.max_bytes = size * 2
+    cache.evict()
+    assert cache.get(logs[1]) is None
+    assert cache.get(logs[0]) is not None
+    assert cache.get(logs[2]) is not None
+
+
+def test_load_steps_uses_cache(tmp_path: Path, monkeypatch) -> None:
+    cache = StepCache(tmp_path)
+    log = Path("examples/selenium_har.har")
+    fmt, table = load_steps(log, cache)
+    assert fmt == "har_generic"
+
+    def fail(path):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(parser_manager, "autodetect_parser", fail)
+    assert load_steps(log, cache)[0] == "har_generic"
+    assert list(load_steps(log, cache)[1]) == list(table)
+
+
+def test_parser_version_bump_reparses(tmp_path: Path, monkeypatch) -> None:
+    from deeptrace.core import cache as cache_mod
+
+    cache = StepCache(tmp_path)
+    log = Path("examples/selenium_har.har")
+    # an entry written by parsers v1, which left HAR start_ms at 0
+    monkeypatch.setattr(cache_mod, "PARSERS_VERSION", 1)
+    stale = StepTable.from_steps([Step("https://example.com/login", 0, 700)])
+    cache.put(log, "har_generic", stale)
+    hit = cache.get(log)
+    assert hit is not None and list(hit[1]) == list(stale)
+
+    monkeypatch.undo()
+    fmt, table = load_steps(log, cache)
+    assert fmt == "har_generic"
+    assert len(table) == 2
+    assert min(s.start_ms for s in table) > 0
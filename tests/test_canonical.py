@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from deeptrace.core.analyzer import StreamingAverages
+from deeptrace.core.canonical import Canonicalizer, canonicalize, parse_rule
+from deeptrace.core.models import Step, StepTable
+from deeptrace.core.parsers.parser_manager import load_steps, stream_steps
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("https://api/users/8123/orders/991", "https://api/users/{id}/orders/{id}"),
+        ("/items/5?page=2&sort=asc#top", "/items/{id}"),
+        ("/s/123e4567-e89b-12d3-a456-426614174000/x", "/s/{uuid}/x"),
+        ("/blob/9f86d081884c7d659a2feaa0c55ad015", "/blob/{hash}"),
+        # words, versions and mixed segments stay
+        ("/api/v2/user42/deadbeefdeadbeef", "/api/v2/user42/deadbeefdeadbeef"),
+        ("Click login 3", "Click login 3"),
+        ("Is it ready?", "Is it ready?"),
+        # "/" alone does not make a URL
+        ("Step 1/3", "Step 1/3"),
+        ("Run A/B test? expect variant", "Run A/B test? expect variant"),
+        ("Open dialog/settings #2", "Open dialog/settings #2"),
+        # only the URL-like word is templated
+        ("GET api/users/7?x=1 200", "GET api/users/{id} 200"),
+        ("click https://shop/p/42#reviews now", "click https://shop/p/{id} now"),
+        ("Wait for /orders/991 (retry 1/3)", "Wait for /orders/{id} (retry 1/3)"),
+    ],
+)
+def test_default_templates(raw: str, expected: str) -> None:
+    assert Canonicalizer()(raw) == expected
+
+
+def test_rules_run_first_and_results_are_memoised() -> None:
+    canon = Canonicalizer([r"^Open (\w+) #\d+$=Open \1"])
+    assert canon("Open cart #17") == "Open cart"
+    assert canon("Open cart #18") is canon("Open cart #17")
+    assert canon._memo.cache_info().hits == 1
+    assert canon("GET /a?token=abc==") == "GET /a"
+    assert Canonicalizer([r"(?<=token=)\w+=*=***"])("token=abc==") == "token=***"
+    assert not Canonicalizer(templates=False)
+    assert Canonicalizer(templates=False)("/a/1") == "/a/1"
+
+
+@pytest.mark.parametrize("rule", ["no-separator", "=x", "(unclosed=x"])
+def test_bad_rules(rule: str) -> None:
+    with pytest.raises(ValueError):
+        parse_rule(rule)
+
+
+def test_rename_merges_names() -> None:
+    steps = [Step("/u/1", 0, 10), Step("/u/2", 0, 30), Step("home", 5, 6, 1, 0)]
+    table = StepTable.from_steps(steps).rename(Canonicalizer())
+    assert table.names == ["/u/{id}", "home"]
+    assert list(table.name_ids) == [0, 0, 1]
+    assert [s.name for s in canonicalize(steps, Canonicalizer())] == [
+        "/u/{id}",
+        "/u/{id}",
+        "home",
+    ]
+    assert canonicalize(steps, Canonicalizer())[2].parent == 0
+
+
+def test_loaders_apply_canon(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    log.write_text(
+        "".join(
+            f'{{"name": "/users/{i}?x={i}", "startTime": 0, "duration": {i}}}\n'
+            for i in range(1, 5)
+        ),
+        "utf-8",
+    )
+    fmt, table = load_steps(log, canon=Canonicalizer())
+    assert fmt == "jsonl"
+    assert table.names == ["/users/{id}"] and len(table) == 4
+
+    sink = StreamingAverages()
+    assert stream_steps(log, sink, canon=Canonicalizer()) == "jsonl"
+    assert [(s.name, s.duration) for s in sink.table()] == [("/users/{id}", 2)]
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from deeptrace.core import comparison, models
+from deeptrace.core.comparison import compare_runs, mann_whitney
+from deeptrace.core.models import Step, StepTable
+
+
+def _run(seed: int, slow: float = 1.0) -> StepTable:
+    rnd = random.Random(seed)
+    steps = []
+    for i in range(300):
+        name = f"step-{i % 6}"
+        factor = slow if name == "step-0" else 1.0
+        steps.append(Step(name, 0, int(rnd.gauss(200, 20) * factor)))
+    if seed % 2:
+        steps.append(Step("only-odd", 0, 5))
+    return StepTable.from_steps(steps)
+
+
+def test_mann_whitney_known_values() -> None:
+    # all of y above all of x: delta = +1, clearly significant
+    p, delta = mann_whitney(list(range(20)), list(range(100, 120)))
+    assert delta == 1.0
+    assert p < 1e-6
+    p, delta = mann_whitney([1, 2, 3], [1, 2, 3])
+    assert delta == 0.0
+    assert p == 1.0
+
+
+def test_flags_regression_first() -> None:
+    base = [_run(s) for s in (2, 4, 6)]
+    cand = [_run(s, slow=1.5) for s in (8, 10, 1)]
+    rows = compare_runs(base, cand)
+    assert rows[0].name == "step-0"
+    assert rows[0].status == "slower"
+    assert rows[0].effect is not None and rows[0].effect > 0.9
+    assert {r.status for r in rows[1:-1]} <= {"same", "faster", "slower"}
+    assert rows[-1].name == "only-odd" and rows[-1].status == "new"
+
+
+def test_numpy_matches_python(monkeypatch: pytest.MonkeyPatch) -> None:
+    if models.np is None:
+        pytest.skip("numpy is not installed")
+    base = [_run(s) for s in (1, 2)]
+    cand = [_run(s, slow=1.1) for s in (3, 4)]
+    fast = {r.name: r for r in comparison._rows_numpy(base, cand)}
+    slow = {r.name: r for r in comparison._rows_python(base, cand)}
+    assert fast.keys() == slow.keys()
+    for name, r in slow.items():
+        f = fast[name]
+        assert (f.n_a, f.n_b, f.avg_a, f.avg_b) == (r.n_a, r.n_b, r.avg_a, r.avg_b)
+        if r.effect is not None:
+            assert f.effect == pytest.approx(r.effect)
+            assert f.p_value == pytest.approx(r.p_value)
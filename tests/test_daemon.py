@@ -0,0 +1,176 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from deeptrace import api
+from deeptrace.core.cache import MemoryCache
+from deeptrace.core.canonical import Canonicalizer
+from deeptrace.core.models import StepTable
+from deeptrace.daemon import connect, serve
+
+
+def _write_log(path, rows) -> None:
+    path.write_text(
+        "".join(
+            json.dumps({"name": n, "startTime": 0, "duration": d}) + "\n"
+            for n, d in rows
+        )
+    )
+
+
+def test_memory_cache_lru_and_mtime(tmp_path) -> None:
+    logs = []
+    for k in range(3):
+        logs.append(tmp_path / f"{k}.jsonl")
+        logs[-1].write_text("{}\n")
+    table = StepTable()
+    for i in range(100):
+        table.append(f"step-{i}", 0, i)
+    cache = MemoryCache(max_bytes=int(2.5 * 100 * (20 + 49 + 7)))
+    for log in logs:
+        cache.put(log, "jsonl", table)
+    assert len(cache) == 2 and cache.get(logs[0]) is None
+    assert cache.get(logs[2]) == ("jsonl", table)
+
+    os.utime(logs[2], ns=(0, 0))
+    assert cache.get(logs[2]) is None
+
+
+def test_memory_cache_keeps_renamed_tables(tmp_path) -> None:
+    log = tmp_path / "run.jsonl"
+    _write_log(log, [("GET /item/1", 10), ("GET /item/2", 20)])
+    cache = MemoryCache()
+    canon = Canonicalizer()
+    (first,) = api.analyze(log, cache=cache, canon=canon)
+    hit = cache.get_renamed(log, canon)
+    assert hit is not None and hit[1].names == ["GET /item/{id}"]
+    again = cache.get_renamed(log, canon)
+    assert again is not None and again[1] is hit[1]
+    (second,) = api.analyze(log, cache=cache, canon=canon)
+    assert second.slowest == first.slowest
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    address = str(tmp_path / "d.sock")
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(serve(address, MemoryCache()))
+
+    def run() -> None:
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not os.path.exists(address) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    yield address
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(5)
+    loop.close()
+    assert not os.path.exists(address)
+
+
+def test_forwarded_queries_match_local(tmp_path, daemon) -> None:
+    a, b = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    _write_log(a, [("GET /item/1", 10), ("GET /item/2", 30), ("login", 500)] * 5)
+    _write_log(b, [("GET /item/3", 90), ("login", 400)] * 5)
+
+    assert os.stat(daemon).st_mode & 0o777 == 0o600
+    client = connect(daemon)
+    assert client is not None
+    with client:
+        for options in ({}, {"rank_by": "p95", "top": 1}, {"canon": None}):
+            (remote,) = client.analyze(a, **options)
+            (local,) = api.analyze(a, **options)
+            assert (remote.format, remote.slowest) == (local.format, local.slowest)
+            assert remote.summary == local.summary
+            assert list(remote.averages) == list(local.averages)
+        assert remote.groups is None
+        (remote,) = client.analyze(a, rank_by="max", top=1)
+        assert remote.groups is not None and remote.groups.groups["login"].max == 500
+
+        remote_cmp = client.compare(a, b)
+        local_cmp = api.compare(a, b, jobs=1)
+        assert remote_cmp.diffs == local_cmp.diffs
+        assert remote_cmp.summary_a == local_cmp.summary_a
+
+        with pytest.raises(api.AnalysisError, match="Unknown format"):
+            client.analyze(a, fmt="bogus")
+        stats = client.stats()
+    assert stats["queries"] == 5 and stats["hits"] > 0
+
+
+def test_cache_options_are_not_forwarded(tmp_path, daemon, monkeypatch) -> None:
+    from typer.testing import CliRunner
+
+    from deeptrace.cli import app
+
+    log = tmp_path / "a.jsonl"
+    _write_log(log, [("login", 500)])
+    monkeypatch.setenv("DEEPTRACE_DAEMON", daemon)
+    runner = CliRunner()
+    for options in (["--no-cache"], ["--cache-dir", str(tmp_path / "c")]):
+        for argv in (["analyze", str(log)], ["compare", str(log), str(log)]):
+            assert runner.invoke(app, argv + options).exit_code == 0
+    assert (tmp_path / "c").is_dir()
+    client = connect(daemon)
+    assert client is not None
+    with client:
+        assert client.stats()["queries"] == 0
+
+
+def test_connect_without_daemon(tmp_path, monkeypatch) -> None:
+    assert connect(str(tmp_path / "missing.sock")) is None
+    monkeypatch.setenv("DEEPTRACE_DAEMON", "off")
+    assert connect() is None
+
+
+@pytest.mark.parametrize("address", ["0.0.0.0:8765", "[::]:8765", "example.com:8765"])
+def test_serve_refuses_non_loopback(address) -> None:
+    with pytest.raises(OSError, match="loopback"):
+        asyncio.run(serve(address, MemoryCache()))
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        b"HTTP/1.1 400 Bad Request\r\n",
+        b"[1, 2]\n",
+        b'{"ok": true}\n',
+        b'{"ok": true, "result": [{}]}\n',
+    ],
+)
+def test_foreign_server_is_a_daemon_error(tmp_path, reply) -> None:
+    import socket
+
+    from deeptrace.daemon import DaemonError
+
+    address = str(tmp_path / "other.sock")
+    listener = socket.socket(socket.AF_UNIX)
+    listener.bind(address)
+    listener.listen(1)
+
+    def answer() -> None:
+        conn, _ = listener.accept()
+        with conn:
+            conn.recv(65536)
+            conn.sendall(reply)
+
+    thread = threading.Thread(target=answer, daemon=True)
+    thread.start()
+    try:
+        client = connect(address)
+        assert client is not None
+        with client, pytest.raises(DaemonError, match="unexpected response"):
+            client.analyze(tmp_path / "run.jsonl")
+    finally:
+        thread.join(5)
+        listener.close()
@@ -0,0 +1,70 @@
+import random
+import statistics
+
+import pytest
+
+from deeptrace import api
+from deeptrace.core.groupby import GroupBy, StepStats
+from deeptrace.core.models import NUMPY_MIN_ROWS, Step, StepTable
+
+
+def _steps(n: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    return [Step(f"s{rnd.randrange(5)}", 0, rnd.randrange(1, 500)) for _ in range(n)]
+
+
+def test_welford_matches_statistics() -> None:
+    values = [50] * 99 + [30_000]
+    stats = StepStats()
+    for v in values:
+        stats.add(v)
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+    assert (stats.min, stats.max, stats.total) == (50, 30_000, sum(values))
+    # the tail an average hides
+    assert stats.percentile(50) == pytest.approx(50, rel=0.01)
+    assert stats.percentile(100) == 30_000
+
+
+def test_merge_equals_single_pass() -> None:
+    steps = _steps(2000)
+    whole = GroupBy().update(steps)
+    parts = GroupBy().update(steps[:700]).merge(GroupBy().update(steps[700:]))
+    assert parts.count == whole.count == 2000
+    for name, stats in whole.groups.items():
+        other = parts.groups[name]
+        assert other.count == stats.count
+        assert other.mean == pytest.approx(stats.mean)
+        assert other.variance == pytest.approx(stats.variance)
+        assert other.percentile(95) == stats.percentile(95)
+
+
+def test_numpy_batches_match_appends() -> None:
+    pytest.importorskip("numpy")
+    steps = _steps(NUMPY_MIN_ROWS * 2, seed=3)
+    batched = GroupBy("p95").update(StepTable.from_steps(steps))
+    appended = GroupBy("p95").update(steps)
+    assert sorted(batched.groups) == sorted(appended.groups)
+    for name, stats in appended.groups.items():
+        assert batched.groups[name].variance == pytest.approx(stats.variance)
+        assert batched.groups[name].sketch.bins == stats.sketch.bins
+    assert [n for n, _ in batched.ranked()] == [n for n, _ in appended.ranked()]
+
+
+def test_rank_by(tmp_path) -> None:
+    log = tmp_path / "run.jsonl"
+    rows = [("steady", 100)] * 20 + [("spiky", 50)] * 19 + [("spiky", 30_000)]
+    log.write_text(
+        "".join(
+            f'{{"name": "{n}", "startTime": 0, "duration": {d}}}\n' for n, d in rows
+        )
+    )
+    (by_avg,) = api.analyze(log, top=1, rank_by="avg")
+    (by_max,) = api.analyze(log, top=1, rank_by="max")
+    (by_p50,) = api.analyze(log, top=1, rank_by="p50")
+    assert by_avg.groups is None and by_max.groups is not None
+    assert [(s.name, s.duration) for s in by_max.slowest] == [("spiky", 30_000)]
+    assert by_p50.slowest[0].name == "steady"
+    assert by_avg.slowest[0].name == "spiky"  # 1547 ms on average
+    with pytest.raises(api.AnalysisError, match="Unknown rank key"):
+        api.analyze(log, rank_by="median")
@@ -0,0 +1,105 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from deeptrace.core.har import phase_breakdown, phase_durations, resource_type
+from deeptrace.core.parsers.har_generic import HarParser, HarPhasesParser
+from deeptrace.core.parsers.parser_manager import parse_as
+from deeptrace.core.timestamps import iso_to_ms
+
+
+def _entry(url: str, started: str, mime: str = "text/html", **timings: float) -> dict:
+    return {
+        "startedDateTime": started,
+        "time": sum(v for k, v in timings.items() if k != "ssl" and v > 0),
+        "request": {"url": url},
+        "response": {"content": {"mimeType": mime}},
+        "timings": timings,
+    }
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2024-05-15T13:00:00Z",
+        "2024-05-15T13:00:00.123Z",
+        "2024-05-15T13:00:00.5+03:00",
+        "2024-05-15T13:00:00.123456-0530",
+        "2024-05-15 13:00:00+02",
+        "2024-12-31T23:59:59.999+00:00",
+    ],
+)
+def test_iso_to_ms_matches_datetime(value: str) -> None:
+    expected = datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    assert iso_to_ms(value) == int(expected * 1000)
+
+
+def test_iso_to_ms_naive_fallback_and_garbage() -> None:
+    assert iso_to_ms("2024-05-15T13:00:00") == iso_to_ms("2024-05-15T13:00:00Z")
+    assert iso_to_ms("2024-05-15") == iso_to_ms("2024-05-15T00:00:00Z")
+    assert iso_to_ms("2024-13-45T99:00:00Z") is None
+    assert iso_to_ms("yesterday") is None
+    assert iso_to_ms("") is None
+
+
+def test_har_start_honours_utc_offset() -> None:
+    utc = HarParser._entry_to_step(_entry("http://a/", "2024-05-15T13:00:00.000Z"))
+    msk = HarParser._entry_to_step(_entry("http://a/", "2024-05-15T16:00:00.000+03:00"))
+    assert utc.start_ms == msk.start_ms
+
+
+def test_phase_durations_take_ssl_out_of_connect() -> None:
+    entry = _entry("https://a/", "", blocked=-1, dns=5, connect=30, ssl=20, wait=40)
+    assert dict(phase_durations(entry)) == {
+        "blocked": 0.0,
+        "dns": 5.0,
+        "connect": 10.0,
+        "ssl": 20.0,
+        "send": 0.0,
+        "wait": 40.0,
+        "receive": 0.0,
+    }
+
+
+def test_phases_become_child_steps(tmp_path: Path) -> None:
+    entry = _entry(
+        "https://a/x", "2024-05-15T13:00:00Z", dns=5, connect=30, ssl=20, wait=40
+    )
+    log = tmp_path / "run.har"
+    log.write_text(json.dumps({"log": {"entries": [entry]}}), "utf-8")
+    assert len(HarParser().parse(str(log))) == 1
+
+    steps = HarPhasesParser().parse(str(log))
+    assert [s.name for s in steps] == ["https://a/x", "dns", "connect", "ssl", "wait"]
+    assert all(s.parent == 0 for s in steps[1:])
+    start = steps[0].start_ms
+    assert [(s.start_ms - start, s.end_ms - start) for s in steps[1:]] == [
+        (0, 5),
+        (5, 15),
+        (15, 35),
+        (35, 75),
+    ]
+    assert parse_as(log, "har_phases") == steps
+
+
+def test_breakdown_by_host_and_type() -> None:
+    entries = [
+        _entry("https://a.com/", "", wait=100, receive=10),
+        _entry("https://a.com/app.js", "", "application/javascript", wait=20),
+        _entry("https://cdn.b/logo.png", "", "image/png", dns=50, receive=5),
+    ]
+    rows = phase_breakdown(entries, "host")
+    assert [(r.group, r.count, r.total_ms) for r in rows] == [
+        ("a.com", 2, 130.0),
+        ("cdn.b", 1, 55.0),
+    ]
+    assert rows[0].dominant == "wait"
+    assert rows[1].dominant == "dns"
+    assert [r.group for r in phase_breakdown(entries, "type")] == [
+        "document",
+        "image",
+        "script",
+    ]
+    assert resource_type({"_resourceType": "XHR"}) == "xhr"
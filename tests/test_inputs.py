@@ -0,0 +1,47 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from typing import IO, Any, Callable, Dict
+
+import pytest
+
+from deeptrace.core.inputs import compression, logical_suffix, read_input
+from deeptrace.core.parsers.parser_manager import autodetect_parser
+from deeptrace.core.sniff import read_head
+
+OPENERS: Dict[str, Callable[..., IO[Any]]] = {
+    "gz": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+
+@pytest.mark.parametrize("ext, kind", [("gz", "gzip"), ("bz2", "bz2"), ("xz", "xz")])
+def test_compressed_har_is_detected(tmp_path: Path, ext: str, kind: str) -> None:
+    raw = Path("examples/selenium_har.har").read_bytes()
+    path = tmp_path / f"run.har.{ext}"
+    with OPENERS[ext](path, "wb") as fh:
+        fh.write(raw)
+
+    assert compression(path) == kind
+    assert read_input(path) == raw
+    assert read_head(path, 16) == raw[:16]
+    fmt, steps = autodetect_parser(path)
+    assert fmt == "har_generic"
+    assert len(steps) == 2
+
+
+def test_compression_is_sniffed_not_named(tmp_path: Path) -> None:
+    path = tmp_path / "run.json"
+    with gzip.open(path, "wb") as fh:
+        fh.write(Path("examples/playwright_actions.json").read_bytes())
+    assert compression(path) == "gzip"
+    assert autodetect_parser(path)[0] == "json_generic"
+    assert compression(Path("examples/playwright_actions.json")) is None
+
+
+def test_logical_suffix() -> None:
+    assert logical_suffix(Path("run.JSONL.gz")) == ".jsonl"
+    assert logical_suffix(Path("run.har.xz")) == ".har"
+    assert logical_suffix(Path("trace.zip")) == ".zip"
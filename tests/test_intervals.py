@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from deeptrace.core.intervals import contributions, leaf_steps, sweep
+from deeptrace.core.models import Step
+
+
+def test_sweep_overlapping_requests() -> None:
+    # a: 0-100, b: 50-150 overlaps a, c: 200-250 after an idle gap
+    tl = sweep([0, 50, 200], [100, 150, 250])
+    assert tl.span_ms == 250
+    assert tl.coverage_ms == 200
+    assert tl.idle_ms == 50
+    assert tl.gaps == [(150, 200)]
+    assert tl.histogram == {1: 150, 2: 50}
+    assert tl.max_concurrency == 2
+    assert tl.avg_concurrency == pytest.approx(250 / 200)
+    assert tl.attributed == pytest.approx([75, 75, 50])
+    assert tl.exclusive == [50, 50, 50]
+
+
+def test_touching_and_empty_steps() -> None:
+    tl = sweep([0, 10, 10, 30, 35], [10, 20, 5, 40, 35])
+    assert tl.max_concurrency == 1
+    assert tl.gaps == [(20, 30)]
+    assert tl.exclusive == [10, 10, 0, 10, 0]
+
+
+def test_sweep_matches_brute_force() -> None:
+    rng = random.Random(3)
+    starts = [rng.randrange(500) for _ in range(60)]
+    ends = [s + rng.randrange(80) for s in starts]
+    tl = sweep(starts, ends)
+
+    attributed = [0.0] * len(starts)
+    exclusive = [0] * len(starts)
+    covered = 0
+    for t in range(min(starts), max(ends)):
+        active = [i for i, (s, e) in enumerate(zip(starts, ends)) if s <= t < e]
+        covered += bool(active)
+        for i in active:
+            attributed[i] += 1 / len(active)
+            exclusive[i] += len(active) == 1
+    assert tl.coverage_ms == covered
+    assert tl.attributed == pytest.approx(attributed)
+    assert tl.exclusive == exclusive
+    assert sum(tl.attributed) == pytest.approx(tl.coverage_ms)
+
+
+def test_contributions_rank_by_wall_clock_share() -> None:
+    steps = [
+        Step("poll", 0, 1000),  # long, but always in parallel with something
+        Step("load", 0, 600),
+        Step("render", 600, 1000),
+        Step("save", 1000, 1300),
+    ]
+    rows, timeline = contributions(steps)
+    assert [r.name for r in rows] == ["poll", "save", "load", "render"]
+    assert rows[0].total_ms == 1000 and rows[0].exclusive_ms == 0
+    assert timeline.coverage_ms == 1300
+
+
+def test_leaf_steps_drop_parents() -> None:
+    steps = [Step("test", 0, 100), Step("a", 0, 40, 1, 0), Step("b", 40, 100, 1, 0)]
+    assert [s.name for s in leaf_steps(steps)] == ["a", "b"]
+    assert leaf_steps(steps[:1]) == steps[:1]
@@ -0,0 +1,79 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from deeptrace import api
+from deeptrace.core.cache import StepCache
+from deeptrace.core.jsonstream import iter_json_array
+from deeptrace.core.parsers.json_generic import JSONGenericParser
+
+EXAMPLES = sorted(p for p in Path("examples").glob("*.json") if p.name != "broken.json")
+
+
+@pytest.mark.parametrize("path", EXAMPLES, ids=lambda p: p.name)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_iter_steps_matches_parse(path: Path, chunk_size: int) -> None:
+    parser = JSONGenericParser()
+    streamed = list(parser.iter_steps(str(path), chunk_size=chunk_size))
+    assert streamed == parser.parse(str(path))
+
+
+def test_iter_steps_broken() -> None:
+    with pytest.raises(ValueError):
+        list(JSONGenericParser().iter_steps("examples/broken.json"))
+
+
+def test_iter_json_array_skips_other_keys() -> None:
+    doc = {
+        "meta": {"nested": [1, 2, {"a": "b"}]},
+        "count": 12345,
+        "events": [{"name": "ü" * 3, "n": 1.5e3}, {"name": "x"}],
+        "tail": None,
+    }
+    fh = io.BytesIO(json.dumps(doc, ensure_ascii=False).encode("utf-8"))
+    items = list(iter_json_array(fh, ("events",), chunk_size=3))
+    assert items == doc["events"]
+
+
+def test_iter_json_array_no_events() -> None:
+    fh = io.BytesIO(b'{"other": [1, 2]}')
+    with pytest.raises(ValueError):
+        list(iter_json_array(fh, ("events",)))
+
+
+class _Pipe(io.BytesIO):
+    def seekable(self) -> bool:
+        return False
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+@pytest.mark.parametrize("stream", [io.BytesIO, _Pipe])
+def test_iter_json_array_follows_key_order(chunk_size, stream) -> None:
+    keys = ("actions", "events", "steps")
+    docs = [
+        ({"steps": [1], "events": [2], "actions": [3]}, [3]),
+        ({"steps": [1], "events": [2], "meta": "actions"}, [2]),
+        ({"actions": {}, "steps": [1], "events": [2]}, [2]),
+        ({"events": [{"name": "steps"}], "steps": [1]}, [{"name": "steps"}]),
+    ]
+    for doc, expected in docs:
+        fh = stream(json.dumps(doc).encode())
+        assert list(iter_json_array(fh, keys, chunk_size)) == expected
+
+
+def test_stream_and_cached_analysis_agree(tmp_path) -> None:
+    log = tmp_path / "run.json"
+    log.write_text(
+        json.dumps(
+            {
+                "steps": [{"name": "s1", "startTime": 0, "endTime": 100}],
+                "actions": [{"name": "a1", "startTime": 0, "endTime": 5000}],
+            }
+        )
+    )
+    (cached,) = api.analyze(log, cache=StepCache(tmp_path / "cache"))
+    (streamed,) = api.analyze(log, cache=None)
+    assert [(s.name, s.duration) for s in streamed.slowest] == [("a1", 5000)]
+    assert streamed.slowest == cached.slowest
@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from deeptrace.core.parsers.jsonl import JSONLParser, line_to_step
+from deeptrace.core.parsers.parser_manager import autodetect_parser, load_steps
+
+
+def _write_events(path: Path, n: int) -> list:
+    events = [
+        {"name": f"step-{i % 7}", "startTime": i * 10, "duration": i % 50}
+        for i in range(n)
+    ]
+    path.write_text("\n".join(json.dumps(e) for e in events) + "\n", "utf-8")
+    return events
+
+
+def test_parse_matches_field_rules(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    events = _write_events(log, 20)
+    steps = JSONLParser().parse(str(log))
+    assert [(s.name, s.start_ms, s.end_ms) for s in steps] == [
+        (e["name"], e["startTime"], e["startTime"] + e["duration"]) for e in events
+    ]
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 7, 64, 1 << 20])
+def test_chunking_does_not_change_result(tmp_path: Path, chunk_bytes: int) -> None:
+    log = tmp_path / "run.jsonl"
+    _write_events(log, 300)
+    expected = JSONLParser().parse(str(log))
+    assert JSONLParser(chunk_bytes=chunk_bytes).parse(str(log)) == expected
+
+
+def test_parallel_matches_serial(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    _write_events(log, 2000)
+    serial = JSONLParser(workers=1, chunk_bytes=4096).parse_table(str(log))
+    parallel = JSONLParser(workers=2, chunk_bytes=4096).parse_table(str(log))
+    assert list(parallel) == list(serial)
+    assert parallel.names == serial.names
+
+
+def test_bad_lines_are_reported(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    log.write_bytes(
+        b'{"name": "a", "duration": 5}\nnot json\n[1]\n'
+        b'{"name": "x"} trailing\n{"name": \n{"name": "b"}'
+    )
+    parser = JSONLParser()
+    assert [s.name for s in parser.parse(str(log))] == ["a", "b"]
+    assert [where for where, _ in parser.errors] == [f"{log}:{n}" for n in (2, 3, 4, 5)]
+
+
+def test_event_array_one_per_line(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    log.write_text('[\n  {"name": "a"},\n  {"name": "b"}\n]\n', "utf-8")
+    parser = JSONLParser()
+    assert [s.name for s in parser.parse(str(log))] == ["a", "b"]
+    assert parser.errors == []
+
+
+def test_garbage_is_rejected(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    log.write_text("hello\nworld\n", "utf-8")
+    with pytest.raises(ValueError):
+        JSONLParser().parse(str(log))
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".ndjson", ".log", ".json"])
+def test_autodetect(tmp_path: Path, suffix: str) -> None:
+    log = tmp_path / f"run{suffix}"
+    _write_events(log, 10)
+    fmt, steps = autodetect_parser(log)
+    assert fmt == "jsonl"
+    assert len(steps) == 10
+
+
+def test_load_steps_keeps_columns(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    _write_events(log, 10)
+    fmt, table = load_steps(log)
+    assert fmt == "jsonl"
+    assert table.names == [f"step-{i}" for i in range(7)]
+
+
+def test_line_to_step() -> None:
+    assert line_to_step(b"") is None
+    step = line_to_step(b'{"event": "click", "timestamp": 3, "endTime": 9},')
+    assert step is not None
+    assert (step.name, step.duration) == ("click", 6)
+    with pytest.raises(ValueError):
+        line_to_step(b'"just a string"')
@@ -0,0 +1,109 @@
+import heapq
+import random
+from statistics import mean, median
+
+import pytest
+
+from deeptrace.core import analyzer, models
+from deeptrace.core.analyzer import LiveAnalysis, deduplicate_avg
+from deeptrace.core.models import Step, StepTable
+from deeptrace.utils import _perc, get_stats
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "numpy":
+        if models.np is None:
+            pytest.skip("numpy is not installed")
+        monkeypatch.setattr(models, "NUMPY_MIN_ROWS", 0)
+        monkeypatch.setattr(analyzer, "NUMPY_MIN_ROWS", 0)
+    else:
+        monkeypatch.setattr(models, "np", None)
+        monkeypatch.setattr(analyzer, "np", None)
+    return request.param
+
+
+def _random_steps(n: int = 500) -> list:
+    rnd = random.Random(42)
+    out = []
+    for _ in range(n):
+        start = rnd.randrange(0, 10_000)
+        out.append(
+            Step(f"step-{rnd.randrange(40)}", start, start + rnd.randrange(-5, 300))
+        )
+    return out
+
+
+def test_table_roundtrip() -> None:
+    steps = _random_steps()
+    table = StepTable.from_steps(steps)
+    assert len(table) == len(steps)
+    assert list(table) == steps
+    assert table[3] == steps[3]
+    assert len(table.names) == len({s.name for s in steps})
+
+
+def test_filter_and_nlargest_match_list_pipeline(backend: str) -> None:
+    steps = _random_steps()
+    table = StepTable.from_steps(steps)
+
+    kept = [s for s in steps if s.duration >= 150]
+    assert list(table.filter_min_duration(150)) == kept
+    for n in (0, 1, 7, len(steps) + 1):
+        expected = heapq.nlargest(n, steps, key=lambda s: s.duration)
+        assert list(table.nlargest(n)) == expected
+    assert list(table.sort_by_duration()) == sorted(
+        steps, key=lambda s: s.duration, reverse=True
+    )
+
+
+def test_deduplicate_avg(backend: str) -> None:
+    steps = _random_steps()
+    bucket: dict = {}
+    for s in steps:
+        bucket.setdefault(s.name, []).append(s.duration)
+    expected = [Step(n, 0, int(sum(d) / len(d))) for n, d in bucket.items()]
+    assert list(deduplicate_avg(steps)) == expected
+
+
+def test_get_stats_matches_statistics(backend: str) -> None:
+    steps = _random_steps(501)
+    vals = sorted(s.duration for s in steps)
+    expected = [
+        ("Total steps", str(len(vals))),
+        ("Min", f"{vals[0]} ms"),
+        ("Max", f"{vals[-1]} ms"),
+        ("Median (p50)", f"{int(median(vals))} ms"),
+        ("Avg", f"{mean(vals):.1f} ms"),
+        ("P90", f"{_perc(vals, 90)} ms"),
+    ]
+    assert get_stats(steps, (90,)) == expected
+    assert get_stats(StepTable.from_steps(steps), (90,)) == expected
+    assert get_stats(StepTable()) == [("Total steps", "0")]
+
+
+def test_live_analysis_matches_batch() -> None:
+    steps = _random_steps(2000)
+    live = LiveAnalysis(top=7, threshold=50)
+    live.update(steps)
+
+    kept = [s for s in steps if s.duration >= 50]
+    expected = heapq.nlargest(7, kept, key=lambda s: s.duration)
+    assert [(s.name, s.duration) for s in live.slowest()] == [
+        (s.name, s.duration) for s in expected
+    ]
+    assert live.seen == len(steps)
+    assert live.sketch.count == len(kept)
+    name = expected[0].name
+    same = [s.duration for s in kept if s.name == name]
+    assert live.average(name) == int(sum(same) / len(same))
+
+
+def test_concat_reinterns_names(backend: str) -> None:
+    first = _random_steps(300)
+    second = list(reversed(_random_steps(200)))
+    table = StepTable.concat(
+        [StepTable.from_steps(first), StepTable.from_steps(second)]
+    )
+    assert list(table) == [Step(s.name, s.start_ms, s.end_ms) for s in first + second]
+    assert len(table.names) == len(set(table.names))
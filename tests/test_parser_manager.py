@@ -0,0 +1,134 @@
+import json
+import pkgutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from deeptrace.core import registry
+from deeptrace.core.models import Step
+from deeptrace.core.parsers.parser_manager import autodetect_parser, parse_as
+
+
+@pytest.mark.parametrize(
+    "name, fmt",
+    [
+        ("playwright_actions.json", "json_generic"),
+        ("playwright_array.json", "json_generic"),
+        ("playwright_steps.json", "json_generic"),
+        ("selenium_array.json", "json_generic"),
+        ("selenium_entries.json", "json_generic"),
+        ("selenium_har.har", "har_generic"),
+    ],
+)
+def test_autodetect_examples(name: str, fmt: str) -> None:
+    detected, steps = autodetect_parser(Path("examples") / name)
+    assert detected == fmt
+    assert len(steps) == 2
+
+
+def test_autodetect_broken() -> None:
+    assert autodetect_parser(Path("examples/broken.json")) == (None, [])
+
+
+def test_autodetect_decodes_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+    real_loads = json.loads
+
+    def counting_loads(*args, **kwargs):
+        calls.append(1)
+        return real_loads(*args, **kwargs)
+
+    monkeypatch.setattr(json, "loads", counting_loads)
+    fmt, _ = autodetect_parser(Path("examples/selenium_har.har"))
+    assert fmt == "har_generic"
+    assert len(calls) == 1
+
+
+def test_autodetect_allure_directory(tmp_path: Path) -> None:
+    result = {
+        "uuid": "1",
+        "name": "login",
+        "steps": [
+            {"name": "open", "start": 0, "stop": 10},
+            {"name": "submit", "start": 10, "stop": 30},
+        ],
+    }
+    (tmp_path / "1-result.json").write_text(json.dumps(result), encoding="utf-8")
+    fmt, steps = autodetect_parser(tmp_path)
+    assert fmt == "allure"
+    assert [s.name for s in steps] == ["open", "submit"]
+
+
+def _imported_after(code: str) -> set:
+    script = f"import sys\n{code}\nprint('\\n'.join(sys.modules))"
+    out = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    return set(out.split())
+
+
+def test_only_hinted_parser_is_imported() -> None:
+    modules = _imported_after(
+        "from pathlib import Path\n"
+        "from deeptrace.core.parsers.parser_manager import autodetect_parser\n"
+        "assert autodetect_parser(Path('examples/selenium_har.har'))[0] == 'har_generic'"
+    )
+    assert "deeptrace.core.parsers.har_generic" in modules
+    assert "deeptrace.core.parsers.allure" not in modules
+    assert "deeptrace.core.parsers.json_generic" not in modules
+
+
+def test_cli_import_is_lightweight() -> None:
+    modules = _imported_after("import deeptrace.cli")
+    heavy = {"numpy", "sqlite3", "deeptrace.core.models", "deeptrace.utils"}
+    assert not heavy & modules
+    assert not [m for m in modules if m.startswith("deeptrace.core.parsers")]
+
+
+def test_manifest_lists_every_builtin_parser() -> None:
+    import deeptrace.core.parsers as package
+
+    modules = {
+        spec.target.partition(":")[0].rsplit(".", 1)[-1]
+        for spec in registry.BUILTIN_PARSERS
+    }
+    found = {name for _, name, _ in pkgutil.iter_modules(package.__path__)}
+    assert found - {"parser_manager"} == modules
+
+
+def test_entry_point_parser_loaded_on_demand(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / "dt_plugin_fmt.py").write_text(
+        "import json\n"
+        "from deeptrace.core.models import Step\n"
+        "class TimingsParser:\n"
+        "    def probe(self, path, head):\n"
+        "        return 1.0 if path.suffix == '.timings' else 0.0\n"
+        "    def parse_document(self, data, path):\n"
+        "        return [Step(k, 0, v) for k, v in data['timings'].items()]\n"
+        "    def parse(self, path):\n"
+        "        with open(path) as fh:\n"
+        "            return self.parse_document(json.load(fh), path)\n",
+        encoding="utf-8",
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    spec = registry.ParserSpec("timings", "dt_plugin_fmt:TimingsParser")
+    monkeypatch.setattr(registry, "_plugin_specs", lambda: (spec,))
+    monkeypatch.setattr(registry, "_parsers", registry.get_all())
+
+    assert "timings" in registry.available_parsers()
+    assert "dt_plugin_fmt" not in sys.modules
+
+    log = tmp_path / "run.timings"
+    log.write_text(json.dumps({"timings": {"open": 10, "click": 25}}), "utf-8")
+    assert parse_as(log, "timings")[1] == Step("click", 0, 25)
+    assert "dt_plugin_fmt" in sys.modules
+    assert autodetect_parser(log)[0] == "timings"
+
+
+def test_parse_as_unknown_format() -> None:
+    with pytest.raises(KeyError):
+        parse_as(Path("examples/selenium_har.har"), "no_such_format")
@@ -0,0 +1,78 @@
+import json
+import random
+
+import pytest
+
+from deeptrace import api
+from deeptrace.core.groupby import GroupBy
+from deeptrace.core.partial import load_partial, merge_partials, save_partial
+
+
+def _write_log(path, rows) -> None:
+    path.write_text(
+        "".join(
+            json.dumps({"name": n, "startTime": 0, "duration": d}) + "\n"
+            for n, d in rows
+        )
+    )
+
+
+@pytest.fixture
+def shards(tmp_path):
+    rnd = random.Random(7)
+    logs = []
+    for k in range(3):
+        rows = [
+            (f"step-{rnd.randrange(12)}", rnd.randrange(1, 900)) for _ in range(400)
+        ]
+        _write_log(tmp_path / f"shard{k}.jsonl", rows)
+        logs.append(rows)
+    _write_log(tmp_path / "all.jsonl", [row for rows in logs for row in rows])
+    partials = []
+    for k in range(3):
+        (result,) = api.analyze(tmp_path / f"shard{k}.jsonl", keep_groups=True)
+        assert result.groups is not None and result.format
+        partials.append(tmp_path / f"shard{k}.bin")
+        save_partial(partials[-1], result.format, result.groups)
+    return tmp_path / "all.jsonl", partials
+
+
+def test_round_trip(tmp_path) -> None:
+    groups = GroupBy("p95")
+    for name, d in [("a", 10), ("a", 30), ("b", 0), ("ü/x", 7)]:
+        groups.append(name, 0, d)
+    save_partial(tmp_path / "p.bin", "jsonl", groups)
+    fmt, loaded = load_partial(tmp_path / "p.bin", "max")
+    assert (fmt, loaded.key, loaded.count) == ("jsonl", "max", 4)
+    assert list(loaded.groups) == ["a", "b", "ü/x"]
+    a = loaded.groups["a"]
+    assert (a.count, a.mean, a.variance, a.max, a.total) == (2, 20.0, 200.0, 30, 40)
+
+
+@pytest.mark.parametrize("rank_by", ["avg", "p95", "total"])
+def test_merge_equals_one_analysis(shards, rank_by) -> None:
+    combined, partials = shards
+    (whole,) = api.analyze(combined, top=5, rank_by=rank_by)
+    merged = api.merge(partials, top=5, rank_by=rank_by)
+    assert merged.format == "jsonl"
+    assert merged.slowest == whole.slowest
+    assert merged.summary == whole.summary
+
+
+def test_foreign_and_incompatible_partials(tmp_path, shards) -> None:
+    _, partials = shards
+    other = tmp_path / "other.bin"
+    save_partial(other, "jsonl", GroupBy(relative_accuracy=0.05))
+    with pytest.raises(ValueError, match="sketch accuracy"):
+        merge_partials([partials[0], other])
+
+    bogus = tmp_path / "bogus.bin"
+    bogus.write_bytes(b"not a partial")
+    with pytest.raises(api.AnalysisError, match="not a deeptrace partial"):
+        api.merge([bogus])
+    newer = tmp_path / "newer.bin"
+    blob = bytearray(partials[0].read_bytes())
+    blob[4] = 99  # version
+    newer.write_bytes(bytes(blob))
+    with pytest.raises(ValueError, match="partial version 99"):
+        load_partial(newer)
@@ -0,0 +1,99 @@
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from deeptrace.core.parsers.parser_manager import autodetect_parser
+from deeptrace.core.parsers.playwright_trace import PlaywrightTraceParser
+
+TRACE = [
+    {"type": "context-options", "wallTime": 1_700_000_000_000, "monotonicTime": 100},
+    {"type": "before", "callId": "call@1", "startTime": 110, "apiName": "page.goto"},
+    {
+        "type": "before",
+        "callId": "call@2",
+        "startTime": 120,
+        "parentId": "call@1",
+        "class": "Frame",
+        "method": "waitForLoadState",
+    },
+    {"type": "log", "callId": "call@2", "time": 125, "message": "waiting"},
+    {"type": "after", "callId": "call@2", "endTime": 180},
+    {"type": "after", "callId": "call@1", "endTime": 200},
+    {"type": "before", "callId": "call@3", "startTime": 210, "apiName": "page.click"},
+]
+
+NETWORK = [
+    {
+        "type": "resource-snapshot",
+        "snapshot": {
+            "_monotonicTime": 130,
+            "startedDateTime": "2023-11-14T22:13:20.030Z",
+            "time": 40,
+            "request": {"method": "GET", "url": "https://example.test/app.js"},
+        },
+    }
+]
+
+
+def _lines(events) -> str:
+    return "".join(json.dumps(ev) + "\n" for ev in events)
+
+
+@pytest.fixture
+def trace_zip(tmp_path: Path) -> Path:
+    path = tmp_path / "trace.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("trace.trace", _lines(TRACE))
+        zf.writestr("trace.network", _lines(NETWORK))
+        zf.writestr("resources/page@1.jpeg", b"\xff\xd8")
+    return path
+
+
+def test_pairs_before_after(trace_zip: Path) -> None:
+    parser = PlaywrightTraceParser()
+    steps = parser.parse(str(trace_zip))
+    base = 1_700_000_000_000 - 100
+
+    goto, wait, click, request = steps
+    assert (goto.name, goto.start_ms - base, goto.duration) == ("page.goto", 110, 90)
+    assert wait.name == "Frame.waitForLoadState"
+    assert (wait.parent, wait.depth, wait.duration) == (0, 1, 60)
+    # unfinished action is kept with zero duration and reported
+    assert click.duration == 0
+    assert request.name == "https://example.test/app.js"
+    assert (request.start_ms - base, request.duration) == (130, 40)
+    assert parser.errors == [("trace.trace:7", "no matching after")]
+
+
+def test_unmatched_after_is_reported(tmp_path: Path) -> None:
+    path = tmp_path / "trace.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(
+            "trace.trace",
+            _lines(TRACE)
+            + "{broken\n"
+            + _lines([{"type": "after", "callId": "call@9", "endTime": 1}]),
+        )
+    parser = PlaywrightTraceParser(network=False)
+    assert len(parser.parse(str(path))) == 3
+    assert [where for where, _ in parser.errors] == [
+        "trace.trace:8",
+        "trace.trace:9",
+        "trace.trace:7",
+    ]
+
+
+def test_autodetect_trace_zip(trace_zip: Path) -> None:
+    fmt, steps = autodetect_parser(trace_zip)
+    assert fmt == "playwright_trace"
+    assert len(steps) == 4
+
+
+def test_zip_without_trace(tmp_path: Path) -> None:
+    path = tmp_path / "other.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("report.json", "{}")
+    with pytest.raises(ValueError):
+        PlaywrightTraceParser().parse(str(path))
@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+from deeptrace.core import profiling
+from deeptrace.core.parsers.parser_manager import autodetect_parser
+
+
+def test_hooks_are_noops_when_inactive() -> None:
+    assert profiling.active() is None
+    with profiling.phase("parse"):
+        profiling.count("steps", 3)
+        profiling.attempt("allure", "rejected", 0.1)
+    assert profiling.active() is None
+
+
+def test_session_records_phases_and_attempts(tmp_path: Path) -> None:
+    out = tmp_path / "profile.json"
+    with profiling.session("analyze", json_path=out) as prof:
+        with profiling.phase("load"):
+            autodetect_parser(Path("examples/selenium_har.har"))
+        with profiling.phase("load"):
+            pass
+    assert prof is not None
+    assert profiling.active() is None
+    assert list(prof.phases) == ["load", "load/decode"]
+    assert [(a.parser, a.outcome) for a in prof.attempts] == [
+        ("har_generic", "accepted")
+    ]
+    assert prof.counters["steps"] == 2
+    assert prof.counters["bytes_read"] > 0
+
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["command"] == "analyze"
+    assert data["parsers"][0]["score"] == 1.0
+
+
+def test_disabled_session_yields_none() -> None:
+    with profiling.session("analyze", enabled=False) as prof:
+        assert prof is None
+        assert profiling.active() is None
@@ -0,0 +1,81 @@
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from deeptrace.core.analyzer import StreamingAverages, deduplicate_avg
+from deeptrace.core.models import Step, StepTable
+from deeptrace.core.parsers.parser_manager import stream_steps
+from deeptrace.core.pushdown import StepFilter, feed
+
+STEPS = [
+    Step("page.goto", 0, 900),
+    Step("page.click", 1000, 1040),
+    Step("api.login", 1100, 1600),
+    Step("page.click", 1700, 1800),
+    Step("api.logout", 1900, 1950),
+]
+
+
+def _names(table: StepTable):
+    return [(s.name, s.duration) for s in table]
+
+
+@pytest.mark.parametrize(
+    "where, expected",
+    [
+        (StepFilter(), [s.name for s in STEPS]),
+        (StepFilter(min_duration=100), ["page.goto", "api.login", "page.click"]),
+        (StepFilter(include=("page.*",)), ["page.goto", "page.click", "page.click"]),
+        (StepFilter(exclude=("page.*", "*out")), ["api.login"]),
+        (StepFilter(since_ms=1000, until_ms=1700), ["page.click"] * 2 + ["api.login"]),
+    ],
+)
+def test_step_filter(where: StepFilter, expected) -> None:
+    table = StepTable()
+    feed(STEPS, table, where)
+    assert sorted(table.names[i] for i in table.name_ids) == sorted(expected)
+    # filters travel to process-pool workers
+    assert pickle.loads(pickle.dumps(where)).accepts("api.login", 1100, 1600) == (
+        where.accepts("api.login", 1100, 1600)
+    )
+
+
+def test_streaming_averages_match_deduplicate() -> None:
+    averages = StreamingAverages()
+    feed(STEPS, averages)
+    assert averages.count == len(STEPS)
+    assert _names(averages.table()) == _names(deduplicate_avg(STEPS))
+
+
+def test_stream_jsonl_drops_rejected_lines(tmp_path: Path) -> None:
+    path = tmp_path / "run.jsonl"
+    path.write_text(
+        "".join(
+            json.dumps({"name": f"step-{i % 3}", "startTime": i, "duration": i}) + "\n"
+            for i in range(100)
+        ),
+        encoding="utf-8",
+    )
+    table = StepTable()
+    fmt = stream_steps(path, table, where=StepFilter(min_duration=90))
+    assert fmt == "jsonl"
+    assert len(table) == 10
+
+
+def test_stream_falls_back_to_autodetection() -> None:
+    table = StepTable()
+    assert stream_steps(Path("examples/selenium_har.har"), table) == "har_generic"
+    assert len(table) == 2
+    assert stream_steps(Path("examples/broken.json"), StepTable()) is None
+
+
+def test_stream_parser_error_is_logged(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    path = tmp_path / "t2.json"
+    path.write_text('{"actions":[{"name":"a","startTime":1,"endTime":5}, 7]}')
+    table = StepTable()
+    assert stream_steps(path, table) is None
+    assert "parser failed" in caplog.text
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from typing import Any, Dict
+
+import pytest
+
+from deeptrace.core.comparison import compare_runs
+from deeptrace.core.intervals import contributions
+from deeptrace.core.models import Step, StepTable
+from deeptrace.reports import (
+    schema_path,
+    write_analyze_report,
+    write_compare_report,
+    write_critical_path_report,
+)
+from deeptrace.utils import (
+    generate_ab_diff_markdown_report,
+    generate_ab_markdown_report,
+    generate_markdown_report,
+    get_report_path,
+    get_stats,
+    summarize,
+)
+
+STEPS = [Step("login", 0, 120), Step("open, page", 50, 80), Step("logout", 200, 210)]
+
+
+def _check_schema(doc: Dict[str, Any]) -> None:
+    """Required keys of the schema branch for doc["kind"] (no jsonschema here)."""
+    schema = json.loads(schema_path().read_text())
+    assert set(schema["required"]) <= set(doc)
+    (branch,) = [
+        b for b in schema["oneOf"] if b["properties"]["kind"]["const"] == doc["kind"]
+    ]
+    assert set(branch["required"]) <= set(doc)
+    row_required = set(branch["properties"]["steps"]["items"]["required"])
+    assert doc["steps"] and all(row_required <= set(row) for row in doc["steps"])
+    for key, prop in branch["properties"].items():
+        if prop.get("$ref") == "#/$defs/stats":
+            assert set(schema["$defs"]["stats"]["required"]) <= set(doc[key])
+
+
+def _render(writer: Any, fmt: str, *args: Any, **kwargs: Any) -> str:
+    buf = io.StringIO()
+    writer(buf, fmt, *args, **kwargs)
+    return buf.getvalue()
+
+
+def test_analyze_formats() -> None:
+    summary = summarize(STEPS, (90,))
+    doc = json.loads(_render(write_analyze_report, "json", STEPS, summary, source="x"))
+    _check_schema(doc)
+    assert doc["kind"] == "analyze" and doc["source"] == "x"
+    assert doc["stats"]["percentiles"] == {"90": summary.percentiles[90]}
+    assert [r["ms"] for r in doc["steps"]] == [120, 30, 10]
+
+    rows = list(
+        csv.reader(io.StringIO(_render(write_analyze_report, "csv", STEPS, summary)))
+    )
+    assert rows[0] == ["rank", "name", "ms"]
+    assert rows[2] == ["2", "open, page", "30"]
+
+    md = _render(write_analyze_report, "md", STEPS, summary)
+    assert md.rstrip("\n") == generate_markdown_report(STEPS, get_stats(summary))
+    with pytest.raises(ValueError, match="unknown report format"):
+        _render(write_analyze_report, "xml", STEPS, summary)
+
+
+def test_compare_and_critical_path_json() -> None:
+    a = StepTable.from_steps(STEPS)
+    b = StepTable.from_steps([Step("login", 0, 300), Step("new", 0, 1)])
+    diffs = compare_runs([a], [b])
+    doc = json.loads(
+        _render(write_compare_report, "json", diffs, summarize(a), summarize(b))
+    )
+    _check_schema(doc)
+    assert {r["name"]: r["status"] for r in doc["steps"]}["new"] == "new"
+    assert (
+        len(
+            _render(
+                write_compare_report, "csv", diffs, summarize(a), summarize(b), limit=1
+            ).splitlines()
+        )
+        == 2
+    )
+
+    rows, timeline = contributions(STEPS)
+    doc = json.loads(_render(write_critical_path_report, "json", rows, timeline))
+    _check_schema(doc)
+    assert doc["timeline"]["max_concurrency"] == 2
+
+
+def test_ab_markdown_report_accepts_steps() -> None:
+    b = [Step("login", 0, 300), Step("new", 0, 1)]
+    stats = get_stats(summarize(STEPS))
+    md = generate_ab_markdown_report(STEPS, b, stats, stats, label_b="next")
+    diffs = compare_runs([StepTable.from_steps(STEPS)], [StepTable.from_steps(b)])
+    assert md == generate_ab_diff_markdown_report(diffs, stats, stats, label_b="next")
+    assert "| login | 120 | 300 | +180 |" in md
+
+
+def test_report_paths_are_unique(tmp_path) -> None:
+    first = get_report_path(tmp_path, "json")
+    first.write_text("{}")
+    second = get_report_path(tmp_path, "json")
+    assert second != first and second.suffix == ".json"
+    assert get_report_path(tmp_path, "csv", "nightly") == tmp_path / "nightly.csv"
+    assert get_report_path(tmp_path, "csv", "out.txt") == tmp_path / "out.txt"
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from deeptrace.core import models, sketch as sketch_mod
+from deeptrace.core.models import Step, StepTable
+from deeptrace.core.sketch import QuantileSketch
+from deeptrace.utils import _perc, get_stats
+
+
+def _durations(n: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    return [int(rnd.lognormvariate(5, 1.2)) for _ in range(n)]
+
+
+@pytest.mark.parametrize("accuracy", [0.01, 0.05])
+def test_quantiles_within_relative_error(accuracy: float) -> None:
+    vals = _durations(20_000)
+    sk = QuantileSketch(accuracy).update(vals)
+    vals.sort()
+    for p in (1, 25, 50, 90, 95, 99, 99.9):
+        exact = vals[int((len(vals) - 1) * p / 100)]
+        assert abs(sk.quantile(p / 100) - exact) <= accuracy * exact + 1e-9
+    assert (sk.count, sk.total, sk.min, sk.max) == (
+        len(vals),
+        sum(vals),
+        vals[0],
+        vals[-1],
+    )
+
+
+def test_merge_equals_union() -> None:
+    a, b = _durations(5000, 1), _durations(7000, 2)
+    merged = QuantileSketch().update(a).merge(QuantileSketch().update(b))
+    whole = QuantileSketch().update(a + b)
+    assert merged.to_dict() == whole.to_dict()
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(0.05))
+
+
+def test_numpy_update_matches_python(monkeypatch: pytest.MonkeyPatch) -> None:
+    if models.np is None:
+        pytest.skip("numpy is not installed")
+    col = StepTable.from_steps(Step("s", 0, d) for d in _durations(5000)).durations()
+    fast = QuantileSketch().update(col)
+    monkeypatch.setattr(sketch_mod, "np", None)
+    assert QuantileSketch().update(col).to_dict() == fast.to_dict()
+
+
+def test_serialization_roundtrip() -> None:
+    sk = QuantileSketch().update(_durations(1000) + [0, 0])
+    assert QuantileSketch.from_bytes(sk.to_bytes()).to_dict() == sk.to_dict()
+    assert QuantileSketch.from_dict(sk.to_dict()).to_dict() == sk.to_dict()
+    empty = QuantileSketch()
+    assert QuantileSketch.from_bytes(empty.to_bytes()).count == 0
+
+
+def test_get_stats_exact_and_approx() -> None:
+    steps = [Step("s", 0, d) for d in _durations(3000)]
+    vals = sorted(s.duration for s in steps)
+    exact = dict(get_stats(steps, (95,)))
+    assert exact["P95"] == f"{_perc(vals, 95)} ms"
+
+    approx = dict(get_stats(StepTable.from_steps(steps), (95,), exact=False))
+    assert approx["Total steps"] == exact["Total steps"]
+    assert approx["Avg"] == exact["Avg"]
+    p95 = int(approx["P95"].strip("≈ ms"))
+    assert abs(p95 - _perc(vals, 95)) <= 0.01 * _perc(vals, 95) + 1
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from deeptrace.core.analyzer import group_sketches
+from deeptrace.core.models import Step
+from deeptrace.core.store import RunStore
+
+
+def _sketches(offset: int) -> dict:
+    steps = [Step("login", 0, 100 + offset + i) for i in range(50)]
+    steps += [Step("logout", 0, 10)]
+    return group_sketches(steps)
+
+
+def test_ingest_and_trend(tmp_path: Path) -> None:
+    with RunStore(tmp_path / "history.db") as store:
+        for i in range(5):
+            store.ingest(f"run{i}.json", "json_generic", _sketches(i * 10), run_time=i)
+
+        points = store.trend("login", last=3)
+        assert [p.run_time for p in points] == [4, 3, 2]
+        assert points[0].sketch.count == 50
+        assert points[0].sketch.min == 140
+        assert store.step_names("log%") == ["login", "logout"]
+        assert store.has_run("run0.json", 0)
+        assert not store.has_run("run0.json", 1)
+
+
+def test_group_sketches() -> None:
+    sketches = _sketches(0)
+    assert set(sketches) == {"login", "logout"}
+    login = sketches["login"]
+    assert (login.count, login.min, login.max) == (50, 100, 149)
+    assert abs(login.quantile(0.5) - 124) <= 0.01 * 124
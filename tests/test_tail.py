@@ -0,0 +1,89 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from deeptrace.core.jsonstream import decode_line
+from deeptrace.core.tail import LogTailer
+
+
+def _append(path: Path, data: bytes) -> None:
+    with path.open("ab") as fh:
+        fh.write(data)
+
+
+def test_reads_only_appended_lines(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    log.write_bytes(b"a\nb\n")
+    with LogTailer(log) as tailer:
+        assert tailer.poll() == [b"a", b"b"]
+        assert tailer.poll() == []
+        _append(log, b"c\n")
+        assert tailer.poll() == [b"c"]
+        assert tailer.offset == log.stat().st_size
+
+
+def test_partial_line_is_held_back(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    log.write_bytes(b'{"name": "op')
+    with LogTailer(log, chunk_size=4) as tailer:
+        assert tailer.poll() == []
+        _append(log, b'en"}\n{"na')
+        assert tailer.poll() == [b'{"name": "open"}']
+
+
+def test_from_end_skips_history(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    log.write_bytes(b"old\n")
+    with LogTailer(log, from_end=True) as tailer:
+        _append(log, b"new\n")
+        assert tailer.poll() == [b"new"]
+
+
+def test_truncation_restarts_from_zero(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    log.write_bytes(b"first line\nsecond line\n")
+    with LogTailer(log) as tailer:
+        tailer.poll()
+        log.write_bytes(b"x\n")
+        assert tailer.poll() == [b"x"]
+        assert tailer.truncations == 1
+
+
+def test_rotation_drains_old_file(tmp_path: Path) -> None:
+    log = tmp_path / "run.jsonl"
+    log.write_bytes(b"a\n")
+    with LogTailer(log) as tailer:
+        assert tailer.poll() == [b"a"]
+        _append(log, b"b\nunterminated")
+        os.rename(log, tmp_path / "run.jsonl.1")
+        log.write_bytes(b"c\n")
+        assert tailer.poll() == [b"b", b"unterminated", b"c"]
+        assert tailer.rotations == 1
+
+
+def test_missing_file_is_picked_up_later(tmp_path: Path) -> None:
+    log = tmp_path / "later.jsonl"
+    with LogTailer(log) as tailer:
+        assert tailer.poll() == []
+        log.write_bytes(b"a\n")
+        assert tailer.poll() == [b"a"]
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (b'{"name": "a"}', {"name": "a"}),
+        (b'  {"name": "a"},\r', {"name": "a"}),
+        (b"[", None),
+        (b"]", None),
+        (b"", None),
+    ],
+)
+def test_decode_line(line: bytes, expected: object) -> None:
+    assert decode_line(line) == expected
+
+
+def test_decode_line_rejects_garbage() -> None:
+    with pytest.raises(ValueError):
+        decode_line(b"not json")
@@ -0,0 +1,99 @@
+import json
+import random
+import statistics
+
+import pytest
+
+from deeptrace import api
+from deeptrace.core.variance import BIMODAL_SCORE, RunVariance, VarianceStats
+
+
+def _stats(values) -> VarianceStats:
+    stats = VarianceStats()
+    for v in values:
+        stats.add(v)
+    return stats
+
+
+def test_online_moments_and_merge() -> None:
+    rnd = random.Random(1)
+    values = [rnd.uniform(0, 50) for _ in range(40)] + [
+        rnd.uniform(0, 5000) for _ in range(40)
+    ]
+    whole = _stats(values)
+    assert whole.mean == pytest.approx(statistics.fmean(values))
+    assert whole.stddev == pytest.approx(statistics.stdev(values))
+    assert whole.cv == pytest.approx(whole.stddev / whole.mean)
+    assert sum(whole.hist) == 80
+
+    # the halves end up with different bin widths
+    left, right = _stats(values[:40]), _stats(values[40:])
+    assert left.shift < right.shift
+    merged = left.merge(right)
+    assert (merged.runs, merged.shift) == (80, whole.shift)
+    assert merged.hist == whole.hist
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.m2 == pytest.approx(whole.m2)
+
+
+def test_bimodality() -> None:
+    rnd = random.Random(2)
+    unimodal = _stats(rnd.gauss(1000, 100) for _ in range(200))
+    bimodal = _stats(
+        rnd.gauss(200, 15) if rnd.random() < 0.7 else rnd.gauss(800, 40)
+        for _ in range(200)
+    )
+    assert unimodal.bimodality < BIMODAL_SCORE <= bimodal.bimodality
+    # too few runs on the slow side to call it a mode
+    outlier = _stats([100] * 20 + [900])
+    assert outlier.bimodality == 0.0
+
+    start, width, counts = bimodal.histogram(8)
+    assert len(counts) <= 8 and sum(counts) == 200
+    assert start <= 150 and start + width * len(counts) > 800
+
+
+def test_ranked_filters() -> None:
+    runs = RunVariance()
+    for k in range(5):
+        means = {"steady": 100.0, "jumpy": 100.0 + 90 * (k % 2), "tiny": k % 2}
+        if k < 2:
+            means["rare"] = 5000.0 * k
+        runs.add_run(means)
+    assert runs.runs == 5
+    assert [name for name, _ in runs.ranked("cv")] == ["tiny", "jumpy", "steady"]
+    assert [name for name, _ in runs.ranked("stddev", threshold=50)] == [
+        "jumpy",
+        "steady",
+    ]
+    assert [name for name, _ in runs.ranked(min_runs=2)][-1] == "steady"
+
+
+def _write_run(path, durations) -> None:
+    path.write_text(
+        "".join(
+            json.dumps({"name": n, "startTime": 0, "duration": d}) + "\n"
+            for n, d in durations
+        )
+    )
+
+
+def test_api_variance(tmp_path) -> None:
+    rnd = random.Random(3)
+    for r in range(30):
+        search = rnd.gauss(200, 10) if r % 3 else rnd.gauss(900, 20)
+        rows = [("login", 1000 + rnd.randint(-20, 20)), ("search", search)]
+        _write_run(tmp_path / f"run{r:02}.jsonl", rows)
+    (tmp_path / "notes.txt").write_text("not a log")
+
+    result = api.variance([tmp_path], jobs=1)
+    assert result.formats == ["jsonl"]
+    assert result.stats.runs == 30 and len(result.runs) == 31
+    assert all(run.means is None for run in result.runs)
+    assert [name for name, _ in result.steps] == ["search", "login"]
+    assert result.unstable == ["search"]
+
+    with pytest.raises(api.AnalysisError, match="at least 3 runs"):
+        api.variance([tmp_path / "run00.jsonl", tmp_path / "run01.jsonl"])
+    with pytest.raises(api.AnalysisError, match="Unknown rank key"):
+        api.variance([tmp_path], rank_by="p95")